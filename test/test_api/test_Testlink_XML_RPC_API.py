@@ -85,6 +85,35 @@ class TestlinkXMLRPCAPITests(unittest.TestCase):
         # Check that reconnect has been called
         self.assertTrue(reconnect.called)
 
+    @mock.patch("testlink.api.TestlinkXMLRPCAPI._reconnect")
+    def test_idempotent_writes(self, reconnect):
+        """Writes are verified before sending again"""
+        import socket
+        self._api._tl_version = Version("1.9.14")
+        report = mock.Mock(side_effect=socket.error())
+        create = mock.Mock(side_effect=socket.error())
+        setattr(self._mock_server, 'tl.reportTCResult', report)
+        setattr(self._mock_server, 'tl.createBuild', create)
+        setattr(self._mock_server, 'tl.getLastExecutionResult',
+                mock.Mock(return_value=[{'id': '42', 'notes': "foo\n[request:123]"}]))
+
+        # Reported result has been stored already
+        resp = self._api.reportTCResult(1, 'p', testcaseid=2, buildid=3, notes="foo", idempotencykey="123")
+        self.assertEqual(report.call_count, 1)
+        self.assertEqual(report.call_args[0][0]['notes'], "foo\n[request:123]")
+        self.assertEqual(resp[0]['id'], '42')
+
+        # Reported result has not been stored, so it is sent again
+        self.assertRaises(socket.error, self._api.reportTCResult, 1, 'p', testcaseid=2, buildid=3,
+                          idempotencykey="456")
+        self.assertEqual(report.call_count, 3)
+
+        # Writes without verification are not sent again
+        self.assertRaises(socket.error, self._api.reportTCResult, 1, 'p', testcaseid=2, buildid=3)
+        self.assertEqual(report.call_count, 4)
+        self.assertRaises(socket.error, self._api.createBuild, 1, "Build")
+        self.assertEqual(create.call_count, 1)
+
     def test_global_devkey(self):
         """Global DevKey setting"""
         key = '123456789ABCDEF'
@@ -95,6 +124,116 @@ class TestlinkXMLRPCAPITests(unittest.TestCase):
         test_data["devKey"] = key
         self._mock_server.mockMethod.assert_called_with(test_data)
 
+    def test_multicall(self):
+        """Multicall"""
+        import xmlrpclib
+        self._api._devkey = 'key'
+        response = [["SPAM!"], [[{'code': 1337, 'message': "SPAM!"}]], {'faultCode': 1, 'faultString': "SPAM!"}]
+        with mock.patch.object(self._mock_server.system, 'multicall', create=True, return_value=response) as call:
+            multicall = self._api.multicall()
+            multicall.about()
+            multicall.getTestCase(testcaseid=1)
+            multicall.getProjects()
+            self.assertEqual(len(multicall), 3)
+            result = multicall()
+        self.assertEqual(len(multicall), 0)
+
+        # Single request for all calls
+        self.assertEqual(call.call_count, 1)
+        payload = call.call_args[0][0]
+        self.assertEqual([p['methodName'] for p in payload], ["tl.about", "tl.getTestCase", "tl.getProjects"])
+        self.assertEqual(payload[1]['params'], [{'devKey': 'key', 'testcaseid': 1, 'testcaseexternalid': None,
+                                                 'version': None}])
+
+        # Failed calls are returned
+        self.assertEqual(result[0], "SPAM!")
+        self.assertTrue(isinstance(result[1], APIError))
+        self.assertEqual(result[1].error_code, 1337)
+        self.assertTrue(isinstance(result[2], xmlrpclib.Fault))
+
+    def test_multicall_postprocess(self):
+        """Multicall of wrappers converting the response"""
+        response = [[""], [{'id': '1', 'name': "SPAM!"}], [""], [[{'code': 7011, 'message': "SPAM!"}]]]
+        with mock.patch.object(self._mock_server.system, 'multicall', create=True, return_value=response):
+            multicall = self._api.multicall()
+            multicall.getTestProjectByName("unknown")
+            multicall.getTestProjectByName("SPAM!")
+            multicall.getTestCaseCustomFieldDesignValue("PRJ-1", 1, 2, "unknown")
+            multicall.getTestCaseCustomFieldDesignValue("PRJ-1", 1, 2, "invalid")
+            result = multicall()
+        # Converted like single queries, failures are kept
+        self.assertEqual(result[:3], [None, {'id': '1', 'name': "SPAM!"}, None])
+        self.assertTrue(isinstance(result[3], APIError))
+
+        # Queries depending on other responses cannot be recorded
+        self.assertRaises(NotSupported, self._api.multicall().getReportedResult, 1, "[request:SPAM]")
+
+    def test_multicall_not_supported(self):
+        """Multicall fallback"""
+        import xmlrpclib
+        fault = xmlrpclib.Fault(-32601, "Unknown method")
+        self._mock_server.passed = mock.Mock(return_value="SPAM!")
+        self._mock_server.error = mock.Mock(return_value=[{'code': 1337, 'message': "SPAM!"}])
+        with mock.patch.object(self._mock_server.system, 'multicall', create=True, side_effect=fault) as call:
+            result = self._api._multicall([("passed", {}), ("error", {}), ("passed", {})])
+            self.assertEqual(result[0], "SPAM!")
+            self.assertTrue(isinstance(result[1], APIError))
+            self.assertEqual(result[2], "SPAM!")
+
+            # Server support is remembered
+            self._api._multicall([("passed", {})])
+            self.assertEqual(call.call_count, 1)
+
+    def test_stream_upload(self):
+        """Streamed attachment upload"""
+        import os
+        import base64
+        import hashlib
+        import tempfile
+        import threading
+        import StringIO
+        from SimpleXMLRPCServer import SimpleXMLRPCServer
+        from testlink.api import Base64File
+
+        server = SimpleXMLRPCServer(("127.0.0.1", 0), logRequests=False, allow_none=True)
+        server.register_function(lambda args: {'filename': args['filename'],
+                                               'md5': hashlib.md5(base64.b64decode(args['content'])).hexdigest()},
+                                 'tl.uploadAttachment')
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        data = os.urandom(100001)
+        fd, path = tempfile.mkstemp()
+        try:
+            os.write(fd, data)
+            os.close(fd)
+            self._api._endpoint = "http://127.0.0.1:%d/RPC2" % server.server_address[1]
+            self._api._transport = testlink.api.ThreadSafeTransport()
+
+            with mock.patch.object(Base64File, 'CHUNK_SIZE', 3 * 1000):
+                # Memory mapped file
+                content = Base64File(path)
+                self.assertEqual(content.encoded_size, len(base64.b64encode(data)))
+                self.assertEqual("".join(content), base64.b64encode(data))
+                resp = self._api.uploadAttachment(1, "nodes_hierarchy", u"log\xe4.txt", "text/plain", content)
+                self.assertEqual(resp, {'filename': u"log\xe4.txt", 'md5': hashlib.md5(data).hexdigest()})
+
+                # File object from its current position
+                with open(path, 'rb') as f:
+                    f.seek(1)
+                    resp = self._api.uploadAttachment(1, "nodes_hierarchy", "log.txt", "text/plain", Base64File(f))
+                self.assertEqual(resp['md5'], hashlib.md5(data[1:]).hexdigest())
+
+                # Stream without file descriptor
+                content = Base64File(StringIO.StringIO(data))
+                self.assertEqual("".join(content), base64.b64encode(data))
+                self.assertEqual("".join(Base64File(StringIO.StringIO(""))), "")
+        finally:
+            server.shutdown()
+            server.server_close()
+            os.remove(path)
+
     #
     # Since the raw API calls are very simple, some checks can be done
     # together. For each raw call, the following things are checked:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: TestSuite for testlink.asyncserver
+"""
+
+# IMPORTS
+import time
+import socket
+import urllib2
+import threading
+import unittest
+from testlink.asyncserver import AsyncXMLRPCServer
+from testlink.asyncserver import Future
+from testlink.asyncserver import Return
+from testlink.asyncserver import sleep
+from testlink.asyncserver import readable
+from xmlrpclib import Fault
+from xmlrpclib import MultiCall
+from xmlrpclib import ServerProxy
+
+
+def coroutine_callback(params):
+    """Waits the requested time, fails for negative values"""
+    yield sleep(params['delay'])
+    if params['delay'] < 0:
+        raise ValueError(params['delay'])
+    raise Return({'result': 'p', 'notes': "Waited %s" % params['delay']})
+
+
+class AsyncXMLRPCServerTests(unittest.TestCase):
+    """Tests of AsyncXMLRPCServer implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncXMLRPCServerTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "AsyncXMLRPCServer: " + self._testMethodDoc
+
+    def setUp(self):
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.shutdown(5)
+            self.assertFalse(self.server.is_alive())
+
+    def start(self, callback, **kwargs):
+        self.server = AsyncXMLRPCServer(callback, port=0, **kwargs)
+        return ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+
+    def test_coroutines(self):
+        """Concurrent coroutine callbacks"""
+        client = self.start(coroutine_callback)
+        self.assertEqual(client.executeTestCase({'delay': 0}), {'result': 'p', 'notes': "Waited 0"})
+        self.assertRaises(Fault, client.executeTestCase, {'delay': -1})
+
+        started = time.time()
+        results = client.executeTestCases([{'delay': 0.5}] * 500 + [{'delay': -1}])
+        self.assertTrue(time.time() - started < 3)
+        self.assertEqual(results[0], {'result': 'p', 'notes': "Waited 0.5"})
+        self.assertEqual(results[-1], {'faultCode': 1, 'faultString': "ValueError: -1"})
+
+        metrics = client.getMetrics()
+        self.assertEqual((metrics['callbacks'], metrics['callback_errors']), (503, 2))
+        self.assertEqual(metrics['connections'], 1)
+
+    def test_concurrent_clients(self):
+        """Concurrent connections"""
+        client = self.start(coroutine_callback)
+        results = []
+
+        def call(i):
+            proxy = ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+            results.append(proxy.executeTestCase({'delay': 0.5})['result'])
+        threads = [threading.Thread(target=call, args=(i,)) for i in xrange(20)]
+        started = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(time.time() - started < 3)
+        self.assertEqual(results, ['p'] * 20)
+        self.assertIn("executeTestCase", client.system.listMethods())
+
+    def test_futures(self):
+        """Plain callbacks, Futures and sockets"""
+        reader, writer = socket.socketpair()
+        future = Future()
+
+        def callback(kind):
+            if kind == 'plain':
+                return "plain"
+            if kind == 'future':
+                return future
+            return socket_callback()
+
+        def socket_callback():
+            yield readable(reader)
+            raise Return(reader.recv(10))
+
+        client = self.start(callback)
+        self.assertEqual(client.executeTestCase('plain'), "plain")
+        threading.Timer(0.1, future.set_result, ("future",)).start()
+        threading.Timer(0.1, writer.send, ("socket",)).start()
+        self.assertEqual(client.executeTestCases(['future', 'socket']), ["future", "socket"])
+        reader.close()
+        writer.close()
+
+    def test_multicall(self):
+        """Concurrent system.multicall"""
+        client = self.start(coroutine_callback)
+        multicall = MultiCall(client)
+        for delay in (0.5, 0.5, -1):
+            multicall.executeTestCase({'delay': delay})
+        multicall.getMetrics()
+        multicall.foo()
+
+        started = time.time()
+        results = multicall()
+        self.assertTrue(time.time() - started < 1.5)
+        self.assertEqual(results[0], {'result': 'p', 'notes': "Waited 0.5"})
+        self.assertRaises(Fault, results.__getitem__, 2)
+        self.assertEqual(results[3]['requests']['executeTestCase'], 0)
+        self.assertRaises(Fault, results.__getitem__, 4)
+        self.assertEqual(client.getMetrics()['requests']['executeTestCase'], 3)
+
+    def test_http(self):
+        """Metrics and health state"""
+        self.start(coroutine_callback, http_metrics=True)
+        url = "http://127.0.0.1:%d" % self.server.port
+        self.assertEqual(urllib2.urlopen(url + "/health").read(), "OK\n")
+        self.assertIn("testlink_server_callbacks_active 0\n", urllib2.urlopen(url + "/metrics").read())
+        self.assertRaises(urllib2.HTTPError, urllib2.urlopen, url + "/foo")
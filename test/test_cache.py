@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. codeauthor:: Kai Borowiak
+
+TestSuite for testlink.cache
+"""
+
+# IMPORTS
+import os
+import base64
+import shutil
+import tempfile
+import unittest
+import mock
+
+from testlink.api import Base64File
+from testlink.cache import AttachmentCache
+
+
+class AttachmentCacheTests(unittest.TestCase):
+    """Tests for the attachment upload cache"""
+
+    def __init__(self, *args, **kwargs):
+        super(AttachmentCacheTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'AttachmentCache: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "cache.jsonl")
+        self.api = mock.Mock()
+        self.api.uploadAttachment.return_value = {'status_ok': True}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_upload(self):
+        """Identical uploads are skipped"""
+        data = os.urandom(1000)
+        dump = os.path.join(self.tmpdir, "env.txt")
+        with open(dump, 'wb') as f:
+            f.write(data)
+
+        with AttachmentCache(self.path) as cache:
+            self.assertEqual(cache.digest(base64.b64encode(data)), cache.digest(Base64File(dump)))
+            self.assertEqual(cache.upload(self.api, 1, "executions", "env.txt", "text/plain", Base64File(dump)),
+                             {'status_ok': True})
+            self.assertEqual(cache.upload(self.api, 1, "executions", "env.txt", "text/plain",
+                                          base64.b64encode(data)), None)
+            # Other objects and file names are uploaded
+            cache.upload(self.api, 2, "executions", "env.txt", "text/plain", Base64File(dump))
+            cache.upload(self.api, 1, "executions", "env2.txt", "text/plain", Base64File(dump))
+            self.assertEqual(self.api.uploadAttachment.call_count, 3)
+            self.assertEqual(cache.stats, {'hits': 1, 'misses': 3, 'bytes_saved': 1000})
+
+        # Persisted index
+        with open(self.path, 'ab') as f:
+            f.write('["incomplete')
+        with AttachmentCache(self.path) as cache:
+            self.assertEqual(len(cache), 3)
+            self.assertEqual(cache.upload(self.api, 2, "executions", "env.txt", "text/plain", Base64File(dump)),
+                             None)
+            cache.forget("executions", 2)
+            self.assertEqual(len(cache), 2)
+        self.assertEqual(len(AttachmentCache(self.path)), 2)
+
+    def test_digest(self):
+        """Contents are hashed chunk by chunk"""
+        data = os.urandom(1000)
+        cache = AttachmentCache()
+        with mock.patch.object(AttachmentCache, 'CHUNK_SIZE', 8):
+            with mock.patch('testlink.cache.base64.b64decode', wraps=base64.b64decode) as decode:
+                expected = cache.digest(base64.b64encode(data))
+                self.assertEqual(decode.call_count, 167)
+            self.assertEqual(expected[1], 1000)
+            self.assertEqual(cache.digest(base64.encodestring(data)), expected)
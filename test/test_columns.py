@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. codeauthor:: Kai Borowiak
+
+TestSuite for testlink.columns
+"""
+
+# IMPORTS
+import unittest
+
+from testlink.columns import parse_timestamp
+from testlink.columns import ExecutionHistory
+from testlink.columns import TestPlanStatus
+
+
+class ExecutionHistoryTests(unittest.TestCase):
+    """Tests for column oriented execution history"""
+
+    def __init__(self, *args, **kwargs):
+        super(ExecutionHistoryTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'ExecutionHistory: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.history = ExecutionHistory()
+        for tc_id in xrange(1, 4):
+            self.history.extend(tc_id, [{'id': str(tc_id * 10 + i), 'build_id': str(i), 'platform_id': None,
+                                         'status': "pf"[(tc_id + i) % 2], 'execution_duration': '1.5',
+                                         'execution_ts': "2020-01-0%d 10:00:00" % (3 - i)} for i in xrange(3)])
+
+    def test_parse_timestamp(self):
+        """Timestamp conversion"""
+        self.assertEqual(parse_timestamp("1970-01-02 00:00:01"), 86401)
+        self.assertEqual(parse_timestamp(None), 0)
+        self.assertEqual(parse_timestamp("foo"), 0)
+
+    def test_columns(self):
+        """Column layout"""
+        self.assertEqual(len(self.history), 9)
+        self.assertEqual(list(self.history['tc_id']), [1, 1, 1, 2, 2, 2, 3, 3, 3])
+        self.assertEqual(self.history['status'].tostring(), "fpfpfpfpf")
+        self.assertEqual(set(self.history['platform_id']), set([0]))
+        self.assertRaises(KeyError, self.history.__getitem__, 'foo')
+
+    def test_filter(self):
+        """Filtering"""
+        passed = self.history.filter(status='p', build_id=set([0, 1]))
+        self.assertTrue(isinstance(passed, ExecutionHistory))
+        self.assertEqual(list(passed['execution_id']), [11, 20, 31])
+        self.assertEqual(len(self.history.filter(duration=lambda d: d > 1.0)), 9)
+
+    def test_group_by(self):
+        """Grouping and sorting"""
+        self.assertEqual(self.history.count_by('status'), {'p': 4, 'f': 5})
+        self.assertEqual(self.history.count_by('tc_id', 'status')[(2, 'p')], 2)
+        groups = self.history.group_by('build_id')
+        self.assertEqual(sorted(groups), [0, 1, 2])
+        self.assertEqual(list(groups[1]['tc_id']), [1, 2, 3])
+        ordered = self.history.sort('tc_id', 'timestamp')
+        self.assertEqual(list(ordered['build_id'])[:3], [2, 1, 0])
+
+
+class TestPlanStatusTests(unittest.TestCase):
+    """Tests for column oriented TestPlan status"""
+
+    def __init__(self, *args, **kwargs):
+        super(TestPlanStatusTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'TestPlanStatus: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.status = TestPlanStatus()
+        response = {}
+        for tc_id in xrange(12):
+            platforms = dict((str(p), {'tc_id': str(tc_id), 'platform_id': str(p), 'testsuite_id': str(tc_id % 2),
+                                       'tsuite_name': "suite-%d" % (tc_id % 2), 'priority': '2',
+                                       'exec_status': "pfbn"[(tc_id + p) % 4],
+                                       'exec_on_build': '7' if (tc_id + p) % 4 != 3 else ''})
+                             for p in (1, 2))
+            response[str(tc_id)] = platforms
+        response['12'] = [{'tc_id': '12', 'testsuite_id': '0', 'exec_status': 'p', 'exec_on_build': '7'}]
+        self.status.extend(response)
+
+    def test_breakdown(self):
+        """Breakdown"""
+        self.assertEqual(len(self.status), 25)
+        self.assertEqual(self.status.count_by('status'), {'p': 7, 'f': 6, 'b': 6, 'n': 6})
+        by_suite = self.status.breakdown('testsuite_id')
+        self.assertEqual(by_suite[1], {'p': 3, 'f': 3, 'b': 3, 'n': 3})
+        self.assertEqual(self.status.breakdown('testsuite_id', 'platform_id')[(1, 1)]['p'], 3)
+        self.assertEqual(self.status.filter(platform_id=2).suite_names, {0: "suite-0", 1: "suite-1"})
+
+    def test_mismatches(self):
+        """Cross-check with server counters"""
+        counters = {'with_tester': {'7': {'p': {'exec_qty': '7'}, 'f': {'exec_qty': '6'}, 'b': {'exec_qty': '5'}}}}
+        self.assertEqual(self.status.mismatches(counters, 7), {'b': (6, 5)})
+        self.assertEqual(self.status.mismatches({'7': {'p': 7, 'f': 6, 'b': 6}}, 7), {})
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: TestSuite for testlink.fake
+"""
+
+# IMPORTS
+import mock
+import base64
+import datetime
+import unittest
+from testlink.fake import FakeTestlink
+from testlink.fake import FakeTestlinkServer
+from testlink.api import TestlinkXMLRPCAPI
+from testlink.enums import EXECUTION_STATUS
+from testlink.exceptions import APIError
+from testlink.exceptions import NotSupported
+from testlink.objects.tl_testlink import Testlink
+
+
+class FakeTestlinkTests(unittest.TestCase):
+    """Tests of FakeTestlinkServer implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(FakeTestlinkTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "FakeTestlink: " + self._testMethodDoc
+
+    def setUp(self):
+        self.server = FakeTestlinkServer()
+        self.api = TestlinkXMLRPCAPI(self.server.url)
+        self.api.devkey = FakeTestlink.DEVKEY
+
+        self.api.createTestProject("Project", "PRJ")
+        self.project_id = int(self.api.getTestProjectByName("Project")['id'])
+        self.api.createTestPlan("Plan", "Project")
+        self.plan_id = int(self.api.getTestPlanByName("Plan", "Project")[0]['id'])
+        self.build_id = self.api.createBuild(self.plan_id, "Build")[0]['id']
+        self.suite_id = self.api.createTestSuite("Suite", self.project_id)[0]['id']
+        self.case_ids = []
+        for name in ("First", "Second"):
+            response = self.api.createTestCase(name, self.suite_id, self.project_id, "admin", "Summary",
+                                               steps=[{'step_number': 1, 'actions': "Do", 'expected_results': "Done"}])
+            self.case_ids.append(response[0]['id'])
+            self.api.addTestCaseToTestPlan(self.project_id, self.plan_id, "PRJ-%d" % len(self.case_ids), 1)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.assertFalse(self.server.is_alive())
+
+    def assertAPIError(self, code, fn, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+            self.fail("No APIError raised")
+        except APIError, ae:
+            self.assertEqual(ae.error_code, code)
+
+    def test_version(self):
+        """Version and RPC paths"""
+        self.assertEqual(str(self.api.tl_version), FakeTestlink.VERSION)
+        self.assertEqual(self.api.sayHello(), "Hello!")
+        self.assertTrue(self.api.checkDevKey())
+        self.assertAPIError(FakeTestlink.INVALID_AUTH, self.api.checkDevKey, "SPAM!")
+        self.assertRaises(NotSupported, self.api._query, "tl.unknownMethod")
+
+    def test_errors(self):
+        """Testlink error codes"""
+        self.assertAPIError(7011, self.api.getTestProjectByName, "Unknown")
+        self.assertAPIError(5030, self.api.getTestCaseIdByName, "Unknown")
+        self.assertAPIError(3041, self.api.getTestPlanPlatforms, self.plan_id)
+        self.assertAPIError(3032, self.api.getTestCasesForTestPlan, self.project_id, self.plan_id, buildid=99)
+        self.assertAPIError(3045, self.api.addTestCaseToTestPlan, self.project_id, self.plan_id, "PRJ-1", 1)
+        self.api.createTestProject("Empty", "EMP")
+        self.assertAPIError(7008, self.api.getFirstLevelTestSuitesForTestProject,
+                            self.api.getTestProjectByName("Empty")['id'])
+
+        # TestCase not linked to another TestPlan
+        self.api.createTestPlan("Other", "Project")
+        other_id = self.api.getTestPlanByName("Other", "Project")[0]['id']
+        self.api.createBuild(other_id, "Build")
+        self.assertAPIError(3030, self.api.reportTCResult, other_id, EXECUTION_STATUS.PASSED,
+                            testcaseid=self.case_ids[0])
+        self.assertAPIError(6000, self.api.reportTCResult, self.plan_id, 'x', testcaseid=self.case_ids[0])
+
+    def test_executions(self):
+        """Reported results"""
+        response = self.api.reportTCResult(self.plan_id, EXECUTION_STATUS.FAILED, testcaseid=self.case_ids[0],
+                                           buildid=self.build_id, notes="Notes", idempotencykey="key")
+        self.assertEqual(response[0]['overwrite'], False)
+        last = self.api.getLastExecutionResult(self.plan_id, self.case_ids[0])[0]
+        self.assertEqual((last['id'], last['status']), (str(response[0]['id']), EXECUTION_STATUS.FAILED))
+        self.assertEqual(self.api.getLastExecutionResult(self.plan_id, self.case_ids[1]), [{'id': -1}])
+
+        # Results with idempotency keys are found again
+        stored = self.api.getReportedResult(self.plan_id, "Notes", testcaseid=self.case_ids[0], idempotencykey="key")
+        self.assertEqual(int(stored['id']), response[0]['id'])
+        self.assertEqual(self.api.getReportedResult(self.plan_id, "Notes", testcaseid=self.case_ids[0],
+                                                    idempotencykey="other"), None)
+
+        self.api.reportTCResult(self.plan_id, EXECUTION_STATUS.PASSED, testcaseid=self.case_ids[0], overwrite=True)
+        self.assertEqual(self.api.getExecutions(self.plan_id, self.case_ids[0]).keys(), [str(response[0]['id'])])
+        counters = self.api.getExecCountersByBuild(self.plan_id)['raw']['with_tester'][str(self.build_id)]
+        self.assertEqual((counters['p']['exec_qty'], counters['n']['exec_qty']), ("1", "1"))
+
+        self.api.deleteExecution(response[0]['id'])
+        self.assertEqual(self.api.getExecutions(self.plan_id, self.case_ids[0]), [])
+
+    def test_multicall(self):
+        """Several queries within a single request"""
+        requests = self.server.requests
+        multicall = self.api.multicall()
+        for case_id in self.case_ids:
+            multicall.getTestCase(testcaseid=case_id)
+        multicall.getTestCase(testcaseid=99)
+        first, second, unknown = multicall()
+        self.assertEqual([first[0]['name'], second[0]['name']], ["First", "Second"])
+        self.assertEqual(unknown.error_code, FakeTestlink.INVALID_TCASEID)
+        self.assertEqual(self.server.requests, requests + 1)
+        self.assertEqual(self.server.testlink.calls['tl.getTestCase'], 3)
+
+    def test_objects(self):
+        """Object layer end-to-end"""
+        self.server.testlink.addCustomField("Component")
+        self.server.testlink.addKeyword(self.case_ids[0], "Smoke")
+        self.api.updateTestCaseCustomFieldDesignValue("PRJ-1", 1, self.project_id, {'Component': "Core"})
+
+        testlink = Testlink(self.server.url, FakeTestlink.DEVKEY)
+        project = testlink.getTestProject("Project")
+        self.assertEqual(project.prefix, "PRJ")
+        self.assertEqual(project.getTestSuite().name, "Suite")
+        case = project.getTestCase("Second")
+        self.assertEqual((case.tc_id, case.external_id), (self.case_ids[1], 2))
+        self.assertEqual(case.getTestSuite().id, self.suite_id)
+
+        plan = project.getTestPlan("Plan")
+        build = plan.getBuild("Build")
+        cases = sorted(plan.getTestCase(), key=lambda c: c.tc_id)
+        self.assertEqual([c.name for c in cases], ["First", "Second"])
+        self.assertEqual([s.actions for s in cases[0].steps], ["Do"])
+        self.assertEqual([k.name for k in cases[0].keywords], ["Smoke"])
+        self.assertEqual(plan.getTestCase(Component="Core").name, "First")
+
+        execution = cases[0].reportResult(plan.id, build.id, EXECUTION_STATUS.BLOCKED, fetch=True)
+        self.assertEqual(execution.status, EXECUTION_STATUS.BLOCKED)
+        self.assertEqual(cases[0].getLastExecutionResult(plan.id).id, execution.id)
+        self.assertEqual(len(plan.getExecutionHistory()), 1)
+        status = plan.getStatus(build.id)
+        self.assertEqual(status.breakdown("build_id")[build.id][EXECUTION_STATUS.BLOCKED], 1)
+        self.assertEqual(plan.checkStatus(build.id, status), {})
+
+        self.api.uploadTestCaseAttachment(case.tc_id, "log.txt", "text/plain", base64.b64encode("SPAM!"))
+        attachment = case.getAttachment()
+        self.assertEqual(attachment.getContent().tobytes(), "SPAM!")
+        self.assertTrue(attachment.delete())
+        self.assertEqual(case.getAttachment(), None)
+
+    def test_reportResult(self):
+        """Locally built Executions match the stored ones"""
+        testlink = Testlink(self.server.url, FakeTestlink.DEVKEY)
+        plan = testlink.getTestProject("Project").getTestPlan("Plan")
+        case = plan.getTestCase(name="First")
+        fields = ("id", "testplan_id", "platform_id", "build_id", "tcversion_id", "tcversion_number", "status",
+                  "notes", "execution_type", "duration")
+
+        for idempotency_keys in (False, True):
+            with mock.patch.object(TestlinkXMLRPCAPI, 'IDEMPOTENCY_KEYS', idempotency_keys):
+                local = case.reportResult(self.plan_id, self.build_id, EXECUTION_STATUS.PASSED, notes="Notes",
+                                          execduration=1.5)
+            stored = case.getLastExecutionResult(self.plan_id)
+            self.assertEqual([getattr(local, f) for f in fields], [getattr(stored, f) for f in fields])
+            self.assertTrue(abs(local.execution_ts - stored.execution_ts) < datetime.timedelta(seconds=5))
+            self.assertEqual(local.tester_id, -1)
+        self.assertTrue(stored.notes.startswith("Notes\n[request:"))
+
+    def test_requirements(self):
+        """Requirements and coverage"""
+        spec_id = self.api.createRequirementSpecification(self.project_id, None, "SPEC-1", "Spec", "", 1, 1)[0]['id']
+        req_id = self.api.createRequirement(self.project_id, spec_id, "REQ-1", "Req", "", 1, "V", 1)[0]['id']
+        self.api.createRisk(req_id, "RISK-1", "Risk", "Description", 1)
+        self.api.assignRequirements("PRJ-2", self.project_id, [{'req_spec': spec_id, 'requirements': [req_id]}])
+
+        project = Testlink(self.server.url, FakeTestlink.DEVKEY).getTestProject("Project")
+        spec = project.getRequirementSpecification()
+        self.assertEqual((spec.doc_id, spec.name), ("SPEC-1", "Spec"))
+        requirement = spec.getRequirement()
+        self.assertEqual(requirement.req_doc_id, "REQ-1")
+        self.assertEqual(requirement.getRisk().name, "Risk")
+        self.assertEqual(requirement.getCoverage().tc_id, self.case_ids[1])
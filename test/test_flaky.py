@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. codeauthor:: Kai Borowiak
+
+TestSuite for testlink.flaky
+"""
+
+# IMPORTS
+import os
+import shutil
+import tempfile
+import unittest
+
+from testlink.columns import ExecutionHistory
+from testlink.flaky import FlakinessAnalyzer
+
+
+def executions(statuses, build_size=2, start=1):
+    """Returns raw executions with the specified status, build_size executions per build"""
+    return [{'id': str(start + i), 'build_id': str(1 + (start + i - 1) // build_size), 'platform_id': '0',
+             'status': status, 'execution_ts': "2020-01-01 10:00:00"} for i, status in enumerate(statuses)]
+
+
+class FlakinessAnalyzerTests(unittest.TestCase):
+    """Tests for incremental flakiness analysis"""
+
+    def __init__(self, *args, **kwargs):
+        super(FlakinessAnalyzerTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'FlakinessAnalyzer: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_scores(self):
+        """Flip and retry rates"""
+        analyzer = FlakinessAnalyzer()
+        history = ExecutionHistory()
+        history.extend(1, executions("pppppppp"))
+        history.extend(2, executions("fpfpfpfp"))
+        history.extend(3, executions("ppffbfff"))
+        self.assertEqual(analyzer.update(history), 24)
+
+        stable, flaky, broken = analyzer[(1, 0)], analyzer[(2, 0)], analyzer[(3, 0)]
+        self.assertEqual((stable.flip_rate, stable.retry_rate, stable.score), (0.0, 0.0, 0.0))
+        self.assertEqual((flaky.runs, flaky.flips, flaky.failed_builds, flaky.retried_builds), (8, 7, 4, 4))
+        self.assertEqual(flaky.flip_rate, 1.0)
+        self.assertEqual(flaky.retry_rate, 1.0)
+        self.assertEqual((broken.runs, broken.flips, broken.failed_builds, broken.retried_builds), (7, 1, 3, 0))
+        self.assertEqual([key for key, _ in analyzer.flaky()], [(2, 0), (3, 0)])
+        self.assertEqual([key for key, _ in analyzer.flaky(threshold=0.3)], [(2, 0)])
+        self.assertEqual(analyzer.flaky(min_runs=10), [])
+
+    def test_incremental(self):
+        """Incremental updates"""
+        raw = executions("fpfpffpp")
+        full = FlakinessAnalyzer()
+        self.assertEqual(full.extend(1, raw), 8)
+
+        analyzer = FlakinessAnalyzer()
+        self.assertEqual(analyzer.extend(1, raw[:5]), 5)
+        self.assertEqual(analyzer.extend(1, raw), 3)
+        self.assertEqual(analyzer.extend(1, raw), 0)
+        self.assertEqual(analyzer[(1, 0)].as_list(), full[(1, 0)].as_list())
+
+    def test_update_order(self):
+        """History is processed in order of execution IDs"""
+        raw = executions("fpfpffpp")
+        # Clock of the server has been set back
+        for i, execution in enumerate(raw):
+            execution['execution_ts'] = "2020-01-01 10:00:%02d" % ((i + 4) % 8)
+        history = ExecutionHistory()
+        history.extend(1, raw)
+        history = history.sort("tc_id", "timestamp", "execution_id")
+
+        full = FlakinessAnalyzer()
+        full.extend(1, raw)
+        analyzer = FlakinessAnalyzer()
+        self.assertEqual(analyzer.update(history), 8)
+        self.assertEqual(analyzer.update(history), 0)
+        self.assertEqual(analyzer[(1, 0)].as_list(), full[(1, 0)].as_list())
+
+    def test_dump(self):
+        """Storing and loading the state"""
+        path = os.path.join(self.tmpdir, "flaky.json")
+        self.assertEqual(len(FlakinessAnalyzer.load(path)), 0)
+
+        raw = executions("fpfpffpp")
+        analyzer = FlakinessAnalyzer(decay=0.5)
+        analyzer.extend(1, raw[:4])
+        analyzer.dump(path)
+
+        loaded = FlakinessAnalyzer.load(path)
+        self.assertEqual(list(loaded), [(1, 0)])
+        self.assertEqual(loaded.extend(1, raw), 4)
+        analyzer.extend(1, raw)
+        self.assertEqual(loaded[(1, 0)].as_list(), analyzer[(1, 0)].as_list())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: TestSuite for testlink.metrics
+"""
+
+# IMPORTS
+import unittest
+from testlink.metrics import Histogram
+from testlink.metrics import RateMeter
+from testlink.metrics import ServerMetrics
+
+
+class HistogramTests(unittest.TestCase):
+    """Tests of Histogram implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(HistogramTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "Histogram: " + self._testMethodDoc
+
+    def test_observe(self):
+        """Cumulative buckets"""
+        hist = Histogram((1, 0.5))
+        for value in (0.1, 0.5, 0.7, 3):
+            hist.observe(value)
+        self.assertEqual(hist.cumulative(), [(0.5, 2), (1, 3), (float('inf'), 4)])
+        self.assertEqual(hist.as_dict(), {'count': 4, 'sum': 4.3, 'buckets': {'0.5': 2, '1': 3, '+Inf': 4}})
+
+
+class RateMeterTests(unittest.TestCase):
+    """Tests of RateMeter implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(RateMeterTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "RateMeter: " + self._testMethodDoc
+
+    def test_rate(self):
+        """Sliding window"""
+        meter = RateMeter(window=10)
+        meter._started = 1000.0
+        for i in xrange(20):
+            meter.mark(1000.0 + i * 0.5)
+        self.assertEqual(meter.rate(1004.0), 2.5)
+        # Events older than the window are dropped
+        self.assertEqual(meter.rate(1010.0), 1.8)
+        self.assertEqual(meter.rate(1015.0), 0.8)
+        self.assertEqual(meter.rate(1030.0), 0.0)
+
+
+class ServerMetricsTests(unittest.TestCase):
+    """Tests of ServerMetrics implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(ServerMetricsTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "ServerMetrics: " + self._testMethodDoc
+
+    def test_metrics(self):
+        """Requests, errors and callbacks"""
+        metrics = ServerMetrics()
+        with metrics.request("executeTestCase"):
+            with metrics.callback():
+                pass
+        try:
+            with metrics.request("executeTestCase"):
+                with metrics.callback():
+                    raise ValueError()
+        except ValueError:
+            pass
+
+        data = metrics.as_dict()
+        self.assertEqual(data['requests'], {'executeTestCase': 2})
+        self.assertEqual(data['request_errors'], {'executeTestCase': 1})
+        self.assertEqual((data['callbacks'], data['callback_errors'], data['callbacks_active']), (2, 1, 0))
+        self.assertEqual(data['callback_latency']['buckets']['+Inf'], 2)
+
+        text = metrics.render({'queue_depth': 3})
+        self.assertIn('testlink_server_requests_total{method="executeTestCase"} 2\n', text)
+        self.assertIn('testlink_server_request_errors_total{method="executeTestCase"} 1\n', text)
+        self.assertIn('testlink_server_callback_duration_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("# TYPE testlink_server_queue_depth gauge\ntestlink_server_queue_depth 3\n", text)
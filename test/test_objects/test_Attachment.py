@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: TestCase for testlink.objects.Attachment
+"""
+
+# IMPORTS
+import os
+import base64
+import unittest
+import StringIO
+import mock
+from testlink.objects.tl_attachment import Attachment
+from testlink.objects.tl_attachment import iter_attachments
+
+
+class AttachmentTests(unittest.TestCase):
+    """Attachment Object Tests"""
+
+    def __init__(self, *args, **kwargs):
+        super(AttachmentTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "Attachment: " + self._testMethodDoc
+
+    def test_content(self):
+        """Lazily decoded content"""
+        for data in ("", "a", "ab", "abc", os.urandom(1001)):
+            obj = Attachment(title="Log", file_type="text/plain", content=base64.b64encode(data), name="log.txt")
+            self.assertEqual(obj.size, len(data))
+            self.assertEqual(obj.getContent().tobytes(), data)
+            with mock.patch.object(Attachment, 'CHUNK_SIZE', 8):
+                self.assertEqual("".join(obj.iterContent()), data)
+
+            target = StringIO.StringIO()
+            self.assertEqual(obj.save(target, release=True), len(data))
+            self.assertEqual(target.getvalue(), data)
+            self.assertRaises(ValueError, getattr, obj, 'content')
+            self.assertEqual(obj.file_name, "log.txt")
+            self.assertEqual(obj.size, len(data))
+
+        wrapped = Attachment(title="Log", file_type="text/plain", content=base64.encodestring("x" * 100))
+        self.assertEqual(wrapped.size, 100)
+
+    def test_iter_attachments(self):
+        """Metadata only listing"""
+        response = {'1': {'id': 1, 'name': "a.txt", 'title': "A", 'file_type': "text/plain",
+                          'content': base64.b64encode("foo")},
+                    '2': {'id': 2, 'name': "b.txt", 'title': "B", 'file_type': "text/plain",
+                          'content': base64.b64encode("bar")}}
+        attachments = list(iter_attachments(dict(response), None, content=False))
+        self.assertEqual(sorted(a.title for a in attachments), ["A", "B"])
+        self.assertRaises(ValueError, attachments[0].iterContent().next)
+        self.assertEqual([a.size for a in attachments], [3, 3])
+
+        records = dict(response)
+        matching = list(iter_attachments(records, None, title="B"))
+        self.assertEqual(len(matching), 1)
+        self.assertEqual(matching[0].getContent().tobytes(), "bar")
+        self.assertEqual(records, response)
@@ -10,9 +10,17 @@
 import random
 import string
 import unittest
+import datetime
 from mock import patch, Mock
 
+from testlink.objects.tl_object import TestlinkObject
 from testlink.objects.tl_testcase import TestCase
+from testlink.objects.tl_testcase import load_keywords
+from testlink.objects.tl_testcase import prefetch
+from testlink.objects.tl_testcase import decode_steps
+from testlink.objects.tl_step import Step
+from testlink.objects.tl_keyword import Keyword
+from testlink.enums import EXECUTION_TYPE
 
 
 def randput(length=10): return "".join([random.choice(string.letters) for _ in xrange(random.randint(1, length))])
@@ -41,3 +49,111 @@ class TestCaseTests(unittest.TestCase):
         obj = TestCase(name=name, external_id=ext_id)
         _string = str(obj)
         self.assertEqual(_string, "Testcase %s-%s: %s" % (project.prefix, ext_id, name))
+
+    def test_lazy_decoding(self):
+        """Lazy decoding of raw values"""
+        timestamp = "2020-10-20 12:34:45"
+        steps = [{'step_number': str(i), 'actions': randput(), 'expected_results': randput()} for i in xrange(3)]
+        keywords = {'1': {'keyword_id': '1', 'testcase_id': '2', 'keyword': randput()}}
+
+        obj = TestCase(id=2, tcversion_id=3, creation_ts=timestamp, linked_ts=randput(), steps=steps,
+                       keywords=keywords)
+
+        # Raw values are kept until first access
+        self.assertEqual(obj._creation_ts, timestamp)
+        self.assertEqual(obj._keywords, keywords)
+
+        # Typed values on access
+        self.assertEqual(obj.creation_ts, datetime.datetime.strptime(timestamp, TestlinkObject.DATETIME_FORMAT))
+        self.assertEqual(obj.linked_ts, None)
+        self.assertEqual(obj.modification_ts, None)
+        self.assertTrue(all(isinstance(step, Step) for step in obj.steps))
+        self.assertEqual([step.step_number for step in obj.steps], [0, 1, 2])
+        self.assertTrue(all(isinstance(keyword, Keyword) for keyword in obj.keywords))
+        self.assertEqual(obj.keywords, [keywords['1']['keyword']])
+
+    def test_decode_steps(self):
+        """Decoding of empty steps"""
+        for steps in (None, '', [], {}):
+            self.assertEqual(decode_steps(steps), [])
+        obj = TestCase(id=2, tcversion_id=3, steps='')
+        self.assertEqual(obj.steps, [])
+
+    def test_slots(self):
+        """No instance dictionary"""
+        obj = TestCase(id=2, tcversion_id=3, steps=[{'step_number': '1'}])
+        self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertFalse(hasattr(obj.steps[0], '__dict__'))
+        self.assertRaises(AttributeError, setattr, obj, "undeclared", None)
+
+    def test_load_keywords(self):
+        """Batch keyword loading"""
+        api = Mock()
+        suites = {1: [{'id': '10', 'tcversion_id': '11', 'keywords': {'1': {'keyword_id': '1', 'testcase_id': '10',
+                                                                            'keyword': 'a'}}},
+                      {'id': '20', 'tcversion_id': '21'}],
+                  2: [{'id': '30', 'tcversion_id': '31', 'keywords': {'2': {'keyword_id': '2', 'testcase_id': '30',
+                                                                            'keyword': 'b'}}}]}
+        api.getTestCasesForTestSuite.side_effect = lambda suite_id, **_: suites[suite_id]
+
+        cases = [TestCase(tc_id=tc_id, tcversion_id=tc_id + 1, testsuite_id=suite_id, api=api)
+                 for tc_id, suite_id in ((10, 1), (20, 1), (30, 2))]
+        self.assertEqual(load_keywords(cases), cases)
+
+        # One request per TestSuite
+        self.assertEqual(api.getTestCasesForTestSuite.call_count, 2)
+        self.assertEqual([c.keywords for c in cases], [['a'], [], ['b']])
+        self.assertEqual(api.getTestCasesForTestSuite.call_count, 2)
+
+    def test_prefetch(self):
+        """Bulk prefetch of lazy loaded fields"""
+        api = Mock()
+        multicall = Mock()
+        multicall.return_value = [[{'id': str(tc_id + 1), 'testcase_id': str(tc_id), 'version': '1',
+                                    'preconditions': randput(), 'steps': [{'step_number': '1'}],
+                                    'estimated_exec_duration': '1.5', 'testsuite_id': '7'}] for tc_id in (10, 20)]
+        api.multicall.return_value = multicall
+
+        cases = [TestCase(tc_id=tc_id, tcversion_id=tc_id + 1, platform_id=platform_id, api=api)
+                 for tc_id, platform_id in ((10, 1), (10, 2), (20, 1))]
+        self.assertRaises(ValueError, prefetch, cases, ["foo"])
+        self.assertEqual(prefetch(cases, ["steps", "preconditions", "exec_duration"]), cases)
+
+        # Each TestCase version is retrieved once
+        self.assertEqual(multicall.getTestCase.call_count, 2)
+        self.assertEqual(multicall.call_count, 1)
+        self.assertEqual([c.exec_duration for c in cases], [1.5] * 3)
+        self.assertEqual([c.testsuite_id for c in cases], [7] * 3)
+        self.assertEqual([len(c.steps) for c in cases], [1] * 3)
+        self.assertEqual(cases[0].preconditions, cases[1].preconditions)
+
+        # Nothing left to load
+        prefetch(cases, ["steps", "preconditions", "exec_duration"])
+        self.assertEqual(multicall.call_count, 1)
+
+    def test_reportResult(self):
+        """Report result without fetching the Execution"""
+        api = Mock()
+        api.IDEMPOTENCY_KEYS = False
+        api.reportTCResult.return_value = [{'id': '42', 'status': True, 'operation': 'reportTCResult'}]
+        api.getExecutions.return_value = {'42': {'id': '42', 'status': 'p', 'tester_id': '7'},
+                                          '41': {'id': '41', 'status': 'f', 'tester_id': '8'}}
+        obj = TestCase(tc_id=10, tcversion_id=11, version=3, platform_id=5, api=api)
+
+        execution = obj.reportResult(1, 2, 'p', notes="notes", execduration=1.5)
+        self.assertFalse(api.getExecutions.called)
+        self.assertEqual(execution.id, 42)
+        self.assertEqual((execution.testplan_id, execution.build_id, execution.platform_id), (1, 2, 5))
+        self.assertEqual((execution.tcversion_id, execution.tcversion_number), (11, 3))
+        self.assertEqual((execution.status, execution.notes, execution.duration), ('p', "notes", 1.5))
+        self.assertEqual(execution.execution_type, EXECUTION_TYPE.AUTOMATIC)
+        self.assertTrue(isinstance(execution.execution_ts, datetime.datetime))
+
+        # Tester is unknown locally
+        self.assertEqual(execution.tester_id, -1)
+        self.assertFalse(api.getExecutions.called)
+
+        # Explicitly fetch stored Execution
+        execution = obj.reportResult(1, 2, 'p', fetch=True)
+        self.assertEqual((execution.id, execution.tester_id), (42, 7))
+        self.assertEqual(api.getExecutions.call_count, 1)
@@ -10,7 +10,11 @@
 import random
 import string
 import unittest
+import mock
 from testlink.objects.tl_testplan import TestPlan
+from testlink.objects.tl_testcase import TestCase
+from testlink.enums import SHARD_STRATEGY
+from testlink.exceptions import APIError
 
 
 def randput(length=10): return "".join([random.choice(string.letters) for _ in xrange(random.randint(1, length))])
@@ -29,3 +33,136 @@ class TestPlanTests(unittest.TestCase):
         obj = TestPlan(name=name)
         _string = str(obj)
         self.assertEqual(_string, "TestPlan: %s" % name)
+
+    @mock.patch('random.shuffle')
+    @mock.patch('testlink.objects.tl_testplan.TestCase', wraps=TestCase)
+    def test_iterTestCase_lazy(self, patched_testcase, _patched_shuffle):
+        """'iterTestCase' - Lazy object construction"""
+        api = mock.Mock()
+        api.getTestCasesForTestPlan.return_value = dict((str(i), [{'tc_id': str(i), 'tcversion_id': str(i + 1000),
+                                                                   'name': "case-%d" % i}]) for i in xrange(100))
+        plan = TestPlan(name=randput(), parent_testproject=mock.Mock(), api=api)
+
+        # Only the first TestCase is initialised
+        case = plan.iterTestCase().next()
+        self.assertEqual(patched_testcase.call_count, 1)
+
+        # Initialisation stops after the first match
+        patched_testcase.reset_mock()
+        name = case.name
+        self.assertEqual(plan.iterTestCase(name=name).next().name, name)
+        self.assertEqual(patched_testcase.call_count, 1)
+
+    def test_iterTestCase_prefetch(self):
+        """'iterTestCase' - Prefetch in chunks"""
+        api = mock.Mock()
+        api.getTestCasesForTestPlan.return_value = dict((str(i), [{'tc_id': str(i), 'tcversion_id': str(i + 1000),
+                                                                   'name': "case-%d" % i}]) for i in xrange(250))
+        api.multicall.return_value.return_value = []
+        plan = TestPlan(name=randput(), parent_testproject=mock.Mock(), api=api)
+
+        self.assertEqual(len(list(plan.iterTestCase(prefetch=["steps"]))), 250)
+        self.assertEqual(api.multicall.return_value.call_count, 3)
+        self.assertEqual(api.multicall.return_value.getTestCase.call_count, 250)
+
+    def test_iterTestCase_batch(self):
+        """'iterTestCase' - Load siblings on first lazy access"""
+        api = mock.Mock()
+        api.getTestCasesForTestPlan.return_value = dict((str(i), [{'tc_id': str(i), 'tcversion_id': str(i + 1000),
+                                                                   'version': '1', 'name': "case-%d" % i}])
+                                                        for i in xrange(150))
+        multicall = api.multicall.return_value
+        sent = []
+
+        def respond():
+            # Answer all calls recorded since the last request
+            calls = multicall.getTestCase.call_args_list[len(sent):]
+            sent.extend(calls)
+            return [[{'id': str(kw['testcaseid'] + 1000), 'testcase_id': str(kw['testcaseid']), 'version': '1',
+                      'preconditions': "pre-%d" % kw['testcaseid']}] for _, kw in calls]
+        multicall.side_effect = respond
+        plan = TestPlan(name=randput(), parent_testproject=mock.Mock(), api=api)
+
+        for case in plan.iterTestCase(batched=True):
+            self.assertEqual(case.preconditions, "pre-%d" % case.tc_id)
+
+        # One request per batch, no single lazy loading
+        self.assertEqual(multicall.call_count, 2)
+        self.assertEqual(multicall.getTestCase.call_count, 150)
+        self.assertFalse(plan.getTestProject().getTestCase.called)
+
+        # Disabled by default
+        self.assertTrue(all(case._batch is None for case in plan.iterTestCase()))
+        with mock.patch.object(TestCase, 'AUTO_PREFETCH', True):
+            self.assertFalse(any(case._batch is None for case in plan.iterTestCase()))
+            self.assertTrue(all(case._batch is None for case in plan.iterTestCase(batched=False)))
+        self.assertFalse(any(case._batch is None for case in plan.iterTestCase(prefetch=["steps"], batched=True)))
+
+    def test_shard(self):
+        """'shard' - Deterministic partitioning"""
+        api = mock.Mock()
+        # Plan rows do not contain the estimated duration
+        api.getTestCasesForTestPlan.return_value = dict((str(i), [{'tc_id': str(i), 'tcversion_id': str(i + 1000),
+                                                                   'version': '1', 'name': "case-%d" % i,
+                                                                   'testsuite_id': str(i % 7), 'platform_id': '0',
+                                                                   'exec_status': 'n'}])
+                                                        for i in xrange(100))
+        multicall = api.multicall.return_value
+        sent = []
+
+        def respond():
+            # Answer all calls recorded since the last request
+            calls = multicall.getTestCase.call_args_list[len(sent):]
+            sent.extend(calls)
+            return [[{'id': str(kw['testcaseid'] + 1000), 'testcase_id': str(kw['testcaseid']), 'version': '1',
+                      'estimated_exec_duration': str(kw['testcaseid'] % 13)}] for _, kw in calls]
+        multicall.side_effect = respond
+        plan = TestPlan(name=randput(), parent_testproject=mock.Mock(), api=api)
+
+        for strategy in SHARD_STRATEGY:
+            shards = [[c.tc_id for c in plan.shard(4, i, strategy)] for i in xrange(4)]
+
+            # Shards are disjoint and complete
+            self.assertEqual(sorted(sum(shards, [])), range(100))
+
+            # Result does not depend on the order of the server response
+            self.assertEqual(shards, [[c.tc_id for c in plan.shard(4, i, strategy)] for i in xrange(4)])
+
+        # Suites are not split up
+        for i in xrange(4):
+            suites = set(c.testsuite_id for c in plan.shard(4, i, SHARD_STRATEGY.BY_SUITE))
+            for j in xrange(i + 1, 4):
+                self.assertFalse(suites & set(c.testsuite_id for c in plan.shard(4, j, SHARD_STRATEGY.BY_SUITE)))
+
+        # Durations are balanced
+        multicall.reset_mock()
+        del sent[:]
+        totals = [sum(c.exec_duration for c in plan.shard(4, i, SHARD_STRATEGY.BY_DURATION)) for i in xrange(4)]
+        self.assertTrue(max(totals) - min(totals) <= 12)
+
+        # Durations are loaded in bulk, a single request per shard
+        self.assertEqual(multicall.call_count, 4)
+        self.assertEqual(multicall.getTestCase.call_count, 400)
+        self.assertFalse(plan.getTestProject().getTestCase.called)
+
+        self.assertRaises(ValueError, plan.shard, 4, 4)
+        self.assertRaises(ValueError, plan.shard, 0, 0)
+
+    def test_getExecutionHistory(self):
+        """'getExecutionHistory' - Bulk loading"""
+        api = mock.Mock()
+        api.getTestCasesForTestPlan.return_value = dict((str(i), [{'tc_id': str(i), 'tcversion_id': str(i + 1000),
+                                                                   'name': "case-%d" % i}]) for i in xrange(3))
+        api.multicall.return_value.return_value = [
+            {'1': {'id': '1', 'build_id': '1', 'status': 'p', 'execution_ts': "2020-01-01 10:00:00"}},
+            APIError(3030, "Not linked"),
+            {'2': {'id': '2', 'build_id': '1', 'status': 'f', 'execution_ts': "2020-01-01 10:00:00"},
+             '3': {'id': '3', 'build_id': '2', 'status': 'p', 'execution_ts': "2020-01-02 10:00:00"}}]
+        plan = TestPlan(name=randput(), parent_testproject=mock.Mock(), api=api)
+
+        with mock.patch('random.shuffle'):
+            history = plan.getExecutionHistory()
+        self.assertEqual(api.multicall.return_value.getExecutions.call_count, 3)
+        self.assertEqual(api.multicall.return_value.call_count, 1)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.count_by('status'), {'p': 2, 'f': 1})
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. codeauthor:: Kai Borowiak
+
+TestSuite for testlink.reporter
+"""
+
+# IMPORTS
+import threading
+import unittest
+import mock
+
+from testlink.reporter import ResultReporter
+from testlink.exceptions import APIError
+
+
+class ResultReporterTests(unittest.TestCase):
+    """Tests for asynchronous result reporting"""
+
+    def __init__(self, *args, **kwargs):
+        super(ResultReporterTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'ResultReporter: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.api = mock.Mock()
+        self.sent = []
+        self.arguments = []
+        self.release = threading.Event()
+        self.release.set()
+
+        def multicall():
+            calls = []
+            collector = mock.Mock()
+            collector.reportTCResult.side_effect = lambda **kw: calls.append(kw) or self.arguments.append(kw)
+
+            def send():
+                self.release.wait()
+                self.sent.append(len(calls))
+                return [APIError(1, "failed") if kw['status'] == 'b' else [{'id': kw['testcaseid']}]
+                        for kw in calls]
+            collector.side_effect = send
+            return collector
+        self.api.multicall.side_effect = multicall
+
+    def case(self, tc_id):
+        return mock.Mock(tc_id=tc_id, external_id=tc_id, platform_id=None)
+
+    def test_report(self):
+        """Futures"""
+        with ResultReporter(self.api) as reporter:
+            passed = reporter.report(self.case(1), 2, 3, 'p')
+            blocked = reporter.report(self.case(2), 2, 3, 'b')
+        self.assertTrue(passed.done())
+        self.assertEqual(passed.result(), {'id': 1})
+        self.assertTrue(isinstance(blocked.exception(), APIError))
+        self.assertRaises(APIError, blocked.result)
+        self.assertRaises(RuntimeError, reporter.report, self.case(3), 2, 3, 'p')
+
+        # Notes are left to the API, keys are passed through only
+        self.assertFalse(any('idempotencykey' in kw for kw in self.arguments))
+        with ResultReporter(self.api) as reporter:
+            reporter.send(testplanid=2, testcaseid=4, status='p', idempotencykey="SPAM")
+        self.assertEqual(self.arguments[-1]['idempotencykey'], "SPAM")
+
+    def test_batching(self):
+        """Queued results are sent together"""
+        reporter = ResultReporter(self.api, batch_size=10)
+        self.release.clear()
+        futures = [reporter.report(self.case(i), 2, 3, 'p') for i in xrange(25)]
+        self.release.set()
+        reporter.flush()
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(sum(self.sent), 25)
+        self.assertTrue(max(self.sent) <= 10)
+        self.assertTrue(len(self.sent) < 25)
+        reporter.close()
@@ -7,8 +7,21 @@
 """
 
 # IMPORTS
+import os
+import time
+import threading
+import urllib2
 import unittest
+import mock
+from testlink.enums import EXECUTION_STATUS
+from testlink.enums import JOB_STATUS
 from testlink.server import TestlinkXMLRPCServer
+from testlink.server import TestlinkJobServer
+from testlink.server import ProcessPool
+from testlink.exceptions import WorkerError
+from testlink.exceptions import ExecutionTimeout
+from xmlrpclib import Fault
+from xmlrpclib import MultiCall
 from xmlrpclib import ServerProxy
 
 
@@ -17,6 +30,20 @@ def dummy_callback(val):
     return val
 
 
+def pid_callback(val):
+    """Returns the process ID"""
+    return os.getpid()
+
+
+def failing_callback(val):
+    """Fails depending on the value"""
+    if val == 'sleep':
+        time.sleep(5)
+    elif val == 'crash':
+        os._exit(1)
+    raise ValueError(val)
+
+
 class TestlinkXMLRPCServerTests(unittest.TestCase):
     """Tests of TestlinkXMLRPCServer implementation"""
 
@@ -24,8 +51,276 @@ class TestlinkXMLRPCServerTests(unittest.TestCase):
         super(TestlinkXMLRPCServerTests, self).__init__(*args, **kwargs)
         self._testMethodDoc = "TestlinnkXMLRPCServer: " + self._testMethodDoc
 
+    def wait_idle(self, server):
+        # The client may receive a response before its worker is released
+        for _ in xrange(500):
+            if server.getMetrics()['workers_busy'] == 0:
+                return
+            time.sleep(0.01)
+        self.fail("Workers did not become idle")
+
     def test_rpc_call(self):
         """Call forwarding"""
-        TestlinkXMLRPCServer(dummy_callback)
-        client = ServerProxy("http://127.0.0.1:8080/")
-        self.assertEqual(client.executeTestCase("SPAM!"), "SPAM!")
+        server = TestlinkXMLRPCServer(dummy_callback)
+        try:
+            client = ServerProxy("http://127.0.0.1:8080/")
+            self.assertEqual(client.executeTestCase("SPAM!"), "SPAM!")
+            self.assertEqual(client.executeTestCase("EGGS!"), "EGGS!")
+        finally:
+            server.shutdown()
+        self.assertFalse(server.is_alive())
+
+    def test_batch(self):
+        """Batch calls"""
+        server = TestlinkXMLRPCServer(failing_callback, port=0, workers=2)
+        try:
+            client = ServerProxy("http://127.0.0.1:%d/" % server.port)
+            results = client.executeTestCases(["foo", "bar"])
+            self.assertEqual([r['faultString'] for r in results], ["ValueError: foo", "ValueError: bar"])
+            self.assertEqual(client.executeTestCases([]), [])
+
+            multicall = MultiCall(client)
+            multicall.executeTestCase("foo")
+            multicall.system.listMethods()
+            results = multicall()
+            self.assertRaises(Fault, results.__getitem__, 0)
+            self.assertIn("executeTestCases", results[1])
+        finally:
+            server.shutdown()
+
+    def test_concurrent_calls(self):
+        """Concurrent calls"""
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        def blocking_callback(val):
+            started.release()
+            release.wait(5)
+            return val
+
+        server = TestlinkXMLRPCServer(blocking_callback, port=0, workers=2)
+        results = []
+
+        def call(val):
+            results.append(ServerProxy("http://127.0.0.1:%d/" % server.port).executeTestCase(val))
+        clients = [threading.Thread(target=call, args=(i,)) for i in xrange(2)]
+        for client in clients:
+            client.start()
+
+        # Both calls are running at the same time
+        started.acquire()
+        started.acquire()
+        release.set()
+        for client in clients:
+            client.join()
+        server.shutdown()
+        self.assertEqual(sorted(results), [0, 1])
+
+    def test_concurrent_multicall(self):
+        """Concurrent calls within a multicall"""
+        lock = threading.Lock()
+        started = []
+        overlapping = threading.Event()
+        release = threading.Event()
+
+        def blocking_callback(val):
+            with lock:
+                started.append(val)
+                if len(started) == 2:
+                    overlapping.set()
+            release.wait(5)
+            return val
+
+        server = TestlinkXMLRPCServer(blocking_callback, port=0, workers=2)
+        results = []
+
+        def call():
+            multicall = MultiCall(ServerProxy("http://127.0.0.1:%d/" % server.port))
+            multicall.executeTestCase(0)
+            multicall.executeTestCase(1)
+            multicall.system.multicall([])
+            results.extend(multicall().results)
+        client = threading.Thread(target=call)
+        client.start()
+
+        # Both calls are running at the same time
+        overlapped = overlapping.wait(2)
+        release.set()
+        client.join()
+        server.shutdown()
+        self.assertTrue(overlapped)
+        self.assertEqual(results[:2], [[0], [1]])
+        self.assertEqual(results[2]['faultString'], "Recursive system.multicall forbidden")
+
+    def test_metrics(self):
+        """Metrics and health state"""
+        server = TestlinkXMLRPCServer(failing_callback, port=0, http_metrics=True)
+        try:
+            url = "http://127.0.0.1:%d" % server.port
+            client = ServerProxy(url + "/")
+            self.assertRaises(Fault, client.executeTestCase, "foo")
+            client.executeTestCases(["bar", "baz"])
+            self.wait_idle(server)
+            metrics = client.getMetrics()
+            # The running getMetrics request is not completed yet
+            self.assertEqual(metrics['requests'], {'executeTestCase': 1, 'executeTestCases': 1, 'getMetrics': 0})
+            self.assertEqual(metrics['request_errors']['executeTestCase'], 1)
+            self.assertEqual(metrics['requests_active'], 1)
+            self.assertEqual((metrics['callbacks'], metrics['callback_errors']), (3, 3))
+            self.assertEqual((metrics['workers'], metrics['workers_busy'], metrics['queue_depth']), (4, 1, 0))
+
+            self.assertEqual(urllib2.urlopen(url + "/health").read(), "OK\n")
+            self.wait_idle(server)
+            text = urllib2.urlopen(url + "/metrics").read()
+            self.assertIn('testlink_server_requests_total{method="getMetrics"} 1\n', text)
+            self.assertIn("testlink_server_workers_busy 1\n", text)
+            self.assertRaises(urllib2.HTTPError, urllib2.urlopen, url + "/foo")
+        finally:
+            server.shutdown()
+
+
+class TestlinkJobServerTests(unittest.TestCase):
+    """Tests of TestlinkJobServer implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(TestlinkJobServerTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "TestlinkJobServer: " + self._testMethodDoc
+
+    def setUp(self):
+        self.api = mock.Mock()
+        self.release = threading.Event()
+        self.server = None
+
+    def tearDown(self):
+        self.release.set()
+        if self.server is not None:
+            self.server.shutdown()
+
+    def callback(self, params):
+        self.release.wait(5)
+        if params['testCaseID'] == 3:
+            raise RuntimeError("SPAM!")
+        return {'result': 'p', 'notes': "Case %d" % params['testCaseID']}
+
+    def wait(self, client, job_id, status):
+        for _ in xrange(500):
+            if client.getJobStatus(job_id)['status'] == status:
+                return
+            time.sleep(0.01)
+        self.fail("Job %s did not reach %s" % (job_id, status))
+
+    def test_jobs(self):
+        """Background jobs"""
+        self.server = TestlinkJobServer(self.callback, self.api, port=0, job_workers=1, max_queued_jobs=2)
+        client = ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+
+        params = {'testCaseID': 1, 'testPlanID': 2, 'buildID': 3, 'platformID': 0}
+        response = client.executeTestCase(params)
+        self.assertEqual(response['scheduled'], 'future')
+        first = response['job']
+        self.wait(client, first, JOB_STATUS.RUNNING)
+
+        # Queued jobs can be cancelled, running ones cannot
+        second = client.executeTestCase(dict(params, testCaseID=2))['job']
+        third = client.executeTestCase(dict(params, testCaseID=3))['job']
+        self.assertRaises(Fault, client.executeTestCase, dict(params, testCaseID=4))
+        self.assertTrue(client.cancelJob(second))
+        self.assertFalse(client.cancelJob(first))
+        self.assertRaises(Fault, client.cancelJob, "foo")
+
+        self.release.set()
+        self.wait(client, third, JOB_STATUS.FINISHED)
+        self.assertEqual(client.getJobStatus(first)['status'], JOB_STATUS.FINISHED)
+        self.assertEqual(client.getJobStatus(second)['status'], JOB_STATUS.CANCELLED)
+        self.api.reportTCResult.assert_any_call(testplanid=2, status='p', testcaseid=1, buildid=3, platformid=None,
+                                                notes="Case 1", idempotencykey=first)
+        self.assertEqual(self.api.reportTCResult.call_args[1]['status'], EXECUTION_STATUS.BLOCKED)
+        self.assertEqual(self.api.reportTCResult.call_count, 2)
+
+    def test_batch(self):
+        """Batch scheduling"""
+        self.server = TestlinkJobServer(self.callback, self.api, port=0, job_workers=1, max_queued_jobs=2)
+        client = ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+        results = client.executeTestCases([{'testCaseID': i, 'testPlanID': 2, 'buildID': 3} for i in xrange(4)])
+        self.assertEqual([r.get('scheduled') for r in results][:2], ['future', 'future'])
+        self.assertEqual(results[3]['faultCode'], TestlinkJobServer.FAULT_QUEUE_FULL)
+        self.assertEqual(results[3]['retryAfter'], TestlinkJobServer.RETRY_AFTER)
+
+        # At least one job worker is required
+        self.assertRaises(ValueError, TestlinkJobServer, self.callback, self.api, port=0, job_workers=0)
+
+    def test_lanes(self):
+        """Priority lanes"""
+        self.server = TestlinkJobServer(self.callback, self.api, port=0, job_workers=1,
+                                        lanes=('smoke', 'regression'), lane_limits={'regression': 1})
+        client = ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+        params = {'testCaseID': 1, 'testPlanID': 2, 'buildID': 3, 'lane': 'smoke'}
+        self.wait(client, client.executeTestCase(params)['job'], JOB_STATUS.RUNNING)
+
+        # Unknown lanes are mapped to the lowest priority
+        regression = client.executeTestCase(dict(params, testCaseID=2, lane='unknown'))['job']
+        try:
+            client.executeTestCase(dict(params, testCaseID=4, lane='regression'))
+            self.fail("Full lane accepted a job")
+        except Fault, fault:
+            self.assertEqual(fault.faultCode, TestlinkJobServer.FAULT_QUEUE_FULL)
+            self.assertTrue("retry after" in fault.faultString)
+        client.executeTestCase(dict(params, testCaseID=5))
+
+        stats = client.getQueueStats()
+        self.assertEqual((stats['depth'], stats['running']), (2, 1))
+        self.assertEqual(stats['lanes']['regression'], {'depth': 1, 'limit': 1, 'accepted': 1, 'rejected': 1})
+        self.assertEqual(stats['lanes']['smoke']['accepted'], 2)
+
+        self.release.set()
+        self.wait(client, regression, JOB_STATUS.FINISHED)
+        self.assertEqual([call[1]['testcaseid'] for call in self.api.reportTCResult.call_args_list], [1, 5, 2])
+        stats = client.getQueueStats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertTrue(stats['wait_max'] > 0)
+
+    def test_report_failure(self):
+        """Failed result reports"""
+        self.api.reportTCResult.side_effect = IOError("Connection refused")
+        self.release.set()
+        self.server = TestlinkJobServer(self.callback, self.api, port=0)
+        client = ServerProxy("http://127.0.0.1:%d/" % self.server.port)
+        job_id = client.executeTestCase({'testCaseID': 1, 'testPlanID': 2, 'buildID': 3})['job']
+        self.wait(client, job_id, JOB_STATUS.FAILED)
+        self.assertEqual(client.getJobStatus(job_id)['error'], "Connection refused")
+
+
+class ProcessPoolTests(unittest.TestCase):
+    """Tests of ProcessPool implementation"""
+
+    def __init__(self, *args, **kwargs):
+        super(ProcessPoolTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = "ProcessPool: " + self._testMethodDoc
+
+    def test_recycling(self):
+        """Worker processes are replaced after max_jobs"""
+        with ProcessPool(size=1, max_jobs=2) as pool:
+            pids = [pool.call(pid_callback, (None,)) for _ in xrange(3)]
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_failures(self):
+        """Failing callbacks"""
+        with ProcessPool(size=1, timeout=0.5) as pool:
+            self.assertRaises(WorkerError, pool.call, failing_callback, ("foo",))
+            self.assertRaises(ExecutionTimeout, pool.call, failing_callback, ("sleep",))
+            self.assertRaises(WorkerError, pool.call, failing_callback, ("crash",))
+            # Broken workers have been replaced
+            self.assertEqual(pool.call(dummy_callback, ("SPAM!",)), "SPAM!")
+        self.assertRaises(RuntimeError, pool.call, dummy_callback, ("SPAM!",))
+
+    def test_server(self):
+        """Server callbacks within worker processes"""
+        with ProcessPool(size=2) as pool:
+            server = TestlinkXMLRPCServer(pid_callback, port=0, pool=pool)
+            try:
+                client = ServerProxy("http://127.0.0.1:%d/" % server.port)
+                self.assertNotEqual(client.executeTestCase("SPAM!"), os.getpid())
+            finally:
+                server.shutdown()
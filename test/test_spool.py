@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. codeauthor:: Kai Borowiak
+
+TestSuite for testlink.spool
+"""
+
+# IMPORTS
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+from testlink.spool import ResultSpool
+from testlink.exceptions import APIError
+
+
+class ResultSpoolTests(unittest.TestCase):
+    """Tests for the local result spool"""
+
+    def __init__(self, *args, **kwargs):
+        super(ResultSpoolTests, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'ResultSpool: ' + self._testMethodDoc
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "results.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_append(self):
+        """Recording and crash safety"""
+        with ResultSpool(self.path, sync_interval=2) as spool:
+            case = mock.Mock(tc_id=1, external_id=2, platform_id=None)
+            key = spool.report(case, 3, 4, 'p')
+            spool.append(testplanid=3, status='f')
+            spool.ack(key)
+
+        # Incomplete last line
+        with open(self.path, 'ab') as spool:
+            spool.write('{"key": "foo", "rep')
+
+        with ResultSpool(self.path) as spool:
+            spool.append(testplanid=3, status='b')
+            pending = spool.pending()
+            self.assertEqual([arguments['status'] for _, arguments in pending], ['f', 'b'])
+
+            # Compaction keeps pending records only
+            spool.compact()
+            self.assertEqual(spool.pending(), pending)
+        with open(self.path, 'rb') as spool:
+            self.assertEqual(len(spool.readlines()), 2)
+
+    def test_replay(self):
+        """Replay"""
+        api = mock.Mock()
+
+        def multicall():
+            calls = []
+            collector = mock.Mock()
+            collector.reportTCResult.side_effect = lambda **kw: calls.append(kw)
+            collector.side_effect = lambda: [APIError(1, "failed") if kw['status'] == 'b' else [{'id': 1}]
+                                             for kw in calls]
+            return collector
+        api.multicall.side_effect = multicall
+
+        progress = mock.Mock()
+        with ResultSpool(self.path) as spool:
+            for status in "pfbp":
+                spool.append(testplanid=3, status=status)
+            self.assertEqual(spool.replay(api, workers=2, progress=progress), (3, 1))
+            self.assertEqual(progress.call_count, 4)
+            progress.assert_called_with(4, 4)
+
+            # Sent records are not replayed again
+            self.assertEqual([arguments['status'] for _, arguments in spool.pending()], ['b'])
+
+    def test_replay_attempted(self):
+        """Interrupted replay is verified"""
+        api = mock.Mock()
+        api.getReportedResult.side_effect = lambda **kw: {'id': 1} if kw['status'] == 'p' else None
+        api.multicall.return_value.return_value = [[{'id': 2}]]
+
+        with ResultSpool(self.path) as spool:
+            for status in "pf":
+                spool.attempt(spool.append(testplanid=3, status=status))
+            self.assertEqual(spool.replay(api), (2, 0))
+
+        # Only the result, which has not been stored, is sent again
+        self.assertEqual(api.multicall.return_value.reportTCResult.call_count, 1)
+        kwargs = api.multicall.return_value.reportTCResult.call_args[1]
+        self.assertEqual(kwargs['status'], 'f')
+        self.assertTrue(kwargs['idempotencykey'])
+
+    def test_replay_unverified(self):
+        """Attempted records are not sent without verification"""
+        api = mock.Mock()
+        api.getReportedResult.side_effect = IOError("Connection refused")
+
+        with ResultSpool(self.path) as spool:
+            key = spool.append(testplanid=3, status='p')
+            spool.attempt(key)
+            self.assertEqual(spool.replay(api), (0, 1))
+            self.assertEqual([k for k, _ in spool.pending()], [key])
+        self.assertFalse(api.multicall.return_value.reportTCResult.called)
+
+    def test_attempt_sync(self):
+        """Attempts are synchronised before sending"""
+        with ResultSpool(self.path) as spool:
+            key = spool.append(testplanid=3, status='p')
+            with mock.patch('os.fsync') as fsync:
+                spool.attempt(key)
+                self.assertEqual(fsync.call_count, 1)
+
+    def test_compact_attempted(self):
+        """Compaction keeps attempts of pending records"""
+        api = mock.Mock()
+        api.getReportedResult.return_value = {'id': 1}
+
+        with ResultSpool(self.path) as spool:
+            key = spool.append(testplanid=3, status='p')
+            spool.ack(spool.append(testplanid=3, status='f'))
+            # Crash while sending the first record
+            spool.attempt(key)
+            spool.compact()
+            self.assertEqual(spool.attempted(), set([key]))
+            self.assertEqual(spool.replay(api), (1, 0))
+
+        # Result had been stored already, nothing is sent again
+        self.assertEqual(api.getReportedResult.call_args[1]['idempotencykey'], key)
+        self.assertFalse(api.multicall.return_value.reportTCResult.called)
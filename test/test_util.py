@@ -11,6 +11,7 @@ TestSuite for testlink.util
 import unittest
 
 from testlink.util import lazy
+from testlink.util import decoded
 
 class LazyLoadingTest(unittest.TestCase):
     """Tests for LazyLoading Decorator"""
@@ -100,3 +101,41 @@ class LazyLoadingTest(unittest.TestCase):
         # Access attribute first time
         # Check that loader has NOT been called
         self.assertEqual(testclass.attribute, testobject)
+
+
+class DecodedPropertyTest(unittest.TestCase):
+    """Tests for lazy decoding properties"""
+
+    def __init__(self, *args, **kwargs):
+        super(DecodedPropertyTest, self).__init__(*args, **kwargs)
+        self._testMethodDoc = 'Decoded: ' + self._testMethodDoc
+
+    def test_decoding(self):
+        """Decoding on first access"""
+        calls = []
+
+        def decoder(value):
+            calls.append(value)
+            if isinstance(value, str):
+                return int(value)
+            return value
+
+        # Generate Testclass as closure
+        class TestClass(object):
+            attribute = decoded('_attribute', decoder)
+
+            def __init__(self):
+                self._attribute = "42"
+
+        # Check that nothing has been decoded yet
+        testclass = TestClass()
+        self.assertEqual(testclass._attribute, "42")
+        self.assertEqual(calls, [])
+
+        # Access attribute, raw value is replaced
+        self.assertEqual(testclass.attribute, 42)
+        self.assertEqual(testclass._attribute, 42)
+
+        # Setting the attribute overwrites the value
+        testclass.attribute = "23"
+        self.assertEqual(testclass.attribute, 23)
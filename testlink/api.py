@@ -32,10 +32,27 @@ API Wrapper for Testlink XML-RPC/REST API.
       >>> @TLVersion("1.9.11-alpha", strict=1)
       >>> def function3():
       >>>     pass
+
+.. class:: Base64File(source)
+
+  Contents of a local file, which are base64 encoded chunk by chunk while
+  being sent. Can be passed as ``content`` to all upload methods, so large
+  attachments are never held in memory.
+
+  :param source: Path or file object of the file
 """
 
 # IMPORTS
+import os
+import re
+import sys
+import mmap
+import stat
+import uuid
+import base64
 import socket
+import hashlib
+import urllib
 import xmlrpclib
 import time
 
@@ -74,12 +91,204 @@ def TLVersion(version, strict=False):
     return decorate
 
 
+def _empty_as_none(resp):
+    """Returns None for an empty response"""
+    if resp is not None and len(resp) == 0:
+        return None
+    return resp
+
+
+class Base64File(object):
+    """Contents of a local file, base64 encoded on demand
+
+    .. data:: CHUNK_SIZE
+
+       Amount of bytes encoded at once, multiple of 3 so the encoded chunks can be concatenated
+    """
+
+    __slots__ = ("_path", "_file", "_offset", "_size")
+
+    CHUNK_SIZE = 3 * 256 * 1024  # Bytes encoded at once
+
+    def __init__(self, source):
+        """Initialises the contents of the specified file
+        @param source: Path of the file or file object opened in binary mode
+        @type source: str or file
+        """
+        if isinstance(source, basestring):
+            self._path = source
+            self._file = None
+            self._offset = 0
+            self._size = os.path.getsize(source)
+        else:
+            # Send from the current position on
+            self._path = getattr(source, 'name', None)
+            self._file = source
+            self._offset = source.tell()
+            source.seek(0, os.SEEK_END)
+            self._size = source.tell() - self._offset
+            source.seek(self._offset)
+
+    def __repr__(self):
+        return "<Base64File: %s [%d Bytes]>" % (self._path or "<stream>", self._size)
+
+    @property
+    def size(self):
+        """Size of the raw contents"""
+        return self._size
+
+    @property
+    def encoded_size(self):
+        """Size of the base64 encoded contents"""
+        return (self._size + 2) // 3 * 4
+
+    def __iter__(self):
+        """Iterates over the base64 encoded contents chunk by chunk"""
+        for chunk in self.iterRaw():
+            yield base64.b64encode(chunk)
+
+    def digest(self, algorithm="sha1"):
+        """Returns the hash of the raw contents
+        @param algorithm: Name of the hash algorithm, see hashlib
+        @type algorithm: str
+        @rtype: str
+        """
+        h = hashlib.new(algorithm)
+        for chunk in self.iterRaw():
+            h.update(chunk)
+        return h.hexdigest()
+
+    def iterRaw(self):
+        """Iterates over the raw contents chunk by chunk.
+        Regular files are memory mapped chunk by chunk, other file objects are read.
+        A chunk is only valid until the next one is requested.
+        """
+        if self._size == 0:
+            return
+        if self._file is None:
+            with open(self._path, 'rb') as f:
+                for chunk in self._read(f, 0):
+                    yield chunk
+        else:
+            for chunk in self._read(self._file, self._offset):
+                yield chunk
+
+    def _read(self, f, offset):
+        """Reads the contents of an opened file"""
+        try:
+            fileno = f.fileno()
+            mapped = stat.S_ISREG(os.fstat(fileno).st_mode)
+        except (AttributeError, IOError, ValueError):
+            mapped = False
+
+        end = offset + self._size
+        if mapped:
+            # Map one chunk at a time, so the resident memory stays constant
+            for start in xrange(offset, end, self.CHUNK_SIZE):
+                stop = min(start + self.CHUNK_SIZE, end)
+                base = start - start % mmap.ALLOCATIONGRANULARITY
+                try:
+                    data = mmap.mmap(fileno, stop - base, access=mmap.ACCESS_READ, offset=base)
+                except ValueError:
+                    raise IOError("File has been truncated while sending")
+                try:
+                    yield buffer(data, start - base)
+                finally:
+                    data.close()
+        else:
+            # No regular file, read chunk by chunk
+            f.seek(offset)
+            remaining = self._size
+            while remaining > 0:
+                chunk = f.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise IOError("File has been truncated while sending")
+                remaining -= len(chunk)
+                yield chunk
+
+
+class StreamingMarshaller(xmlrpclib.Marshaller):
+    """Marshaller, which keeps Base64File values instead of encoding them"""
+
+    dispatch = dict(xmlrpclib.Marshaller.dispatch)
+
+    def dump_base64_file(self, value, write):
+        # Testlink expects base64 contents as string
+        write("<value><string>")
+        write(value)
+        write("</string></value>\n")
+    dispatch[Base64File] = dump_base64_file
+
+    def dumps(self, values):
+        """Returns the marshalled values as list of strings and Base64File objects"""
+        out = []
+        write = out.append
+        write("<params>\n")
+        for v in values:
+            write("<param>\n")
+            self._Marshaller__dump(v, write)
+            write("</param>\n")
+        write("</params>\n")
+
+        # Merge consecutive strings
+        parts = []
+        for part in out:
+            if isinstance(part, basestring) and len(parts) > 0 and isinstance(parts[-1], basestring):
+                parts[-1] += part
+            else:
+                parts.append(part)
+        return parts
+
+
 class ThreadSafeTransport(xmlrpclib.Transport):
     def make_connection(self, host):
         # Disable connection caching in Python >= 2.7
         self._connection = None
         return xmlrpclib.Transport.make_connection(self, host)
 
+    def stream_request(self, host, handler, parts, verbose=0):
+        """Sends a request body consisting of strings and Base64File objects.
+        The contents of the files are encoded while being sent.
+        @param parts: Request body
+        @type parts: list
+        @returns: Server response
+        @rtype: tuple
+        """
+        length = sum(part.encoded_size if isinstance(part, Base64File) else len(part) for part in parts)
+
+        h = self.make_connection(host)
+        if verbose:
+            h.set_debuglevel(1)
+
+        try:
+            self.send_request(h, handler, None)
+            self.send_host(h, host)
+            self.send_user_agent(h)
+            h.putheader("Content-Type", "text/xml")
+            h.putheader("Content-Length", str(length))
+            h.endheaders()
+            for part in parts:
+                if isinstance(part, Base64File):
+                    for chunk in part:
+                        h.send(chunk)
+                else:
+                    h.send(part)
+
+            response = h.getresponse(buffering=True)
+            if response.status == 200:
+                self.verbose = verbose
+                return self.parse_response(response)
+        except xmlrpclib.Fault:
+            raise
+        except Exception:
+            self.close()
+            raise
+
+        # Discard any response data and raise exception
+        if response.getheader("content-length", 0):
+            response.read()
+        raise xmlrpclib.ProtocolError(host + handler, response.status, response.reason, response.msg)
+
 
 class TestlinkXMLRPCAPI(object):
     """Proxy class for Testlink's XML-RPC API.
@@ -102,6 +311,25 @@ class TestlinkXMLRPCAPI(object):
 
        Ignore version checks
 
+    .. data:: MAX_MULTICALL_SIZE
+
+       Maximal amount of queries sent within a single 'system.multicall' request
+
+    .. data:: NON_IDEMPOTENT_METHODS
+
+       Remote methods, which are only sent again after a connection error if the
+       server is known not to have executed them already
+
+    .. data:: IDEMPOTENCY_KEYS
+
+       Embed a client generated key into the notes of each reported result, so
+       the result can be verified before sending it again. If disabled, only
+       explicitly specified keys are embedded.
+
+    .. data:: IDEMPOTENCY_KEY_FORMAT
+
+       Format of idempotency keys within execution notes
+
     .. attribute:: devkey
 
        The Testlink Developer Key to be used
@@ -115,6 +343,27 @@ class TestlinkXMLRPCAPI(object):
     WAIT_BEFORE_RECONNECT = 5   # Time (seconds) to wait before reconnect
     MAX_RECONNECTION_ATTEMPTS = 5  # Max amout of reconnection attempts
     IGNORE_VERSION_CHECK = False # Ignores version checking via TLVersion decorator
+    MAX_MULTICALL_SIZE = 50  # Max amount of queries per multicall request
+    NON_IDEMPOTENT_METHODS = frozenset(["tl.reportTCResult",
+                                        "tl.createTestProject",
+                                        "tl.createTestPlan",
+                                        "tl.createBuild",
+                                        "tl.createPlatform",
+                                        "tl.createTestSuite",
+                                        "tl.createTestCase",
+                                        "tl.createTestCaseSteps",
+                                        "tl.createRequirementSpecification",
+                                        "tl.createRequirement",
+                                        "tl.createRisk",
+                                        "tl.uploadAttachment",
+                                        "tl.uploadRequirementSpecificationAttachment",
+                                        "tl.uploadRequirementAttachment",
+                                        "tl.uploadTestProjectAttachment",
+                                        "tl.uploadTestSuiteAttachment",
+                                        "tl.uploadTestCaseAttachment",
+                                        "tl.uploadExecutionAttachment"])
+    IDEMPOTENCY_KEYS = False  # Always embed idempotency keys into execution notes
+    IDEMPOTENCY_KEY_FORMAT = "[request:%s]"  # Format of idempotency keys
 
     def __init__(self, url):
         """Initialize the TestlinkAPI
@@ -126,6 +375,9 @@ class TestlinkXMLRPCAPI(object):
         self._devkey = None
         self._tl_version = Version("1.0")
         self._rpc_path_cache = None
+        self._multicall_supported = True
+        self._endpoint = None
+        self._transport = None
 
         # Patch URL
         if url.endswith('/'):
@@ -193,9 +445,12 @@ class TestlinkXMLRPCAPI(object):
                         tmp += path
 
                     # Connect and test connection by retrieving remote methods
+                    transport = ThreadSafeTransport(use_datetime=False)
                     self._proxy = xmlrpclib.ServerProxy(tmp, encoding='UTF-8', allow_none=True,
-                                                        transport=ThreadSafeTransport(use_datetime=False))
+                                                        transport=transport)
                     self._proxy.system.listMethods()
+                    self._endpoint = tmp
+                    self._transport = transport
 
                     # Cache fitting RPC path for later reconnection attempts
                     self._rpc_path_cache = path
@@ -234,8 +489,11 @@ class TestlinkXMLRPCAPI(object):
         LOGGER.debug("Query: %s(%s)" % (str(method), str(kwargs)))
         try:
             # Call the actual method
-            fn = getattr(self._proxy, method)
-            resp = fn(kwargs)
+            if any(isinstance(value, Base64File) for value in kwargs.values()):
+                resp = self._stream_query(method, kwargs)
+            else:
+                fn = getattr(self._proxy, method)
+                resp = fn(kwargs)
             LOGGER.debug(u"Response: %s" % unicode(resp))
         except xmlrpclib.Fault, f:
             # If method is not supported, raise NotSupported
@@ -248,17 +506,238 @@ class TestlinkXMLRPCAPI(object):
             # Something was wrong with the request, try to reestablish
             LOGGER.debug("Connection Error: %s" + str(ex))
             if _reconnect:
+                exc_info = sys.exc_info()
                 self._reconnect()
-                return self._query(method, _reconnect=False, **kwargs)
+                return self._resend(method, kwargs, exc_info)
             else:
                 raise
         else:
-            # Check for API error [{'code': 123, 'message': foo}]
-            if isinstance(resp, list) and len(resp) == 1:
-                tmp = resp[0]
-                if ('code' in tmp) and ('message' in tmp):
-                    raise APIError(tmp['code'], tmp['message'])
-            return resp
+            return self._check_response(resp)
+
+    def _postprocess(self, resp, fn):
+        """Converts the response of the last query
+        @param resp: Server response
+        @param fn: Conversion of the response
+        @type fn: callable
+        @returns: Converted response
+        """
+        return fn(resp)
+
+    def _stream_query(self, method, kwargs):
+        """Remote calls a method with Base64File arguments,
+        the files are encoded while the request is sent
+        @param method: Method to call
+        @type method: str
+        """
+        body = StreamingMarshaller('UTF-8', allow_none=True).dumps((kwargs,))
+        body.insert(0, "<?xml version='1.0' encoding='UTF-8'?>\n"
+                       "<methodCall>\n<methodName>%s</methodName>\n" % method)
+        body.append("</methodCall>\n")
+
+        _, uri = urllib.splittype(self._endpoint)
+        host, handler = urllib.splithost(uri)
+        resp = self._transport.stream_request(host, handler or "/RPC2", body)
+        if len(resp) == 1:
+            resp = resp[0]
+        return resp
+
+    def _resend(self, method, kwargs, exc_info):
+        """Sends a query again after a connection error.
+        Non idempotent methods are verified first and only sent again,
+        if the server did not execute them already.
+        @param method: Method to call
+        @type method: str
+        @param exc_info: Exception information of the connection error
+        @type exc_info: tuple
+        @raise Exception: Original connection error, if the query cannot be sent again safely
+        """
+        if method in self.NON_IDEMPOTENT_METHODS:
+            verify = getattr(self, "_verify_" + method.split(".")[-1], None)
+            try:
+                if verify is None:
+                    raise NotSupported("Cannot verify '%s'" % method)
+                resp = verify(kwargs)
+            except Exception, ex:
+                LOGGER.debug("Not sending '%s' again: %s" % (method, str(ex)))
+                raise exc_info[0], exc_info[1], exc_info[2]
+            if resp is not None:
+                LOGGER.debug("'%s' has already been executed" % method)
+                return resp
+        return self._query(method, _reconnect=False, **kwargs)
+
+    def _verify_reportTCResult(self, kwargs):
+        """Returns the response of an already stored result or None"""
+        kwargs = dict(kwargs)
+        kwargs.pop('devKey', None)
+        resp = self.getReportedResult(**kwargs)
+        if resp is None:
+            return None
+        return [resp]
+
+    def _verify_createTestSuite(self, kwargs):
+        """Allows sending again if the server blocks duplicates"""
+        if not (kwargs.get('checkduplicatedname') and
+                kwargs.get('actiononduplicatedname') == DUPLICATE_STRATEGY.BLOCK):
+            raise NotSupported("Duplicates are not blocked")
+    _verify_createTestCase = _verify_createTestSuite
+
+    def _check_response(self, resp):
+        """Checks a server response for API errors
+        @param resp: Server response
+        @type resp: mixed
+        @raise APIError: Testlink API server side error
+        """
+        # Check for API error [{'code': 123, 'message': foo}]
+        if isinstance(resp, list) and len(resp) == 1:
+            tmp = resp[0]
+            if isinstance(tmp, dict) and ('code' in tmp) and ('message' in tmp):
+                raise APIError(tmp['code'], tmp['message'])
+        return resp
+
+    def _multicall(self, calls):
+        """Remote calls several methods on the server using as few requests as possible.
+        If the server does not support 'system.multicall', the methods are called one by one.
+        @param calls: Methods to call with their arguments
+        @type calls: list
+        @returns: Server responses in order of the calls, failed calls are returned as exceptions
+        @rtype: list
+        """
+        responses = []
+        for i in xrange(0, len(calls), self.MAX_MULTICALL_SIZE):
+            chunk = calls[i:i + self.MAX_MULTICALL_SIZE]
+            if self._multicall_supported:
+                try:
+                    responses.extend(self._send_multicall(chunk))
+                    continue
+                except NotSupported:
+                    LOGGER.debug("Multicall not supported, falling back to single queries")
+                    self._multicall_supported = False
+            for method, kwargs in chunk:
+                try:
+                    responses.append(self._query(method, **kwargs))
+                except (APIError, NotSupported, xmlrpclib.Fault), ex:
+                    responses.append(ex)
+        return responses
+
+    def _send_multicall(self, calls, _reconnect=True):
+        """Remote calls several methods on the server within a single request
+        @param calls: Methods to call with their arguments
+        @type calls: list
+        @raise NotSupported: Server does not support 'system.multicall'
+        """
+        payload = []
+        for method, kwargs in calls:
+            kwargs = dict(kwargs)
+            # Use class wide devkey if not given
+            if not ('devKey' in kwargs and kwargs['devKey']) or kwargs['devKey'].strip() == "":
+                kwargs['devKey'] = self._devkey
+            payload.append({'methodName': method, 'params': [kwargs]})
+
+        LOGGER.debug("Multicall: %d queries" % len(payload))
+        try:
+            resp = self._proxy.system.multicall(payload)
+        except xmlrpclib.Fault, f:
+            if f.faultCode == -32601:
+                raise NotSupported("system.multicall")
+            else:
+                raise
+        except (Exception, socket.error), ex:
+            # Something was wrong with the request, try to reestablish
+            LOGGER.debug("Connection Error: %s" % str(ex))
+            if not _reconnect:
+                raise
+            exc_info = sys.exc_info()
+            self._reconnect()
+            if not any(method in self.NON_IDEMPOTENT_METHODS for method, _ in calls):
+                return self._send_multicall(calls, _reconnect=False)
+
+            # Verify each write separately
+            results = []
+            for method, kwargs in calls:
+                try:
+                    results.append(self._resend(method, kwargs, exc_info))
+                except Exception, ex:
+                    results.append(ex)
+            return results
+
+        # Each successful result is wrapped into a list,
+        # each failed one is a fault struct
+        results = []
+        for (method, _), item in zip(calls, resp):
+            if isinstance(item, dict) and 'faultCode' in item:
+                if item['faultCode'] == -32601:
+                    results.append(NotSupported(method))
+                else:
+                    results.append(xmlrpclib.Fault(item['faultCode'], item['faultString']))
+                continue
+            try:
+                results.append(self._check_response(item[0]))
+            except APIError, ae:
+                results.append(ae)
+        return results
+
+    def multicall(self):
+        """Returns a collector for several API calls to be sent at once
+
+        :rtype: TestlinkXMLRPCMultiCall
+        :returns: Empty collector for API calls
+        """
+        return TestlinkXMLRPCMultiCall(self)
+
+    def markNotes(self, notes, idempotencykey):
+        """markNotes(notes, idempotencykey)
+
+        Embeds an idempotency key into execution notes like :meth:`reportTCResult` does.
+
+        :param str notes: Execution notes
+        :param str idempotencykey: Client generated key
+        :rtype: str
+        :returns: Notes as stored by the server
+        """
+        marker = self.IDEMPOTENCY_KEY_FORMAT % idempotencykey
+        return "%s\n%s" % (notes, marker) if notes else marker
+
+    def getReportedResult(self, testplanid, notes, testcaseid=None, testcaseexternalid=None, buildid=None,
+                          buildname=None, platformid=None, platformname=None, **kwargs):
+        """getReportedResult(testplanid, notes[, (testcaseid \| testcaseexternalid)][, (buildid \| buildname)][, (platformid \| platformname)])
+
+        Checks if a result with an idempotency key has already been stored.
+        Accepts the same arguments as :meth:`reportTCResult`.
+
+        :param str notes: Notes of the result including the idempotency key
+        :rtype: dict
+        :returns: Response of the stored result or None if the result has not been stored
+        :raises NotSupported: Notes do not contain an idempotency key
+        """
+        key = kwargs.get('idempotencykey')
+        marker = self.IDEMPOTENCY_KEY_FORMAT % key if key else None
+        if marker is None:
+            match = re.search(re.escape(self.IDEMPOTENCY_KEY_FORMAT).replace("\\%s", "[0-9a-zA-Z_-]+"), notes or "")
+            if match is None:
+                raise NotSupported("Result without idempotency key")
+            marker = match.group(0)
+
+        def stored(execution):
+            if isinstance(execution, dict) and marker in unicode(execution.get('notes') or ""):
+                return {'status': True, 'operation': 'reportTCResult', 'overwrite': False,
+                        'id': execution['id'], 'message': 'Success!'}
+
+        # Most likely the last execution, otherwise check the whole history
+        last = self.getLastExecutionResult(testplanid, testcaseid, testcaseexternalid, platformid,
+                                           platformname, buildid, buildname)
+        if isinstance(last, list) and len(last) == 1 and stored(last[0]) is not None:
+            return stored(last[0])
+        try:
+            executions = self.getExecutions(testplanid, testcaseid, testcaseexternalid, platformid, platformname,
+                                            buildid, buildname)
+        except NotSupported:
+            return None
+        if isinstance(executions, dict):
+            executions = executions.values()
+        for execution in executions or []:
+            if stored(execution) is not None:
+                return stored(execution)
+        return None
 
     #
     # Raw API methods
@@ -435,10 +914,7 @@ class TestlinkXMLRPCAPI(object):
         :returns: TestProject dictionary if TestProject has been found, else None.
         """
         resp = self._query("tl.getTestProjectByName", devKey=devkey, testprojectname=name)
-        # Return None for an empty string
-        if resp is not None and len(resp) == 0:
-            resp = None
-        return resp
+        return self._postprocess(resp, _empty_as_none)
 
     @TLVersion("1.0")
     def createTestPlan(self, name, project, notes='', active=True, public=True, devkey=None):
@@ -641,8 +1117,8 @@ class TestlinkXMLRPCAPI(object):
     @TLVersion("1.0")
     def reportTCResult(self, testplanid, status, testcaseid=None, testcaseexternalid=None, buildid=None,
                        buildname=None, notes=None, guess=True, bugid=None, platformid=None, platformname=None,
-                       customfields=None, overwrite=False, execduration=None, devkey=None):
-        """reportTCResult(testplanid, status[, (testcaseid \| testcaseexternalid)][,( buildid \| buildname)][, notes][, guess=True][, bugid][, (platformid \| platformname)][, customfields][, overwrite=False][, execduration][, devkey])
+                       customfields=None, overwrite=False, execduration=None, devkey=None, idempotencykey=None):
+        """reportTCResult(testplanid, status[, (testcaseid \| testcaseexternalid)][,( buildid \| buildname)][, notes][, guess=True][, bugid][, (platformid \| platformname)][, customfields][, overwrite=False][, execduration][, devkey][, idempotencykey])
 
         Sets the execution result for a specified TestCase.
 
@@ -661,6 +1137,7 @@ class TestlinkXMLRPCAPI(object):
         :param int platformid: The internal ID of the Platform. If not given, the name of the Platform has to be specified.
         :param str platformname: The Name of the Platform. If not given, the internal ID of the Platform has to be specified.
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
+        :param str idempotencykey: Client generated key embedded into the notes. Results with a key are verified instead of being reported twice after a connection error. Generated automatically if IDEMPOTENCY_KEYS is enabled.
         :rtype: list
         :returns: Server Response
 
@@ -670,6 +1147,11 @@ class TestlinkXMLRPCAPI(object):
         if (self._tl_version >= Version("1.9.14")) or TestlinkXMLRPCAPI.IGNORE_VERSION_CHECK:
             arguments['execduration'] = execduration
 
+        if idempotencykey is None and self.IDEMPOTENCY_KEYS:
+            idempotencykey = uuid.uuid4().hex
+        if idempotencykey is not None:
+            notes = self.markNotes(notes, idempotencykey)
+
         return self._query("tl.reportTCResult",
                            devKey=devkey,
                            testplanid=testplanid,
@@ -1284,10 +1766,7 @@ class TestlinkXMLRPCAPI(object):
                            testprojectid=testprojectid,
                            customfieldname=customfieldname,
                            details=details)
-        # Return None for an empty string
-        if resp is not None and len(resp) == 0:
-            resp = None
-        return resp
+        return self._postprocess(resp, _empty_as_none)
 
     @TLVersion("1.9.4")
     def updateTestCaseCustomFieldDesignValue(self, testcaseexternalid, version, testprojectid, customfields=None,
@@ -1378,7 +1857,7 @@ class TestlinkXMLRPCAPI(object):
         :param str fktable: The Table name of the attached Object
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1423,7 +1902,7 @@ class TestlinkXMLRPCAPI(object):
         :param int reqspecid: The internal ID of the Requirement Specification
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1450,7 +1929,7 @@ class TestlinkXMLRPCAPI(object):
         :param int requirementid: The internal ID of the Requirement
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1477,7 +1956,7 @@ class TestlinkXMLRPCAPI(object):
         :param int testprojectid: The internal ID of the TestProject
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1504,7 +1983,7 @@ class TestlinkXMLRPCAPI(object):
         :param int testsuiteid: The internal ID of the TestSuite
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1531,7 +2010,7 @@ class TestlinkXMLRPCAPI(object):
         :param int testcaseid: The internal ID of the TestCase
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1558,7 +2037,7 @@ class TestlinkXMLRPCAPI(object):
         :param int executionid: The internal ID of the Execution
         :param str filename: The filename of the Attachment
         :param str filetype: The MIME-Type of the Attachment
-        :param str content: Base64 encoded contents of the Attachment
+        :param content: Base64 encoded contents of the Attachment, or a Base64File to stream a local file
         :param str title: Title for the Attachment
         :param str description: Description of the Attachment
         :param str devkey: The Testlink Developer Key. If no key is specified, the Developer Key of the current connection will be used.
@@ -1859,3 +2338,61 @@ class TestlinkXMLRPCAPI(object):
                            requirementid=requirementid,
                            testplanid=testplanid,
                            platformid=platformid)
+
+
+class TestlinkXMLRPCMultiCall(TestlinkXMLRPCAPI):
+    """Collector for calls of Testlink's XML-RPC API.
+
+    All API methods called on this object are recorded and sent to the server at
+    once when the object itself is called, similar to :class:`xmlrpclib.MultiCall`.
+    The raw server responses are returned in the order of the calls, failed calls
+    are returned as exceptions instead of being raised.
+
+    :Examples:
+
+        >>> multicall = api.multicall()
+        >>> multicall.getTestCase(testcaseid=1)
+        >>> multicall.getTestCase(testcaseid=2)
+        >>> case1, case2 = multicall()
+    """
+
+    def __init__(self, api):
+        """Initialize the collector
+        @param api: Connected Testlink API
+        @type api: TestlinkXMLRPCAPI
+        """
+        self._api = api
+        self._devkey = api.devkey
+        self._tl_version = api.tl_version
+        self._calls = []
+        self._conversions = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __call__(self):
+        """Sends all recorded calls
+        @returns: Server responses in order of the calls
+        @rtype: list
+        """
+        calls, self._calls = self._calls, []
+        conversions, self._conversions = self._conversions, {}
+        responses = self._api._multicall(calls)
+        for i, fn in conversions.items():
+            if not isinstance(responses[i], Exception):
+                responses[i] = fn(responses[i])
+        return responses
+
+    def _query(self, method, _reconnect=True, **kwargs):
+        """Records a remote call"""
+        self._calls.append((method, kwargs))
+
+    def _postprocess(self, resp, fn):
+        """Defers the conversion of the last recorded call until the responses are received"""
+        self._conversions[len(self._calls) - 1] = fn
+
+    def getReportedResult(self, *args, **kwargs):
+        """Not available, the verification depends on the responses of several queries
+        :raises NotSupported: Always
+        """
+        raise NotSupported("getReportedResult cannot be recorded by a multicall")
@@ -0,0 +1,584 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: Testlink conform automation server running callbacks as coroutines on a single event loop.
+
+Callbacks are either plain functions or generator functions (coroutines). A coroutine
+suspends itself by yielding one of the following and is resumed with the outcome:
+
+    * sleep(seconds): Resumes after the specified time
+    * readable(sock) / writable(sock): Resumes as soon as the socket is ready
+    * Future: Resumes with the result of the Future, which may be set by any thread
+    * generator: Runs another coroutine and resumes with its result
+    * list of the above: Runs all concurrently and resumes with the list of results
+
+The result of a coroutine is returned by raising Return(value).
+
+:Examples:
+
+    >>> def callback(params):
+    >>>     sock = socket.create_connection(("device", 23))
+    >>>     sock.setblocking(0)
+    >>>     sock.send("selftest\\n")
+    >>>     yield readable(sock)
+    >>>     answer = sock.recv(1024)
+    >>>     raise Return({'result': 'p' if "OK" in answer else 'f', 'notes': answer})
+    >>>
+    >>> server = AsyncXMLRPCServer(callback, port=8080)
+"""
+
+# IMPORTS
+import time
+import heapq
+import errno
+import types
+import select
+import socket
+import asyncore
+import asynchat
+import xmlrpclib
+import itertools
+from threading import Lock
+from threading import Thread
+from collections import deque
+from SimpleXMLRPCServer import SimpleXMLRPCDispatcher
+from testlink.log import LOGGER
+from testlink.util import Future
+from testlink.metrics import ServerMetrics
+from testlink.server import TestlinkRequestHandler
+
+__all__ = ["AsyncXMLRPCServer", "EventLoop", "Future", "Return", "sleep", "readable", "writable"]
+
+
+class Return(Exception):
+    """Returns a value from a coroutine"""
+
+    def __init__(self, value=None):
+        Exception.__init__(self, value)
+        self.value = value
+
+
+class _Wait(object):
+    """Suspension of a coroutine yielded by sleep, readable and writable"""
+
+    __slots__ = ("kind", "arg")
+
+    def __init__(self, kind, arg):
+        self.kind = kind
+        self.arg = arg
+
+
+def sleep(seconds):
+    """Suspends a coroutine for the specified time"""
+    return _Wait('sleep', seconds)
+
+
+def readable(sock):
+    """Suspends a coroutine until the socket is readable, the socket is switched to non-blocking mode"""
+    return _Wait('read', sock)
+
+
+def writable(sock):
+    """Suspends a coroutine until the socket is writable, the socket is switched to non-blocking mode"""
+    return _Wait('write', sock)
+
+
+class _Task(object):
+    """Drives a coroutine on the event loop"""
+
+    __slots__ = ("loop", "coroutine", "future")
+
+    def __init__(self, loop, coroutine):
+        self.loop = loop
+        self.coroutine = coroutine
+        self.future = Future()
+
+    def step(self, value=None, exception=None):
+        """Resumes the coroutine until it yields again or finishes"""
+        try:
+            if exception is not None:
+                yielded = self.coroutine.throw(exception)
+            else:
+                yielded = self.coroutine.send(value)
+        except Return, ret:
+            self.future.set_result(ret.value)
+        except StopIteration:
+            self.future.set_result(None)
+        except Exception, ex:
+            self.future.set_exception(ex)
+        else:
+            self.loop._suspend(self, yielded)
+
+    def resume(self, future):
+        """Resumes the coroutine with the outcome of a Future"""
+        try:
+            value = future.result()
+        except Exception, ex:
+            self.step(exception=ex)
+        else:
+            self.step(value)
+
+
+class _Waker(asyncore.dispatcher):
+    """Interrupts the event loop from other threads"""
+
+    def __init__(self, socket_map):
+        self._reader, self._writer = socket.socketpair()
+        self._writer.setblocking(0)
+        asyncore.dispatcher.__init__(self, self._reader, socket_map)
+
+    def wake(self):
+        try:
+            self._writer.send("x")
+        except socket.error, ex:
+            if ex.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+
+    def writable(self):
+        return False
+
+    def handle_read(self):
+        try:
+            self.recv(4096)
+        except socket.error:
+            pass
+
+    def close(self):
+        asyncore.dispatcher.close(self)
+        self._writer.close()
+
+
+class _IOWait(asyncore.dispatcher):
+    """Resolves a Future as soon as a foreign socket is ready, without taking ownership of it"""
+
+    def __init__(self, sock, mode, socket_map):
+        self.future = Future()
+        self._mode = mode
+        asyncore.dispatcher.__init__(self, sock, socket_map)
+
+    def readable(self):
+        return self._mode == 'read'
+
+    def writable(self):
+        return self._mode == 'write'
+
+    def _fire(self):
+        if not self.future.done():
+            self.del_channel()
+            self.future.set_result(None)
+
+    # Errors and hang-ups are reported by the next socket operation of the coroutine
+    handle_read_event = handle_write_event = handle_expt_event = handle_close = handle_error = _fire
+
+
+class EventLoop(object):
+    """Single threaded event loop running coroutines, timers and asyncore dispatchers
+
+    .. data:: MAX_WAIT
+
+       Maximal time in seconds to block while waiting for events
+    """
+
+    MAX_WAIT = 30.0  # Seconds
+
+    def __init__(self):
+        self.map = {}
+        self._timers = []
+        self._sequence = itertools.count()
+        self._ready = deque()
+        self._lock = Lock()
+        self._running = False
+        self._waker = _Waker(self.map)
+        self._use_poll = hasattr(select, 'poll')
+
+    def call_soon(self, fn, *args):
+        """Schedules a call within the next iteration, may be called by any thread"""
+        with self._lock:
+            self._ready.append((fn, args))
+        self._waker.wake()
+
+    def call_later(self, delay, fn, *args):
+        """Schedules a call after the specified time, must be called within the loop"""
+        heapq.heappush(self._timers, (time.time() + delay, next(self._sequence), fn, args))
+
+    def spawn(self, coroutine):
+        """Starts a coroutine, must be called within the loop
+        @param coroutine: Generator, Future or list of them
+        @returns: Result of the coroutine
+        @rtype: Future
+        """
+        if isinstance(coroutine, Future):
+            return coroutine
+        if isinstance(coroutine, list):
+            return self.gather(coroutine)
+        task = _Task(self, coroutine)
+        task.step()
+        return task.future
+
+    def gather(self, coroutines):
+        """Runs several coroutines concurrently, must be called within the loop
+        @param coroutines: Generators or Futures
+        @type coroutines: list
+        @returns: Results in order of the coroutines, or the first exception
+        @rtype: Future
+        """
+        result = Future()
+        futures = [self.spawn(coroutine) for coroutine in coroutines]
+        pending = [len(futures)]
+        if not futures:
+            result.set_result([])
+
+        def done(_):
+            pending[0] -= 1
+            if pending[0] == 0:
+                try:
+                    result.set_result([future.result() for future in futures])
+                except Exception, ex:
+                    result.set_exception(ex)
+        for future in futures:
+            future.add_done_callback(lambda future: self.call_soon(done, future))
+        return result
+
+    def run(self):
+        """Runs the loop until stop is called"""
+        self._running = True
+        while self._running:
+            with self._lock:
+                ready, self._ready = self._ready, deque()
+            for fn, args in ready:
+                self._call(fn, args)
+            now = time.time()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, fn, args = heapq.heappop(self._timers)
+                self._call(fn, args)
+            if not self._running:
+                break
+            if self._ready:
+                timeout = 0
+            elif self._timers:
+                timeout = min(max(0, self._timers[0][0] - time.time()), self.MAX_WAIT)
+            else:
+                timeout = self.MAX_WAIT
+            asyncore.loop(timeout, self._use_poll, self.map, 1)
+
+    def stop(self):
+        """Stops the loop after the current iteration, may be called by any thread"""
+        self.call_soon(setattr, self, '_running', False)
+
+    def close(self):
+        """Closes all dispatchers, the loop must not be running anymore"""
+        asyncore.close_all(self.map)
+
+    def _call(self, fn, args):
+        try:
+            fn(*args)
+        except Exception:
+            LOGGER.exception("Unhandled exception within event loop")
+
+    def _suspend(self, task, yielded):
+        """Resumes a task as soon as the yielded operation is completed"""
+        if isinstance(yielded, _Wait):
+            if yielded.kind == 'sleep':
+                self.call_later(yielded.arg, task.step)
+                return
+            future = _IOWait(yielded.arg, yielded.kind, self.map).future
+        elif isinstance(yielded, (Future, list, types.GeneratorType)):
+            future = self.spawn(yielded)
+        else:
+            task.step(exception=TypeError("Cannot wait for %r" % (yielded,)))
+            return
+        future.add_done_callback(lambda future: self.call_soon(task.resume, future))
+
+
+class _HTTPChannel(asynchat.async_chat):
+    """HTTP/1.1 connection of AsyncXMLRPCServer, responses are sent in order of the requests"""
+
+    def __init__(self, server, sock, socket_map):
+        asynchat.async_chat.__init__(self, sock, socket_map)
+        self._server = server
+        self._buffer = []
+        self._request = None
+        self._responses = deque()
+        self.set_terminator("\r\n\r\n")
+
+    def collect_incoming_data(self, data):
+        self._buffer.append(data)
+
+    def found_terminator(self):
+        data = "".join(self._buffer)
+        self._buffer = []
+        if self._request is not None:
+            request, self._request = self._request, None
+            self.set_terminator("\r\n\r\n")
+            self._handle(request, data)
+            return
+
+        lines = data.lstrip("\r\n").split("\r\n")
+        try:
+            method, path, version = lines[0].split()
+        except ValueError:
+            self._handle(None, "")
+            return
+        headers = dict((key.strip().lower(), value.strip())
+                       for key, _, value in (line.partition(":") for line in lines[1:]))
+        connection = headers.get('connection', "").lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+        request = (method, path, keep_alive)
+        length = int(headers.get('content-length', 0) or 0)
+        if length > 0:
+            self._request = request
+            self.set_terminator(length)
+        else:
+            self._handle(request, "")
+
+    def _handle(self, request, body):
+        slot = [None]
+        self._responses.append(slot)
+        if request is None:
+            self._respond(slot, (400, "text/plain", "Bad Request\n"), False)
+            return
+        method, path, keep_alive = request
+        future = self._server._handle_request(method, path, body)
+        future.add_done_callback(lambda future: self._respond(slot, future.result(), keep_alive))
+
+    def _respond(self, slot, response, keep_alive):
+        code, content_type, body = response
+        slot[0] = ("HTTP/1.1 %d %s\r\n"
+                   "Content-Type: %s\r\n"
+                   "Content-Length: %d\r\n"
+                   "%s\r\n%s" % (code, _REASONS.get(code, ""), content_type, len(body),
+                                 "" if keep_alive else "Connection: close\r\n", body), keep_alive)
+        while self._responses and self._responses[0][0] is not None:
+            data, keep_alive = self._responses.popleft()[0]
+            self.push(data)
+            if not keep_alive:
+                self.close_when_done()
+                self._responses.clear()
+
+    def handle_error(self):
+        LOGGER.exception("Closing connection after unexpected error")
+        self.close()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+
+class _Listener(asyncore.dispatcher):
+    """Accepts connections of AsyncXMLRPCServer"""
+
+    def __init__(self, server, host, port, socket_map):
+        asyncore.dispatcher.__init__(self, map=socket_map)
+        self._server = server
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind((host, port))
+        self.listen(socket.SOMAXCONN)
+
+    def writable(self):
+        return False
+
+    def handle_accept(self):
+        try:
+            accepted = self.accept()
+        except socket.error:
+            return
+        if accepted is not None:
+            _HTTPChannel(self._server, accepted[0], self._map)
+
+
+class AsyncXMLRPCServer(SimpleXMLRPCDispatcher, Thread):
+    """Testlink conform XML-RPC automation server running all requests on a single event loop.
+    Suited for many concurrent, mostly I/O bound callbacks, see testlink.asyncserver.
+    Plain callbacks block the loop while they are running, coroutines do not.
+
+    Remote methods:
+
+        * executeTestCase(params): Runs the callback
+        * executeTestCases(calls): Runs the callback for several TestCases concurrently
+        * system.multicall(calls): Runs several remote methods concurrently within a single request
+        * getMetrics(): Returns request rates, latency histograms, error counts and open connections
+
+    If enabled, the metrics and health state are additionally served via HTTP GET like by TestlinkXMLRPCServer.
+
+    @ivar metrics: Request and callback metrics
+    @type metrics: ServerMetrics
+    @ivar loop: Event loop of the Server
+    @type loop: EventLoop
+    """
+
+    rpc_paths = ('/', '/RPC2')
+
+    def __init__(self, callback, host='127.0.0.1', port=8080, http_metrics=False):
+        """Initializes and starts the Server
+        @param callback: Method or generator function to be executed if server is triggerd
+        @type callback: method
+        @param host: The address of the Server
+        @type host: str
+        @param port: The port of the Server, 0 to use any free port
+        @type port: int
+        @param http_metrics: Serve the metrics and health state via HTTP GET
+        @type http_metrics: bool
+        """
+        SimpleXMLRPCDispatcher.__init__(self, allow_none=True, encoding=None)
+        Thread.__init__(self, name="AsyncXMLRPCServer")
+        self.daemon = True
+        self.http_metrics = http_metrics
+        self.metrics = ServerMetrics()
+        self.loop = EventLoop()
+        self._callback = callback
+        self._active = 0
+        self._stopped = False
+        self._listener = _Listener(self, host, port, self.loop.map)
+        self.server_address = self._listener.socket.getsockname()
+
+        self.register_introspection_functions()
+        LOGGER.info("Starting Testlink compatible asynchronous XML-RPC Server at http://%s:%d/" % self.server_address)
+        LOGGER.info("Registering '%s' as callback" % str(callback.__name__))
+        self.register_function(self._execute, "executeTestCase")
+        self.register_function(self.executeTestCases, "executeTestCases")
+        self.register_function(self.multicall, "system.multicall")
+        self.register_function(self.getMetrics, "getMetrics")
+        self.start()
+
+    @property
+    def port(self):
+        """The port the Server is listening on"""
+        return self.server_address[1]
+
+    def run(self):
+        try:
+            self.loop.run()
+        finally:
+            self.loop.close()
+
+    def shutdown(self, timeout=None):
+        """Stops accepting requests, waits for all accepted requests and closes the Server
+        @param timeout: <OPTIONAL> Maximal time in seconds to wait for the running requests
+        @type timeout: float
+        """
+        if self._stopped:
+            return
+        LOGGER.info("Shutting down Testlink compatible asynchronous XML-RPC Server at http://%s:%d/"
+                    % self.server_address)
+        self.loop.call_soon(self._stop)
+        self.join(timeout)
+        if self.is_alive():
+            self.loop.stop()
+            self.join()
+
+    def executeTestCases(self, calls):
+        """Runs the callback for several TestCases concurrently
+        @param calls: Argument of each callback, e.g. the executeTestCase parameters
+        @type calls: list
+        @returns: Result of each callback in order of the calls,
+        failed callbacks are returned as fault structs like in 'system.multicall'
+        @rtype: list
+        """
+        results = yield [self._settle(self._execute(params)) for params in calls]
+        raise Return(results)
+
+    def multicall(self, calls):
+        """Runs several remote methods concurrently, see 'system.multicall'
+        @param calls: Structs with 'methodName' and 'params' of each call
+        @type calls: list
+        @returns: Result of each call wrapped in a list in order of the calls, failed calls as fault structs
+        @rtype: list
+        """
+        results = yield [self._settle(self._multicall_entry(call)) for call in calls]
+        raise Return(results)
+
+    def getMetrics(self):
+        """Returns the metrics of the Server
+        @returns: Metrics as described by ServerMetrics.as_dict and the amount of open connections
+        @rtype: dict
+        """
+        metrics = self.metrics.as_dict()
+        metrics.update(self._gauges())
+        return metrics
+
+    def _gauges(self):
+        """Returns current values by name"""
+        return {'connections': sum(1 for channel in self.loop.map.itervalues()
+                                   if isinstance(channel, _HTTPChannel))}
+
+    def _stop(self):
+        """Closes the listening socket and stops the loop once all requests are done"""
+        self._stopped = True
+        self._listener.close()
+        if self._active == 0:
+            self.loop.stop()
+
+    def _execute(self, *args):
+        """Runs the callback"""
+        with self.metrics.callback():
+            result = self._callback(*args)
+            if isinstance(result, (types.GeneratorType, Future)):
+                result = yield result
+        raise Return(result)
+
+    def _call(self, name, params):
+        """Coroutine running a remote method"""
+        try:
+            func = self.funcs[name]
+        except KeyError:
+            raise Exception('method "%s" is not supported' % name)
+        result = func(*params)
+        if isinstance(result, (types.GeneratorType, Future)):
+            result = yield result
+        raise Return(result)
+
+    def _multicall_entry(self, call):
+        """Coroutine running a single call of 'system.multicall'"""
+        name = call['methodName']
+        if name == 'system.multicall':
+            raise Exception("Recursive system.multicall forbidden")
+        with self.metrics.request(name):
+            result = yield self._call(name, call['params'])
+        raise Return([result])
+
+    def _settle(self, coroutine):
+        """Runs a coroutine and returns failures as fault struct"""
+        try:
+            result = yield coroutine
+        except xmlrpclib.Fault, fault:
+            result = {'faultCode': fault.faultCode, 'faultString': fault.faultString}
+        except Exception, ex:
+            result = {'faultCode': 1, 'faultString': "%s: %s" % (ex.__class__.__name__, str(ex))}
+        raise Return(result)
+
+    def _handle_request(self, method, path, body):
+        """Handles a single HTTP request
+        @returns: Status code, content type and body of the response
+        @rtype: Future
+        """
+        self._active += 1
+        future = self.loop.spawn(self._respond(method, path, body))
+        future.add_done_callback(self._request_done)
+        return future
+
+    def _request_done(self, _):
+        self._active -= 1
+        if self._stopped and self._active == 0:
+            self.loop.stop()
+
+    def _respond(self, method, path, body):
+        """Coroutine creating the response of a HTTP request"""
+        if method == 'GET' and self.http_metrics and path == TestlinkRequestHandler.METRICS_PATH:
+            raise Return((200, "text/plain; version=0.0.4", self.metrics.render(self._gauges())))
+        if method == 'GET' and self.http_metrics and path == TestlinkRequestHandler.HEALTH_PATH:
+            raise Return((503, "text/plain", "STOPPING\n") if self._stopped else (200, "text/plain", "OK\n"))
+        if method != 'POST' or path not in self.rpc_paths:
+            raise Return((404, "text/plain", "No such page\n"))
+
+        try:
+            params, name = xmlrpclib.loads(body)
+            with self.metrics.request(name):
+                result = yield self._call(name, params)
+            response = xmlrpclib.dumps((result,), methodresponse=1, allow_none=self.allow_none)
+        except xmlrpclib.Fault, fault:
+            response = xmlrpclib.dumps(fault, allow_none=self.allow_none)
+        except Exception, ex:
+            response = xmlrpclib.dumps(xmlrpclib.Fault(1, "%s:%s" % (ex.__class__, ex)), allow_none=self.allow_none)
+        raise Return((200, "text/xml", response))
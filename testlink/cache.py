@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Attachment Cache
+================
+:module: testlink.cache
+
+Index of the attachment contents uploaded to each object.
+
+The cache only deduplicates uploads per object, not across objects. Testlink
+cannot link an existing attachment to another object, so identical contents
+still have to be uploaded once per object. The cache remembers the hash of
+each uploaded content together with the object it was attached to, so
+repeated uploads of the same file to the same object (e.g. re-runs of a
+pipeline step) are skipped without encoding or sending the content again.
+
+The index is persisted as JSON lines file and survives process restarts.
+Attachments deleted on the server are not noticed, use
+:meth:`AttachmentCache.forget` in that case.
+
+:Examples:
+
+    >>> cache = AttachmentCache("attachments.jsonl")
+    >>> for execution in executions:
+    >>>     execution.uploadAttachment("env.txt", "text/plain", path="env.txt", cache=cache)
+    >>> cache.stats['bytes_saved']
+"""
+
+# IMPORTS
+import os
+import json
+import base64
+import hashlib
+import threading
+
+from testlink.log import LOGGER
+from testlink.api import Base64File
+
+__all__ = ["AttachmentCache"]
+
+
+class AttachmentCache(object):
+    """Persistent index of uploaded attachment contents
+
+    .. data:: ALGORITHM
+
+       Hash algorithm used to identify contents
+
+    .. data:: CHUNK_SIZE
+
+       Base64 characters decoded at once while hashing, multiple of 4
+
+    @ivar stats: Amount of skipped ('hits') and sent ('misses') uploads and of bytes not sent ('bytes_saved')
+    @type stats: dict
+    """
+
+    ALGORITHM = "sha1"  # Hash algorithm, see hashlib
+    CHUNK_SIZE = 4 * 256 * 1024  # Base64 characters decoded at once
+
+    def __init__(self, path=None):
+        """Loads the index, creates it if necessary
+        @param path: <OPTIONAL> Path of the index file, the index is kept in memory only if not specified
+        @type path: str
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._index = set()
+        self._file = None
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
+
+        if path is not None:
+            if os.path.exists(path):
+                self._load(path)
+            self._file = open(path, 'ab')
+
+            # Terminate an incomplete record of a crashed process
+            if self._file.tell() > 0:
+                with open(path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != "\n":
+                        self._file.write("\n")
+                        self._file.flush()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the index file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def digest(self, content):
+        """Returns the hash and the size of raw contents
+        @param content: Base64 encoded contents or Base64File
+        @type content: str or Base64File
+        @returns: Hash and size in bytes
+        @rtype: tuple
+        """
+        if isinstance(content, Base64File):
+            return content.digest(self.ALGORITHM), content.size
+
+        h = hashlib.new(self.ALGORITHM)
+        size = 0
+        if "\n" in content or len(content) % 4 != 0:
+            # Wrapped lines do not allow splitting at arbitrary positions
+            chunks = [base64.b64decode(content)]
+        else:
+            chunks = (base64.b64decode(buffer(content, start, self.CHUNK_SIZE))
+                      for start in xrange(0, len(content), self.CHUNK_SIZE))
+        for chunk in chunks:
+            h.update(chunk)
+            size += len(chunk)
+        return h.hexdigest(), size
+
+    def add(self, digest, fktable, fkid, filename):
+        """Records an uploaded content
+        @param digest: Hash of the content
+        @type digest: str
+        @param fktable: The Table name of the attached Object
+        @type fktable: str
+        @param fkid: The internal ID of the attached Object
+        @type fkid: int
+        @param filename: The filename of the Attachment
+        @type filename: str
+        """
+        key = (str(digest), str(fktable), int(fkid), unicode(filename))
+        with self._lock:
+            if key in self._index:
+                return
+            self._index.add(key)
+            if self._file is not None:
+                self._file.write(json.dumps(key) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def forget(self, fktable, fkid):
+        """Removes all contents of an object, e.g. after attachments have been deleted
+        @param fktable: The Table name of the attached Object
+        @type fktable: str
+        @param fkid: The internal ID of the attached Object
+        @type fkid: int
+        """
+        with self._lock:
+            self._index = set(key for key in self._index if key[1:3] != (str(fktable), int(fkid)))
+            if self._file is not None:
+                self._file.close()
+                tmp = self._path + ".tmp"
+                with open(tmp, 'wb') as f:
+                    for key in self._index:
+                        f.write(json.dumps(key) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.rename(tmp, self._path)
+                self._file = open(self._path, 'ab')
+
+    def upload(self, api, fkid, fktable, filename, filetype, content, title=None, description=None):
+        """Uploads an Attachment unless the same content has already been attached to the object.
+        The same content is uploaded again for every other object.
+        @param api: Testlink API
+        @type api: TestlinkXMLRPCAPI
+        @param content: Base64 encoded contents or Base64File
+        @type content: str or Base64File
+        @returns: Server response or None if the upload has been skipped
+        @rtype: mixed
+        @see: TestlinkXMLRPCAPI.uploadAttachment
+        """
+        digest, size = self.digest(content)
+        key = (digest, str(fktable), int(fkid), unicode(filename))
+        with self._lock:
+            skip = key in self._index
+            if skip:
+                self.stats['hits'] += 1
+                self.stats['bytes_saved'] += size
+            else:
+                self.stats['misses'] += 1
+        if skip:
+            LOGGER.debug("Skipping upload of %s to %s %s, already attached" % (filename, fktable, fkid))
+            return None
+
+        resp = api.uploadAttachment(fkid=fkid, fktable=fktable, filename=filename, filetype=filetype,
+                                    content=content, title=title, description=description)
+        self.add(digest, fktable, fkid, filename)
+        return resp
+
+    def _load(self, path):
+        """Reads the index file, ignores incomplete records"""
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    digest, fktable, fkid, filename = json.loads(line)
+                except ValueError:
+                    LOGGER.debug("Skipping invalid cache record: %r" % line)
+                    continue
+                self._index.add((str(digest), str(fktable), int(fkid), unicode(filename)))
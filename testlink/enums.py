@@ -137,6 +137,41 @@ when using the objects provided by the wrapper.
    .. py:attribute:: FAILED
    .. py:attribute:: BLOCKED
 
+
+.. py:data:: SHARD_STRATEGY
+
+   Strategy used to partition the TestCases of a TestPlan into shards.
+
+   .. py:attribute:: ROUND_ROBIN
+
+      Distribute TestCases ordered by their internal ID one after another.
+
+   .. py:attribute:: BY_SUITE
+
+      Keep all TestCases of a TestSuite within the same shard.
+
+   .. py:attribute:: BY_DURATION
+
+      Balance the estimated execution duration of all shards
+      (longest processing time first).
+
+
+.. py:data:: JOB_STATUS
+
+   States of jobs scheduled by the automation server.
+
+   .. py:attribute:: QUEUED
+   .. py:attribute:: RUNNING
+   .. py:attribute:: FINISHED
+
+      Result has been reported to Testlink.
+
+   .. py:attribute:: FAILED
+
+      Result could not be reported to Testlink.
+
+   .. py:attribute:: CANCELLED
+
 """
 
 # IMPORTS
@@ -182,3 +217,12 @@ REQUIREMENT_TYPE = nt("RequirementType",
 EXECUTION_STATUS = nt("ExecutionStatus",
                       ("NOT_RUN", "PASSED", "FAILED", "BLOCKED"))(NOT_RUN='n', PASSED='p',
                                                                   FAILED='f', BLOCKED='b')
+
+SHARD_STRATEGY = nt("ShardStrategy",
+                    ("ROUND_ROBIN", "BY_SUITE", "BY_DURATION"))(ROUND_ROBIN='round_robin', BY_SUITE='by_suite',
+                                                                BY_DURATION='by_duration')
+
+JOB_STATUS = nt("JobStatus",
+                ("QUEUED", "RUNNING", "FINISHED", "FAILED", "CANCELLED"))(QUEUED='queued', RUNNING='running',
+                                                                         FINISHED='finished', FAILED='failed',
+                                                                         CANCELLED='cancelled')
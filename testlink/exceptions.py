@@ -29,6 +29,14 @@ Exceptions
 .. exception:: ConnectionError
 
     Raised if there was a connection error to the Testlink server
+
+.. exception:: WorkerError
+
+    Raised if a callback failed within a worker process or the process died
+
+.. exception:: ExecutionTimeout
+
+    Raised if a callback did not finish within its timeout, subclass of WorkerError
 """
 
 class NotSupported(Exception):
@@ -52,3 +60,11 @@ class APIError(Exception):
 
 class ConnectionError(Exception):
     pass
+
+
+class WorkerError(Exception):
+    pass
+
+
+class ExecutionTimeout(WorkerError):
+    pass
@@ -0,0 +1,1390 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: In-memory fake of the Testlink XML-RPC API for integration tests and local measurements
+"""
+
+# IMPORTS
+import time
+import base64
+import binascii
+import xmlrpclib
+from threading import Lock
+from threading import RLock
+from threading import Thread
+from collections import OrderedDict
+from SocketServer import ThreadingMixIn
+from SimpleXMLRPCServer import SimpleXMLRPCServer
+from SimpleXMLRPCServer import SimpleXMLRPCRequestHandler
+from testlink.log import LOGGER
+from testlink.api import TestlinkXMLRPCAPI
+from testlink.enums import DUPLICATE_STRATEGY
+from testlink.enums import EXECUTION_STATUS
+from testlink.enums import EXECUTION_TYPE
+from testlink.enums import IMPORTANCE_LEVEL
+from testlink.enums import TESTCASE_STATUS
+from testlink.exceptions import APIError
+
+__all__ = ["FakeTestlink", "FakeTestlinkServer"]
+
+
+def remote(auth=True):
+    """Marks a method of FakeTestlink as remote method 'tl.<name>'
+    @param auth: The method requires a valid developer key
+    @type auth: bool
+    """
+    def decorate(fn):
+        fn.remote_auth = auth
+        return fn
+    return decorate
+
+
+def _now():
+    """Returns the current time as Testlink timestamp"""
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _public(record):
+    """Returns the public fields of a stored record as the database would, numbers as strings"""
+    result = {}
+    for key, value in record.iteritems():
+        if key.startswith('_'):
+            continue
+        if isinstance(value, (int, long)) and not isinstance(value, bool):
+            value = str(value)
+        result[key] = value
+    return result
+
+
+def _struct(items):
+    """Returns records by ID as XML-RPC struct, empty results are returned as empty array like Testlink does"""
+    if len(items) == 0:
+        return []
+    return dict((str(item['id']), _public(item)) for item in items)
+
+
+def _int(value, default=None):
+    """Converts an ID argument, missing and invalid values are returned as default"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class FakeTestlink(object):
+    """In-memory fake of a Testlink installation implementing the 'tl.*' methods used by TestlinkXMLRPCAPI.
+    Responses have the same shapes as the ones of Testlink and failures are returned as
+    Testlink error structs with the original error codes, see the constants below.
+
+    The data is kept in memory only. A single user 'admin' with developer key FakeTestlink.DEVKEY exists
+    initially, further users, custom fields and keywords can be added with addUser, addCustomField
+    and addKeyword.
+
+    @ivar calls: Amount of calls by remote method
+    @type calls: dict
+
+    .. data:: VERSION
+
+       Reported Testlink version, supports all methods of TestlinkXMLRPCAPI by default
+
+    .. data:: DEVKEY
+
+       Developer key of the initial user 'admin'
+
+    .. data:: GENERAL_ERROR
+    .. data:: MISSING_PARAMETER
+    .. data:: INVALID_AUTH
+    .. data:: INVALID_TESTPLANID
+    .. data:: TCASEID_NOT_IN_TPLANID
+    .. data:: TPLAN_HAS_NO_BUILDS
+    .. data:: BAD_BUILD_FOR_TPLAN
+    .. data:: TESTPLANNAME_DOESNOT_EXIST
+    .. data:: TESTPLANNAME_ALREADY_EXISTS
+    .. data:: PLATFORM_NOT_LINKED_TO_TESTPLAN
+    .. data:: TESTPLAN_HAS_NO_PLATFORMS
+    .. data:: TCASEID_NOT_IN_TPLANID_FOR_PLATFORM
+    .. data:: MISSING_PLATFORMID_BUT_NEEDED
+    .. data:: PLATFORM_ID_NOT_LINKED_TO_TESTPLAN
+    .. data:: LINKED_FEATURE_ALREADY_EXISTS
+    .. data:: OTHER_VERSION_IS_ALREADY_LINKED
+    .. data:: PLATFORM_NAME_DOESNOT_EXIST
+    .. data:: INVALID_BUILDID
+    .. data:: BUILDNAME_DOES_NOT_EXIST
+    .. data:: INVALID_TCASEID
+    .. data:: NO_TESTCASE_BY_THIS_NAME
+    .. data:: INVALID_TESTCASE_EXTERNAL_ID
+    .. data:: VERSION_NOT_VALID
+    .. data:: INVALID_STATUS
+    .. data:: ATTACH_INVALID_FK
+    .. data:: ATTACH_INVALID_ATTACHMENT
+    .. data:: INVALID_TESTPROJECTID
+    .. data:: TESTPROJECTNAME_EXISTS
+    .. data:: TESTPROJECT_TESTCASEPREFIX_EXISTS
+    .. data:: TPLAN_TPROJECT_KO
+    .. data:: TCASE_TPROJECT_KO
+    .. data:: TPROJECT_IS_EMPTY
+    .. data:: TESTPROJECTNAME_DOESNOT_EXIST
+    .. data:: INVALID_TESTSUITEID
+    .. data:: TESTSUITE_DONOTBELONG_TO_TESTPROJECT
+    .. data:: INVALID_PARENT_TESTSUITEID
+    .. data:: NO_CUSTOMFIELD_BY_THIS_NAME
+    .. data:: NO_USER_BY_THIS_LOGIN
+    .. data:: INVALID_REQSPECID
+    .. data:: INVALID_REQUIREMENTID
+    .. data:: PLATFORMNAME_ALREADY_EXISTS
+
+       Error codes of Testlink
+    """
+
+    VERSION = "1.11.0-sinaqs"  # Reported Testlink version
+    DEVKEY = "fake"  # Developer key of 'admin'
+
+    GENERAL_ERROR = -1  # Errors without own code
+    MISSING_PARAMETER = 200  # Required argument missing
+    INVALID_AUTH = 2000  # Unknown developer key
+    INVALID_TESTPLANID = 3000  # Unknown TestPlan ID
+    TCASEID_NOT_IN_TPLANID = 3030  # TestCase not linked to TestPlan
+    TPLAN_HAS_NO_BUILDS = 3031  # TestPlan without Builds
+    BAD_BUILD_FOR_TPLAN = 3032  # Build of another TestPlan
+    TESTPLANNAME_DOESNOT_EXIST = 3033  # Unknown TestPlan name
+    TESTPLANNAME_ALREADY_EXISTS = 3034  # Duplicated TestPlan name
+    PLATFORM_NOT_LINKED_TO_TESTPLAN = 3040  # Platform not linked to TestPlan
+    TESTPLAN_HAS_NO_PLATFORMS = 3041  # TestPlan without Platforms
+    TCASEID_NOT_IN_TPLANID_FOR_PLATFORM = 3042  # TestCase not linked for the Platform
+    MISSING_PLATFORMID_BUT_NEEDED = 3043  # TestPlan has Platforms, but none specified
+    PLATFORM_ID_NOT_LINKED_TO_TESTPLAN = 3044  # Platform ID not linked to TestPlan
+    LINKED_FEATURE_ALREADY_EXISTS = 3045  # TestCase version already linked
+    OTHER_VERSION_IS_ALREADY_LINKED = 3046  # Another TestCase version already linked
+    PLATFORM_NAME_DOESNOT_EXIST = 3050  # Unknown Platform name
+    INVALID_BUILDID = 4000  # Unknown Build ID
+    BUILDNAME_DOES_NOT_EXIST = 4040  # Unknown Build name
+    INVALID_TCASEID = 5000  # Unknown TestCase ID
+    NO_TESTCASE_BY_THIS_NAME = 5030  # Unknown TestCase name
+    INVALID_TESTCASE_EXTERNAL_ID = 5040  # Unknown external TestCase ID
+    VERSION_NOT_VALID = 5052  # Unknown TestCase version
+    INVALID_STATUS = 6000  # Unknown execution status
+    ATTACH_INVALID_FK = 6004  # Unknown attached object
+    ATTACH_INVALID_ATTACHMENT = 6005  # Unknown or invalid attachment
+    INVALID_TESTPROJECTID = 7000  # Unknown TestProject ID
+    TESTPROJECTNAME_EXISTS = 7002  # Duplicated TestProject name
+    TESTPROJECT_TESTCASEPREFIX_EXISTS = 7003  # Duplicated TestProject prefix
+    TPLAN_TPROJECT_KO = 7006  # TestPlan of another TestProject
+    TCASE_TPROJECT_KO = 7007  # TestCase of another TestProject
+    TPROJECT_IS_EMPTY = 7008  # TestProject without TestSuites
+    TESTPROJECTNAME_DOESNOT_EXIST = 7011  # Unknown TestProject name
+    INVALID_TESTSUITEID = 8000  # Unknown TestSuite ID
+    TESTSUITE_DONOTBELONG_TO_TESTPROJECT = 8001  # TestSuite of another TestProject
+    INVALID_PARENT_TESTSUITEID = 8003  # Unknown parent TestSuite
+    NO_CUSTOMFIELD_BY_THIS_NAME = 9000  # Unknown CustomField
+    NO_USER_BY_THIS_LOGIN = 10000  # Unknown user
+    INVALID_REQSPECID = 11000  # Unknown Requirement Specification ID
+    INVALID_REQUIREMENTID = 11001  # Unknown Requirement ID
+    PLATFORMNAME_ALREADY_EXISTS = 12000  # Duplicated Platform name
+
+    def __init__(self, version=None):
+        """Initializes an empty Testlink
+        @param version: <OPTIONAL> Reported Testlink version, defaults to FakeTestlink.VERSION
+        @type version: str
+        """
+        self.version = version or self.VERSION
+        self.calls = {}
+        self._lock = RLock()
+        self._ids = {}
+        # Projects, suites, cases, plans, requirement specifications and requirements share their IDs
+        self._nodes = OrderedDict()
+        self._versions = {}
+        self._builds = OrderedDict()
+        self._platforms = OrderedDict()
+        self._executions = OrderedDict()
+        self._attachments = OrderedDict()
+        self._risks = OrderedDict()
+        self._users = OrderedDict()
+        self._devkeys = {}
+        self._customfields = OrderedDict()
+        self._values = {}
+        self.addUser("admin", self.DEVKEY, "Testlink", "Administrator")
+
+    #
+    # Setup of data not available via the API
+    #
+    def addUser(self, login, devkey, first_name="", last_name="", email=""):
+        """Adds a user
+        @param login: Login of the user
+        @type login: str
+        @param devkey: Developer key of the user
+        @type devkey: str
+        @returns: Internal ID of the user
+        @rtype: int
+        """
+        with self._lock:
+            _id = self._next("users")
+            self._users[_id] = {'dbID': _id, 'login': login, 'firstName': first_name, 'lastName': last_name,
+                                'emailAddress': email, 'isActive': 1}
+            self._devkeys[devkey] = _id
+            return _id
+
+    def addCustomField(self, name, label=None, typ=0):
+        """Defines a CustomField available for all objects
+        @param name: Name of the CustomField
+        @type name: str
+        @param label: <OPTIONAL> Label of the CustomField, defaults to the name
+        @type label: str
+        @param typ: Type of the CustomField, 0 is a string
+        @type typ: int
+        """
+        with self._lock:
+            self._customfields[name] = {'name': name, 'label': label or name, 'type': typ, 'default_value': ''}
+
+    def addKeyword(self, testcaseid, keyword, notes=""):
+        """Assigns a keyword to a TestCase
+        @param testcaseid: The internal ID of the TestCase
+        @type testcaseid: int
+        @param keyword: The keyword
+        @type keyword: str
+        @returns: Internal ID of the keyword
+        @rtype: int
+        """
+        with self._lock:
+            case = self._node(testcaseid, 'testcase', self.INVALID_TCASEID,
+                              "The Test Case ID (testcaseid: %s) provided does not exist!")
+            _id = self._next("keywords")
+            case['_keywords'].append({'keyword_id': _id, 'keyword': keyword, 'notes': notes,
+                                      'testcase_id': case['id']})
+            return _id
+
+    #
+    # Dispatching
+    #
+    def call(self, method, params):
+        """Calls a remote method like Testlink's XML-RPC server does
+        @param method: Name of the remote method, e.g. 'tl.sayHello'
+        @type method: str
+        @param params: XML-RPC parameters, the arguments are passed as single struct
+        @type params: tuple
+        @returns: Response of the method or a list containing a single error struct
+        @rtype: mixed
+        @raises Fault: Unknown method
+        """
+        fn = None
+        if method.startswith("tl."):
+            fn = getattr(self, method[3:], None)
+        if not hasattr(fn, 'remote_auth'):
+            raise xmlrpclib.Fault(-32601, "server error. requested method %s does not exist." % method)
+        args = params[0] if len(params) > 0 and isinstance(params[0], dict) else {}
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            try:
+                if fn.remote_auth:
+                    self._user(args)
+                return fn(args)
+            except APIError, ae:
+                return [{'code': ae.error_code, 'message': ae.error_msg}]
+
+    def listMethods(self):
+        """Returns the names of all remote methods
+        @rtype: list
+        """
+        return sorted("tl." + name for name in dir(self) if hasattr(getattr(self, name), 'remote_auth'))
+
+    #
+    # Helpers
+    #
+    def _next(self, table):
+        """Returns the next ID of a table"""
+        self._ids[table] = self._ids.get(table, 0) + 1
+        return self._ids[table]
+
+    def _required(self, args, *names):
+        """Returns the values of required arguments"""
+        for name in names:
+            if args.get(name) in (None, ""):
+                raise APIError(self.MISSING_PARAMETER, "Missing parameter: %s" % name)
+        values = [args[name] for name in names]
+        return values[0] if len(values) == 1 else values
+
+    def _user(self, args):
+        """Returns the user of the developer key"""
+        _id = self._devkeys.get(args.get('devKey'))
+        if _id is None:
+            raise APIError(self.INVALID_AUTH, "Can not authenticate client: invalid developer key")
+        return self._users[_id]
+
+    def _node(self, _id, node_type, code, message):
+        """Returns a node of the specified type by ID"""
+        node = self._nodes.get(_int(_id))
+        if node is None or node['_type'] != node_type:
+            raise APIError(code, message % str(_id))
+        return node
+
+    def _add_node(self, node_type, parent, **fields):
+        """Stores a new node"""
+        _id = self._next("nodes")
+        node = dict(fields, id=_id, _type=node_type, _parent=parent)
+        self._nodes[_id] = node
+        return node
+
+    def _children(self, parent_id, node_type):
+        """Returns the child nodes of the specified type"""
+        return [n for n in self._nodes.itervalues() if n['_parent'] == parent_id and n['_type'] == node_type]
+
+    def _project(self, args, key='testprojectid'):
+        """Returns the TestProject specified by its ID"""
+        return self._node(self._required(args, key), 'testproject', self.INVALID_TESTPROJECTID,
+                          "The Test Project ID (%s) provided does not exist!")
+
+    def _project_by_name(self, name):
+        """Returns the TestProject specified by its name"""
+        for node in self._nodes.itervalues():
+            if node['_type'] == 'testproject' and node['name'] == name:
+                return node
+        raise APIError(self.TESTPROJECTNAME_DOESNOT_EXIST, "Test Project (name: %s) does not exist" % name)
+
+    def _project_of(self, node):
+        """Returns the TestProject a node belongs to"""
+        while node['_type'] != 'testproject':
+            node = self._nodes[node['_parent']]
+        return node
+
+    def _plan(self, args):
+        """Returns the TestPlan specified by its ID"""
+        return self._node(self._required(args, 'testplanid'), 'testplan', self.INVALID_TESTPLANID,
+                          "The Test Plan ID (%s) provided does not exist!")
+
+    def _suite(self, _id):
+        """Returns the TestSuite specified by its ID"""
+        return self._node(_id, 'testsuite', self.INVALID_TESTSUITEID,
+                          "The Test Suite ID (%s) provided does not exist!")
+
+    def _case(self, args):
+        """Returns the TestCase specified by its internal or external ID"""
+        if args.get('testcaseid') not in (None, ""):
+            return self._node(args['testcaseid'], 'testcase', self.INVALID_TCASEID,
+                              "The Test Case ID (testcaseid: %s) provided does not exist!")
+        external_id = self._required(args, 'testcaseexternalid')
+        prefix, _, number = str(external_id).rpartition("-")
+        for node in self._nodes.itervalues():
+            if node['_type'] == 'testcase' and str(node['_external_id']) == number and \
+                    (not prefix or self._project_of(node)['prefix'] == prefix):
+                return node
+        raise APIError(self.INVALID_TESTCASE_EXTERNAL_ID, "Test Case External ID (%s) does not exist!" % external_id)
+
+    def _version(self, case, number=None):
+        """Returns the specified or latest version of a TestCase"""
+        if number in (None, ""):
+            number = max(case['_versions'])
+        version = self._versions.get(case['_versions'].get(_int(number)))
+        if version is None:
+            raise APIError(self.VERSION_NOT_VALID, "Version number (%s) is not valid for Test Case (%s)"
+                           % (str(number), case['name']))
+        return version
+
+    def _build(self, plan, args):
+        """Returns the specified Build of a TestPlan, or the latest one if not specified"""
+        builds = [b for b in self._builds.itervalues() if b['testplan_id'] == plan['id']]
+        if args.get('buildid') not in (None, ""):
+            build = self._builds.get(_int(args['buildid']))
+            if build is None:
+                raise APIError(self.INVALID_BUILDID, "The Build ID (%s) provided does not exist!" % args['buildid'])
+            if build['testplan_id'] != plan['id']:
+                raise APIError(self.BAD_BUILD_FOR_TPLAN, "Build ID (%s) does not belong to Test Plan (%s)"
+                               % (args['buildid'], plan['name']))
+            return build
+        if args.get('buildname') not in (None, ""):
+            for build in builds:
+                if build['name'] == args['buildname']:
+                    return build
+            raise APIError(self.BUILDNAME_DOES_NOT_EXIST, "Build name (%s) does not exist in Test Plan (%s)"
+                           % (args['buildname'], plan['name']))
+        if len(builds) == 0:
+            raise APIError(self.TPLAN_HAS_NO_BUILDS, "Test Plan (%s) has no builds" % plan['name'])
+        return builds[-1]
+
+    def _platform_by_name(self, project_id, name):
+        """Returns the internal ID of a Platform of a TestProject specified by its name"""
+        for platform in self._platforms.itervalues():
+            if platform['name'] == name and platform['_project'] == project_id:
+                return platform['id']
+        raise APIError(self.PLATFORM_NAME_DOESNOT_EXIST, "Platform name (%s) does not exist" % name)
+
+    def _platform(self, plan, args, required=True):
+        """Returns the internal ID of the specified Platform of a TestPlan, 0 if the TestPlan has no Platforms"""
+        platform_id = _int(args.get('platformid'), 0)
+        if platform_id <= 0 and args.get('platformname') not in (None, ""):
+            platform_id = self._platform_by_name(plan['_parent'], args['platformname'])
+        if platform_id > 0:
+            if platform_id not in plan['_platforms']:
+                raise APIError(self.PLATFORM_ID_NOT_LINKED_TO_TESTPLAN, "Platform ID (%d) is not linked to "
+                               "Test Plan (%s)" % (platform_id, plan['name']))
+            return platform_id
+        if required and len(plan['_platforms']) > 0:
+            raise APIError(self.MISSING_PLATFORMID_BUT_NEEDED, "Test Plan (%s) has platforms, but no platform "
+                           "has been specified" % plan['name'])
+        return None if len(plan['_platforms']) > 0 else 0
+
+    def _links(self, plan, case, platform_id=None):
+        """Returns the links of a TestCase to a TestPlan, optionally for a single Platform"""
+        links = [link for key, link in plan['_links'].iteritems() if key[0] == case['id']]
+        if len(links) == 0:
+            raise APIError(self.TCASEID_NOT_IN_TPLANID, "Test Case (name: %s) is not associated with Test Plan "
+                           "(name: %s)" % (case['name'], plan['name']))
+        if platform_id is not None:
+            links = [link for link in links if link['platform_id'] == platform_id]
+            if len(links) == 0:
+                raise APIError(self.TCASEID_NOT_IN_TPLANID_FOR_PLATFORM, "Test Case (name: %s) is not associated "
+                               "with Test Plan (name: %s) for Platform (id: %d)"
+                               % (case['name'], plan['name'], platform_id))
+        return links
+
+    def _filter_executions(self, plan, case, args):
+        """Returns the executions of a TestCase within a TestPlan, filtered by Build and Platform if specified"""
+        links = self._links(plan, case, self._platform(plan, args, required=False))
+        platform_ids = set(link['platform_id'] for link in links)
+        build = None
+        if args.get('buildid') not in (None, "") or args.get('buildname') not in (None, ""):
+            build = self._build(plan, args)
+        return [e for e in self._executions.itervalues()
+                if e['testplan_id'] == plan['id'] and e['_tc_id'] == case['id'] and e['platform_id'] in platform_ids
+                and (build is None or e['build_id'] == build['id'])]
+
+    def _last_execution(self, plan, tc_id, platform_id, build_id=None):
+        """Returns the last execution of a linked TestCase or None"""
+        last = None
+        for execution in self._executions.itervalues():
+            if execution['testplan_id'] == plan['id'] and execution['_tc_id'] == tc_id and \
+                    execution['platform_id'] == platform_id and build_id in (None, execution['build_id']):
+                last = execution
+        return last
+
+    def _customfield(self, args, scope, _id):
+        """Returns the value of a CustomField"""
+        name = self._required(args, 'customfieldname')
+        if name not in self._customfields:
+            raise APIError(self.NO_CUSTOMFIELD_BY_THIS_NAME, "Custom Field (name: %s) does not exist" % name)
+        return self._values.get((scope, _id), {}).get(name, "")
+
+    def _set_customfields(self, scope, _id, values):
+        """Stores the values of defined CustomFields, others are ignored"""
+        for name, value in (values or {}).iteritems():
+            if name in self._customfields:
+                self._values.setdefault((scope, _id), {})[name] = value
+
+    def _success(self, operation, _id, **fields):
+        """Returns the response of a successful write"""
+        return [dict(fields, operation=operation, status=True, id=_id, additionalInfo='', message="Success!")]
+
+    def _attach(self, args, fkid, fktable):
+        """Stores an attachment"""
+        filename, filetype, content = self._required(args, 'filename', 'filetype', 'content')
+        if fktable == 'executions':
+            valid = _int(fkid) in self._executions
+        elif fktable in ('req_specs', 'requirements'):
+            node = self._nodes.get(_int(fkid))
+            valid = node is not None and node['_type'] == {'req_specs': 'reqspec', 'requirements': 'req'}[fktable]
+        else:
+            valid = fktable == 'nodes_hierarchy' and _int(fkid) in self._nodes
+        if not valid:
+            raise APIError(self.ATTACH_INVALID_FK, "Invalid Foreign Key ID (%s) Table (%s)" % (fkid, fktable))
+        try:
+            size = len(base64.b64decode(content))
+        except (TypeError, binascii.Error):
+            raise APIError(self.ATTACH_INVALID_ATTACHMENT, "Content of attachment (%s) is not base64 encoded"
+                           % filename)
+        _id = self._next("attachments")
+        self._attachments[_id] = {'id': _id, 'name': filename, 'file_type': filetype, 'title': args.get('title') or "",
+                                  'description': args.get('description') or "", 'date_added': _now(),
+                                  'content': content, '_fk_id': _int(fkid), '_fk_table': fktable, '_size': size}
+        return {'id': _id, 'fk_id': _int(fkid), 'fk_table': fktable, 'title': args.get('title') or "",
+                'description': args.get('description') or "", 'file_name': filename, 'file_size': size,
+                'file_type': filetype}
+
+    def _case_info(self, case, version):
+        """Returns the stored values of a TestCase version as getTestCasesForTestSuite does"""
+        info = _public(version)
+        info.update({'id': str(case['id']), 'tcversion_id': str(version['id']), 'name': case['name'],
+                     'parent_id': str(case['_parent']), 'node_order': str(case['node_order']),
+                     'node_type_id': "3", 'node_table': "testcases", 'tc_external_id': str(case['_external_id']),
+                     'external_id': str(case['_external_id']), 'details': version['summary']})
+        del info['steps']
+        return info
+
+    #
+    # Remote methods
+    #
+    @remote(auth=False)
+    def testLinkVersion(self, args):
+        return self.version
+
+    @remote(auth=False)
+    def about(self, args):
+        return "Testlink API Version: 1.0 (in-memory fake of Testlink %s)" % self.version
+
+    @remote(auth=False)
+    def sayHello(self, args):
+        return "Hello!"
+
+    @remote(auth=False)
+    def repeat(self, args):
+        return "You said: %s" % args.get('str')
+
+    @remote()
+    def checkDevKey(self, args):
+        return True
+
+    @remote()
+    def doesUserExist(self, args):
+        self.getUserByLogin(args)
+        return True
+
+    @remote()
+    def getUserByLogin(self, args):
+        login = self._required(args, 'user')
+        for user in self._users.itervalues():
+            if user['login'] == login:
+                return [dict(user)]
+        raise APIError(self.NO_USER_BY_THIS_LOGIN, "Cannot Find User Login provided (%s)." % login)
+
+    @remote()
+    def getUserByID(self, args):
+        user = self._users.get(_int(self._required(args, 'userid')))
+        if user is None:
+            raise APIError(self.NO_USER_BY_THIS_LOGIN, "Cannot Find User with DB ID (%s)." % args['userid'])
+        return [dict(user)]
+
+    @remote()
+    def getFullPath(self, args):
+        nodeid = self._required(args, 'nodeid')
+        node = self._nodes.get(_int(nodeid))
+        if node is None:
+            raise APIError(self.GENERAL_ERROR, "Node ID (%s) does not exist" % nodeid)
+        path = []
+        while node['_parent'] is not None:
+            node = self._nodes[node['_parent']]
+            path.insert(0, node['name'])
+        return {str(nodeid): path}
+
+    @remote()
+    def createTestProject(self, args):
+        name, prefix = self._required(args, 'name', 'prefix')
+        for node in self._nodes.itervalues():
+            if node['_type'] == 'testproject' and node['name'] == name:
+                raise APIError(self.TESTPROJECTNAME_EXISTS, "There is already a Test Project named %s" % name)
+            if node['_type'] == 'testproject' and node['prefix'] == prefix:
+                raise APIError(self.TESTPROJECT_TESTCASEPREFIX_EXISTS, "There is already a Test Project "
+                               "with prefix %s" % prefix)
+        options = args.get('options') or {}
+        opt = dict((key, int(bool(options.get(key)))) for key in ('requirementsEnabled', 'testPriorityEnabled',
+                                                                 'automationEnabled', 'inventoryEnabled'))
+        node = self._add_node('testproject', None, name=name, prefix=prefix, notes=args.get('notes') or "",
+                              active=int(args.get('active', True)), is_public=int(args.get('public', True)),
+                              tc_counter=0, color="", opt=opt, option_reqs=opt['requirementsEnabled'],
+                              option_priority=opt['testPriorityEnabled'], option_automation=opt['automationEnabled'])
+        return self._success("createTestProject", node['id'])
+
+    @remote()
+    def getProjects(self, args):
+        return [_public(n) for n in self._nodes.itervalues() if n['_type'] == 'testproject']
+
+    @remote()
+    def getTestProjectByName(self, args):
+        return _public(self._project_by_name(self._required(args, 'testprojectname')))
+
+    @remote()
+    def createTestPlan(self, args):
+        name, project_name = self._required(args, 'testplanname', 'testprojectname')
+        project = self._project_by_name(project_name)
+        if any(p['name'] == name for p in self._children(project['id'], 'testplan')):
+            raise APIError(self.TESTPLANNAME_ALREADY_EXISTS, "Test Plan (name: %s) already exists on Test Project "
+                           "(name: %s)" % (name, project_name))
+        node = self._add_node('testplan', project['id'], name=name, notes=args.get('notes') or "",
+                              testproject_id=project['id'], active=int(args.get('active', True)), is_open=1,
+                              is_public=int(args.get('public', True)), _platforms=[], _links=OrderedDict())
+        return self._success("createTestPlan", node['id'])
+
+    @remote()
+    def getTestPlanByName(self, args):
+        name, project_name = self._required(args, 'testplanname', 'testprojectname')
+        project = self._project_by_name(project_name)
+        for plan in self._children(project['id'], 'testplan'):
+            if plan['name'] == name:
+                return [_public(plan)]
+        raise APIError(self.TESTPLANNAME_DOESNOT_EXIST, "Test Plan (name: %s) does not exist on Test Project "
+                       "(name: %s)" % (name, project_name))
+
+    @remote()
+    def getProjectTestPlans(self, args):
+        return [_public(p) for p in self._children(self._project(args)['id'], 'testplan')]
+
+    @remote()
+    def getTestPlanCustomFieldValue(self, args):
+        return self._customfield(args, 'design', self._plan(args)['id'])
+
+    @remote()
+    def createBuild(self, args):
+        plan = self._plan(args)
+        name = self._required(args, 'buildname')
+        for build in self._builds.itervalues():
+            if build['testplan_id'] == plan['id'] and build['name'] == name:
+                return [{'operation': "createBuild", 'status': False, 'id': build['id'],
+                         'message': "Build name (%s) already exists (id:%d)" % (name, build['id'])}]
+        _id = self._next("builds")
+        self._builds[_id] = {'id': _id, 'testplan_id': plan['id'], 'name': name, 'notes': args.get('buildnotes') or "",
+                             'active': int(args.get('active', True)), 'is_open': int(args.get('open', True)),
+                             'release_date': args.get('releasedate') or "", 'closed_on_date': "",
+                             'creation_ts': _now()}
+        return self._success("createBuild", _id)
+
+    @remote()
+    def getLatestBuildForTestPlan(self, args):
+        return _public(self._build(self._plan(args), {}))
+
+    @remote()
+    def getBuildsForTestPlan(self, args):
+        plan = self._plan(args)
+        return [_public(b) for b in self._builds.itervalues() if b['testplan_id'] == plan['id']]
+
+    @remote()
+    def getExecCountersByBuild(self, args):
+        plan = self._plan(args)
+        self._build(plan, {})
+        counters = {}
+        for build in self._builds.itervalues():
+            if build['testplan_id'] != plan['id']:
+                continue
+            counts = dict((status, 0) for status in EXECUTION_STATUS)
+            for tc_id, platform_id in plan['_links']:
+                last = self._last_execution(plan, tc_id, platform_id, build['id'])
+                counts[last['status'] if last is not None else EXECUTION_STATUS.NOT_RUN] += 1
+            counters[str(build['id'])] = dict((status, {'build_id': str(build['id']), 'status': status,
+                                                        'exec_qty': str(count)})
+                                              for status, count in counts.iteritems())
+        return {'raw': {'with_tester': counters}}
+
+    @remote()
+    def createPlatform(self, args):
+        project_name, name = self._required(args, 'testprojectname', 'platformname')
+        project = self._project_by_name(project_name)
+        if any(p['name'] == name and p['_project'] == project['id'] for p in self._platforms.itervalues()):
+            raise APIError(self.PLATFORMNAME_ALREADY_EXISTS, "Platform (name: %s) already exists" % name)
+        _id = self._next("platforms")
+        self._platforms[_id] = {'id': _id, 'name': name, 'notes': args.get('notes') or "", '_project': project['id']}
+        return self._success("createPlatform", _id)
+
+    @remote()
+    def getProjectPlatforms(self, args):
+        project = self._project(args)
+        platforms = [p for p in self._platforms.itervalues() if p['_project'] == project['id']]
+        if len(platforms) == 0:
+            return []
+        return dict((p['name'], _public(p)) for p in platforms)
+
+    @remote()
+    def getTestPlanPlatforms(self, args):
+        plan = self._plan(args)
+        if len(plan['_platforms']) == 0:
+            raise APIError(self.TESTPLAN_HAS_NO_PLATFORMS, "Test plan (name:%s) has no platforms linked"
+                           % plan['name'])
+        return [_public(self._platforms[_id]) for _id in plan['_platforms']]
+
+    @remote()
+    def addPlatformToTestPlan(self, args):
+        plan = self._plan(args)
+        platform_id = self._platform_by_name(plan['_parent'], self._required(args, 'platformname'))
+        if platform_id not in plan['_platforms']:
+            plan['_platforms'].append(platform_id)
+        return {'operation': "link", 'msg': "link done", 'status': True, 'id': platform_id}
+
+    @remote()
+    def removePlatformFromTestPlan(self, args):
+        plan = self._plan(args)
+        platform_id = self._platform(plan, {'platformname': self._required(args, 'platformname')}, required=False)
+        plan['_platforms'].remove(platform_id)
+        return {'operation': "unlink", 'msg': "unlink done", 'status': True, 'id': platform_id}
+
+    @remote()
+    def reportTCResult(self, args):
+        plan = self._plan(args)
+        case = self._case(args)
+        status = self._required(args, 'status')
+        if status not in (EXECUTION_STATUS.PASSED, EXECUTION_STATUS.FAILED, EXECUTION_STATUS.BLOCKED):
+            raise APIError(self.INVALID_STATUS, "Invalid status code (%s) provided" % status)
+        build = self._build(plan, args)
+        platform_id = self._platform(plan, args)
+        link = self._links(plan, case, platform_id)[0]
+        version = self._versions[link['tcversion_id']]
+
+        overwrite = False
+        last = self._last_execution(plan, case['id'], platform_id, build['id'])
+        if args.get('overwrite') and last is not None:
+            overwrite = True
+            _id = last['id']
+        else:
+            _id = self._next("executions")
+        self._executions[_id] = {'id': _id, 'build_id': build['id'], 'tester_id': self._user(args)['dbID'],
+                                 'execution_ts': _now(), 'status': status, 'testplan_id': plan['id'],
+                                 'tcversion_id': version['id'], 'tcversion_number': version['version'],
+                                 'platform_id': platform_id, 'execution_type': EXECUTION_TYPE.AUTOMATIC,
+                                 'execution_duration': args.get('execduration') or "",
+                                 'notes': args.get('notes') or "", '_tc_id': case['id'],
+                                 '_bugid': args.get('bugid')}
+        self._set_customfields('execution', _id, args.get('customfields'))
+        return [{'status': True, 'operation': "reportTCResult", 'overwrite': overwrite, 'id': _id,
+                 'message': "Success!"}]
+
+    @remote()
+    def getLastExecutionResult(self, args):
+        executions = self._filter_executions(self._plan(args), self._case(args), args)
+        if len(executions) == 0:
+            return [{'id': -1}]
+        return [_public(executions[-1])]
+
+    @remote()
+    def getExecutions(self, args):
+        return _struct(self._filter_executions(self._plan(args), self._case(args), args))
+
+    @remote()
+    def deleteExecution(self, args):
+        _id = _int(self._required(args, 'executionid'))
+        if _id not in self._executions:
+            raise APIError(self.GENERAL_ERROR, "Execution (id: %s) does not exist" % args['executionid'])
+        del self._executions[_id]
+        return self._success("deleteExecution", _id)
+
+    @remote()
+    def createTestSuite(self, args):
+        name = self._required(args, 'testsuitename')
+        project = self._project(args)
+        parent = project
+        if args.get('parentid') not in (None, ""):
+            parent = self._nodes.get(_int(args['parentid']))
+            if parent is None or parent['_type'] != 'testsuite' or self._project_of(parent) is not project:
+                raise APIError(self.INVALID_PARENT_TESTSUITEID, "Parent Test Suite ID (%s) is not valid"
+                               % args['parentid'])
+        name_changed = False
+        if args.get('checkduplicatedname'):
+            duplicates = [s for s in self._children(parent['id'], 'testsuite') if s['name'] == name]
+            action = args.get('actiononduplicatedname')
+            if duplicates and action == DUPLICATE_STRATEGY.BLOCK:
+                return [{'operation': "createTestSuite", 'status': False, 'id': duplicates[0]['id'], 'name': name,
+                         'name_changed': False, 'additionalInfo': '',
+                         'message': "There's already a Test Suite with name %s" % name}]
+            if duplicates and action == DUPLICATE_STRATEGY.GENERATE_NEW:
+                name = "%s %s" % (name, _now())
+                name_changed = True
+        node = self._add_node('testsuite', parent['id'], name=name, details=args.get('details') or "",
+                              parent_id=parent['id'], node_order=_int(args.get('order'), 0), node_type_id=2)
+        return self._success("createTestSuite", node['id'], name=name, name_changed=name_changed)
+
+    @remote()
+    def getTestSuiteByID(self, args):
+        suite = self._suite(self._required(args, 'testsuiteid'))
+        if args.get('testprojectid') not in (None, "") and self._project_of(suite)['id'] != _int(args['testprojectid']):
+            raise APIError(self.TESTSUITE_DONOTBELONG_TO_TESTPROJECT, "Test Suite (%s) does not belong to Test "
+                           "Project (%s)" % (suite['id'], args['testprojectid']))
+        return _public(suite)
+
+    @remote()
+    def getTestSuitesForTestSuite(self, args):
+        suites = self._children(self._suite(self._required(args, 'testsuiteid'))['id'], 'testsuite')
+        if len(suites) == 0:
+            return ""
+        if len(suites) == 1:
+            return _public(suites[0])
+        return _struct(suites)
+
+    @remote()
+    def getFirstLevelTestSuitesForTestProject(self, args):
+        project = self._project(args)
+        suites = self._children(project['id'], 'testsuite')
+        if len(suites) == 0:
+            raise APIError(self.TPROJECT_IS_EMPTY, "Test Project (%s) is empty." % project['name'])
+        return [{'id': str(s['id']), 'name': s['name'], 'parent_id': str(s['parent_id']), 'node_type_id': "2",
+                 'node_order': str(s['node_order']), 'node_table': "testsuites"} for s in suites]
+
+    @remote()
+    def getTestSuitesForTestPlan(self, args):
+        plan = self._plan(args)
+        suite_ids = []
+        for tc_id, _ in plan['_links']:
+            suite_id = self._nodes[tc_id]['_parent']
+            if suite_id not in suite_ids:
+                suite_ids.append(suite_id)
+        return [_public(self._nodes[_id]) for _id in suite_ids]
+
+    @remote()
+    def createTestCase(self, args):
+        name, suite_id, author = self._required(args, 'testcasename', 'testsuiteid', 'authorlogin')
+        project = self._project(args)
+        suite = self._suite(suite_id)
+        if self._project_of(suite) is not project:
+            raise APIError(self.TESTSUITE_DONOTBELONG_TO_TESTPROJECT, "Test Suite (%s) does not belong to Test "
+                           "Project (%s)" % (suite_id, project['id']))
+        author = self.getUserByLogin({'user': author})[0]
+
+        case = None
+        new_name = ""
+        if args.get('checkduplicatedname'):
+            duplicates = [c for c in self._children(suite['id'], 'testcase') if c['name'] == name]
+            action = args.get('actiononduplicatedname')
+            if duplicates and action == DUPLICATE_STRATEGY.BLOCK:
+                message = "There's already a Test Case with this title (%s)" % name
+                return [{'operation': "createTestCase", 'status': False, 'id': -1, 'message': message,
+                         'additionalInfo': {'id': duplicates[0]['id'], 'status_ok': 0, 'msg': message,
+                                            'has_duplicate': True}}]
+            if duplicates and action == DUPLICATE_STRATEGY.GENERATE_NEW:
+                name = new_name = "%s %s" % (name, _now())
+            elif duplicates and action == DUPLICATE_STRATEGY.NEW_VERSION:
+                case = duplicates[0]
+        if case is None:
+            project['tc_counter'] += 1
+            case = self._add_node('testcase', suite['id'], name=name, node_order=_int(args.get('order'), 0),
+                                  _external_id=project['tc_counter'], _versions=OrderedDict(), _keywords=[])
+
+        number = len(case['_versions']) + 1
+        version_id = self._next("nodes")
+        steps = []
+        for step in args.get('steps') or []:
+            steps.append({'id': self._next("nodes"), 'step_number': _int(step.get('step_number'), len(steps) + 1),
+                          'actions': step.get('actions') or "", 'expected_results': step.get('expected_results') or "",
+                          'execution_type': _int(step.get('execution_type'), EXECUTION_TYPE.MANUAL), 'active': 1})
+        self._versions[version_id] = {
+            'id': version_id, 'testcase_id': case['id'], 'tc_external_id': case['_external_id'],
+            'version': number, 'summary': args.get('summary') or "", 'preconditions': args.get('preconditions') or "",
+            'importance': _int(args.get('importance'), IMPORTANCE_LEVEL.MEDIUM),
+            'execution_type': _int(args.get('executiontype'), EXECUTION_TYPE.MANUAL),
+            'status': TESTCASE_STATUS.DRAFT, 'active': 1, 'is_open': 1, 'layout': 1, 'author_id': author['dbID'],
+            'creation_ts': _now(), 'updater_id': "", 'modification_ts': "", 'estimated_exec_duration': "",
+            'steps': steps}
+        case['_versions'][number] = version_id
+        self._set_customfields('design', version_id, args.get('customfields'))
+        return [{'operation': "createTestCase", 'status': True, 'id': case['id'], 'message': "",
+                 'additionalInfo': {'id': case['id'], 'external_id': case['_external_id'], 'status_ok': 1,
+                                    'msg': "ok", 'new_name': new_name, 'version_number': number,
+                                    'has_duplicate': number > 1, 'tcversion_id': version_id}}]
+
+    @remote()
+    def updateTestCase(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        version = self._version(case, args.get('version'))
+        if args.get('testcasename') not in (None, ""):
+            case['name'] = args['testcasename']
+        for arg, field in (('summary', 'summary'), ('preconditions', 'preconditions'),
+                           ('importance', 'importance'), ('executiontype', 'execution_type'),
+                           ('status', 'status'), ('estimatedexecduration', 'estimated_exec_duration')):
+            if args.get(arg) is not None:
+                version[field] = args[arg]
+        if args.get('steps') is not None:
+            self.deleteTestCaseSteps({'testcaseexternalid': args['testcaseexternalid'], 'version': version['version'],
+                                      'steps': [s['step_number'] for s in version['steps']]})
+            self.createTestCaseSteps({'testcaseid': case['id'], 'version': version['version'], 'action': "create",
+                                      'steps': args['steps']})
+        version['updater_id'] = str(self._user(args)['dbID'])
+        version['modification_ts'] = _now()
+        return [{'operation': "updateTestCase", 'status_ok': True, 'msg': "ok", 'id': version['id']}]
+
+    @remote()
+    def setTestCaseExecutionType(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        version = self._version(case, args.get('version'))
+        version['execution_type'] = _int(self._required(args, 'executiontype'))
+        return [{'operation': "setTestCaseExecutionType", 'status_ok': True, 'msg': "ok", 'id': version['id']}]
+
+    @remote()
+    def createTestCaseSteps(self, args):
+        version = self._version(self._case(args), args.get('version'))
+        action = args.get('action') or "create"
+        by_number = dict((step['step_number'], step) for step in version['steps'])
+        feedback = []
+        for step in self._required(args, 'steps'):
+            number = _int(step.get('step_number'), len(version['steps']) + 1)
+            values = {'actions': step.get('actions') or "", 'expected_results': step.get('expected_results') or "",
+                      'execution_type': _int(step.get('execution_type'), EXECUTION_TYPE.MANUAL)}
+            if number in by_number and action == "create":
+                feedback.append({'step_number': number, 'status_ok': 0, 'msg': "Step already exists"})
+                continue
+            if number in by_number and action == "update":
+                by_number[number].update(values)
+            elif number not in by_number and action == "update":
+                feedback.append({'step_number': number, 'status_ok': 0, 'msg': "Step does not exist"})
+                continue
+            else:
+                if number in by_number:
+                    # Push existing steps down
+                    for other in version['steps']:
+                        if other['step_number'] >= number:
+                            other['step_number'] += 1
+                new = dict(values, id=self._next("nodes"), step_number=number, active=1)
+                version['steps'].append(new)
+                by_number = dict((s['step_number'], s) for s in version['steps'])
+            feedback.append({'step_number': number, 'status_ok': 1, 'msg': "ok"})
+        version['steps'].sort(key=lambda s: s['step_number'])
+        return {'operation': "createTestCaseSteps", 'status_ok': True, 'msg': "ok", 'tcversion_id': version['id'],
+                'feedback': feedback}
+
+    @remote()
+    def deleteTestCaseSteps(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        version = self._version(case, args.get('version'))
+        numbers = set(_int(n) for n in self._required(args, 'steps'))
+        version['steps'] = [s for s in version['steps'] if s['step_number'] not in numbers]
+        return {'operation': "deleteTestCaseSteps", 'status_ok': True, 'msg': "ok", 'tcversion_id': version['id']}
+
+    @remote()
+    def getTestCase(self, args):
+        case = self._case(args)
+        version = self._version(case, args.get('version'))
+        author = self._users.get(version['author_id'], {})
+        info = _public(version)
+        info.update({'name': case['name'], 'node_order': str(case['node_order']),
+                     'testsuite_id': str(case['_parent']),
+                     'full_tc_external_id': "%s-%d" % (self._project_of(case)['prefix'], case['_external_id']),
+                     'author_login': author.get('login', ""), 'author_first_name': author.get('firstName', ""),
+                     'author_last_name': author.get('lastName', ""),
+                     'steps': [_public(step) for step in version['steps']]})
+        return [info]
+
+    @remote()
+    def getTestCaseIDByName(self, args):
+        name = self._required(args, 'testcasename')
+        path = None
+        if args.get('testcasepathname') not in (None, ""):
+            path = args['testcasepathname'].split("::")
+            name = path[-1]
+        result = []
+        for case in self._nodes.itervalues():
+            if case['_type'] != 'testcase' or case['name'] != name:
+                continue
+            suite = self._nodes[case['_parent']]
+            project = self._project_of(case)
+            if args.get('testsuitename') not in (None, "") and suite['name'] != args['testsuitename']:
+                continue
+            if args.get('testprojectname') not in (None, "") and project['name'] != args['testprojectname']:
+                continue
+            if path is not None and self.getFullPath({'nodeid': case['id']})[str(case['id'])] != path[:-1]:
+                continue
+            result.append({'id': str(case['id']), 'name': case['name'], 'parent_id': str(suite['id']),
+                           'tsuite_name': suite['name'], 'tc_external_id': str(case['_external_id'])})
+        if len(result) == 0:
+            raise APIError(self.NO_TESTCASE_BY_THIS_NAME, "Cannot find matching test case. No testcase exists "
+                           "with the name provided!")
+        return result
+
+    @remote()
+    def getTestCasesForTestSuite(self, args):
+        suites = [self._suite(self._required(args, 'testsuiteid'))]
+        if args.get('deep'):
+            i = 0
+            while i < len(suites):
+                suites.extend(self._children(suites[i]['id'], 'testsuite'))
+                i += 1
+        cases = [case for suite in suites for case in self._children(suite['id'], 'testcase')]
+        details = args.get('details') or "simple"
+        if details == "only_id":
+            return [str(case['id']) for case in cases]
+        result = []
+        for case in cases:
+            if details == "full":
+                info = self._case_info(case, self._version(case))
+            else:
+                info = {'id': str(case['id']), 'name': case['name'], 'parent_id': str(case['_parent']),
+                        'node_type_id': "3", 'node_order': str(case['node_order']), 'node_table': "testcases",
+                        'external_id': str(case['_external_id'])}
+            if args.get('getkeywords') and len(case['_keywords']) > 0:
+                info['keywords'] = dict((str(k['keyword_id']), _public(k)) for k in case['_keywords'])
+            result.append(info)
+        return result
+
+    @remote()
+    def getTestCasesForTestPlan(self, args):
+        plan = self._plan(args)
+        build = None
+        if args.get('buildid') not in (None, ""):
+            build = self._builds.get(_int(args['buildid']))
+            if build is None or build['testplan_id'] != plan['id']:
+                raise APIError(self.BAD_BUILD_FOR_TPLAN, "Build ID (%s) does not belong to Test Plan (%s)"
+                               % (args['buildid'], plan['name']))
+        tc_id = None
+        if args.get('testcaseid') not in (None, ""):
+            case = self._case({'testcaseid': args['testcaseid']})
+            self._links(plan, case)
+            tc_id = case['id']
+        statuses = args.get('executestatus')
+        if isinstance(statuses, basestring):
+            statuses = [statuses]
+        keywords = args.get('keywords')
+        if isinstance(keywords, basestring):
+            keywords = [keywords]
+
+        result = {}
+        for (case_id, platform_id), link in plan['_links'].iteritems():
+            if tc_id is not None and case_id != tc_id:
+                continue
+            case = self._nodes[case_id]
+            version = self._versions[link['tcversion_id']]
+            if args.get('executiontype') not in (None, "") and \
+                    version['execution_type'] != _int(args['executiontype']):
+                continue
+            if args.get('keywordid') not in (None, "") and \
+                    _int(args['keywordid']) not in [k['keyword_id'] for k in case['_keywords']]:
+                continue
+            if keywords and not set(keywords).intersection(k['keyword'] for k in case['_keywords']):
+                continue
+            if args.get('assignedto') not in (None, ""):
+                # Assignments of testers are not supported
+                continue
+            last = self._last_execution(plan, case_id, platform_id, build['id'] if build else None)
+            if args.get('executed') and last is None:
+                continue
+            status = last['status'] if last is not None else EXECUTION_STATUS.NOT_RUN
+            if statuses and status not in statuses:
+                continue
+
+            info = _public(version)
+            # The TestCase is identified by 'tc_id' here
+            for key in ('id', 'testcase_id', 'steps'):
+                del info[key]
+            info.update(link)
+            info.update({'tc_id': str(case_id), 'tcversion_id': str(version['id']), 'name': case['name'],
+                         'tcase_name': case['name'], 'external_id': str(case['_external_id']),
+                         'full_external_id': "%s-%d" % (self._project_of(case)['prefix'], case['_external_id']),
+                         'platform_id': str(platform_id),
+                         'platform_name': self._platforms[platform_id]['name'] if platform_id else "",
+                         'testsuite_id': str(case['_parent']), 'tsuite_name': self._nodes[case['_parent']]['name'],
+                         'priority': str(link['urgency'] * _int(version['importance'], 0)),
+                         'exec_status': status, 'exec_id': "", 'executed': "", 'execution_notes': "",
+                         'execution_ts': "", 'exec_on_build': "", 'exec_on_tplan': "", 'tester_id': "",
+                         'execution_run_type': "", 'execution_duration': "", 'user_id': "", 'assigner_id': "",
+                         'assigned_build_id': ""})
+            if last is not None:
+                info.update({'exec_id': str(last['id']), 'executed': str(last['tcversion_id']),
+                             'execution_notes': last['notes'], 'execution_ts': last['execution_ts'],
+                             'exec_on_build': str(last['build_id']), 'exec_on_tplan': str(plan['id']),
+                             'tester_id': str(last['tester_id']), 'execution_run_type': str(last['execution_type']),
+                             'execution_duration': str(last['execution_duration'])})
+            if args.get('getstepsinfo'):
+                info['steps'] = [_public(step) for step in version['steps']]
+            result.setdefault(str(case_id), {})[str(platform_id)] = _public(info)
+        if len(result) == 0:
+            return []
+        return result
+
+    @remote()
+    def addTestCaseToTestPlan(self, args):
+        project = self._project(args)
+        plan = self._plan(args)
+        if plan['_parent'] != project['id']:
+            raise APIError(self.TPLAN_TPROJECT_KO, "Test Plan (%s) does not belong to Test Project (%s)"
+                           % (plan['name'], project['name']))
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        if self._project_of(case) is not project:
+            raise APIError(self.TCASE_TPROJECT_KO, "Test Case (%s) does not belong to Test Project (%s)"
+                           % (case['name'], project['name']))
+        version = self._version(case, self._required(args, 'version'))
+        platform_id = self._platform(plan, args)
+        link = plan['_links'].get((case['id'], platform_id))
+        if link is not None and link['tcversion_id'] == version['id']:
+            raise APIError(self.LINKED_FEATURE_ALREADY_EXISTS, "Test Case version (%s) is already linked to Test "
+                           "Plan (%s)" % (version['version'], plan['name']))
+        if link is not None:
+            raise APIError(self.OTHER_VERSION_IS_ALREADY_LINKED, "Another version of Test Case (%s) is already "
+                           "linked to Test Plan (%s)" % (case['name'], plan['name']))
+        feature_id = self._next("features")
+        plan['_links'][(case['id'], platform_id)] = {
+            'feature_id': feature_id, 'tcversion_id': version['id'], 'version': version['version'],
+            'platform_id': platform_id, 'urgency': _int(args.get('urgency'), 2),
+            'execution_order': _int(args.get('executionorder'), len(plan['_links']) * 10 + 10),
+            'linked_ts': _now(), 'linked_by': str(self._user(args)['dbID'])}
+        return {'operation': "addTestCaseToTestPlan", 'feature_id': feature_id, 'status': True}
+
+    @remote()
+    def assignRequirements(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        for group in self._required(args, 'requirements'):
+            for req_id in group.get('requirements') or []:
+                req = self._node(req_id, 'req', self.INVALID_REQUIREMENTID,
+                                 "The Requirement ID (%s) provided does not exist!")
+                if case['id'] not in req['_coverage']:
+                    req['_coverage'].append(case['id'])
+        return self._success("assignRequirements", case['id'])
+
+    @remote()
+    def getReqSpecCustomFieldDesignValue(self, args):
+        return self._customfield(args, 'design', self._node(self._required(args, 'reqspecid'), 'reqspec',
+                                                            self.INVALID_REQSPECID,
+                                                            "The Requirement Specification ID (%s) provided "
+                                                            "does not exist!")['id'])
+
+    @remote()
+    def getRequirementCustomFieldDesignValue(self, args):
+        return self._customfield(args, 'design', self._node(self._required(args, 'requirementid'), 'req',
+                                                            self.INVALID_REQUIREMENTID,
+                                                            "The Requirement ID (%s) provided does not exist!")['id'])
+
+    @remote()
+    def getTestSuiteCustomFieldDesignValue(self, args):
+        return self._customfield(args, 'design', self._suite(self._required(args, 'testsuiteid'))['id'])
+
+    @remote()
+    def getTestCaseCustomFieldDesignValue(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        version = self._version(case, self._required(args, 'version'))
+        value = self._customfield(args, 'design', version['id'])
+        if (args.get('details') or "value") == "value":
+            return value
+        return dict(self._customfields[args['customfieldname']], value=value)
+
+    @remote()
+    def updateTestCaseCustomFieldDesignValue(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        version = self._version(case, self._required(args, 'version'))
+        self._set_customfields('design', version['id'], args.get('customfields'))
+        return ""
+
+    @remote()
+    def getTestCaseCustomFieldExecutionValue(self, args):
+        _id = _int(self._required(args, 'executionid'))
+        if _id not in self._executions:
+            raise APIError(self.GENERAL_ERROR, "Execution (id: %s) does not exist" % args['executionid'])
+        return self._customfield(args, 'execution', _id)
+
+    @remote()
+    def getTestCaseCustomFieldTestPlanDesignValue(self, args):
+        self._plan(args)
+        return self._customfield(args, 'testplan_design', _int(self._required(args, 'linkid')))
+
+    @remote()
+    def uploadAttachment(self, args):
+        fkid, fktable = self._required(args, 'fkid', 'fktable')
+        return self._attach(args, fkid, fktable)
+
+    @remote()
+    def uploadRequirementSpecificationAttachment(self, args):
+        return self._attach(args, self._required(args, 'reqspecid'), 'req_specs')
+
+    @remote()
+    def uploadRequirementAttachment(self, args):
+        return self._attach(args, self._required(args, 'requirementid'), 'requirements')
+
+    @remote()
+    def uploadTestProjectAttachment(self, args):
+        return self._attach(args, self._project(args)['id'], 'nodes_hierarchy')
+
+    @remote()
+    def uploadTestSuiteAttachment(self, args):
+        return self._attach(args, self._suite(self._required(args, 'testsuiteid'))['id'], 'nodes_hierarchy')
+
+    @remote()
+    def uploadTestCaseAttachment(self, args):
+        return self._attach(args, self._case({'testcaseid': self._required(args, 'testcaseid')})['id'],
+                            'nodes_hierarchy')
+
+    @remote()
+    def uploadExecutionAttachment(self, args):
+        return self._attach(args, self._required(args, 'executionid'), 'executions')
+
+    @remote()
+    def getAttachments(self, args):
+        fkid, fktable = self._required(args, 'fkid', 'fktable')
+        return _struct([a for a in self._attachments.itervalues()
+                        if a['_fk_id'] == _int(fkid) and a['_fk_table'] == fktable])
+
+    @remote()
+    def getTestCaseAttachments(self, args):
+        return self.getAttachments({'fkid': self._case(args)['id'], 'fktable': "nodes_hierarchy"})
+
+    @remote()
+    def deleteAttachment(self, args):
+        _id = _int(self._required(args, 'attachmentid'))
+        if self._attachments.pop(_id, None) is None:
+            raise APIError(self.ATTACH_INVALID_ATTACHMENT, "Attachment (id: %s) does not exist" % args['attachmentid'])
+        return [{'status_ok': True, 'msg': "ok", 'id': _id}]
+
+    @remote()
+    def createRequirementSpecification(self, args):
+        project = self._project(args)
+        docid, title = self._required(args, 'docid', 'title')
+        parent = project
+        if args.get('parentid') not in (None, ""):
+            parent = self._node(args['parentid'], 'reqspec', self.INVALID_REQSPECID,
+                                "The Requirement Specification ID (%s) provided does not exist!")
+        node = self._add_node('reqspec', parent['id'], name=title, title=title, doc_id=docid,
+                              typ=_int(args.get('type'), 1), scope=args.get('scope') or "",
+                              testproject_id=project['id'], parent_id=parent['id'],
+                              author_id=_int(args.get('userid'), self._user(args)['dbID']), creation_ts=_now(),
+                              modifier_id="", modification_ts="", node_order=0)
+        return self._success("createRequirementSpecification", node['id'])
+
+    def _reqspec_info(self, spec):
+        """Returns a Requirement Specification including the amount of Requirements"""
+        info = _public(spec)
+        info['total_req'] = str(len(self._children(spec['id'], 'req')))
+        del info['name']
+        return info
+
+    @remote()
+    def getRequirementSpecificationsForTestProject(self, args):
+        return [self._reqspec_info(s) for s in self._children(self._project(args)['id'], 'reqspec')]
+
+    @remote()
+    def getRequirementSpecificationsForRequirementSpecification(self, args):
+        spec = self._node(self._required(args, 'reqspecid'), 'reqspec', self.INVALID_REQSPECID,
+                          "The Requirement Specification ID (%s) provided does not exist!")
+        return [self._reqspec_info(s) for s in self._children(spec['id'], 'reqspec')]
+
+    @remote()
+    def createRequirement(self, args):
+        project = self._project(args)
+        spec = self._node(self._required(args, 'reqspecid'), 'reqspec', self.INVALID_REQSPECID,
+                          "The Requirement Specification ID (%s) provided does not exist!")
+        docid, title = self._required(args, 'docid', 'title')
+        user = self._users.get(_int(args.get('userid')), self._user(args))
+        node = self._add_node('req', spec['id'], name=title, title=title, srs_id=spec['id'], req_doc_id=docid,
+                              req_spec_title=spec['title'], type=_int(args.get('type'), 1), version=1,
+                              version_id=self._next("nodes"), revision=1, revision_id=self._next("nodes"),
+                              scope=args.get('scope') or "", status=args.get('status') or "V", node_order=0,
+                              is_open=1, active=1, expected_coverage=_int(args.get('coverage'), 1),
+                              testproject_id=project['id'], author=user['login'], author_id=user['dbID'],
+                              modifier="", modifier_id="", creation_ts=_now(), modification_ts="", _coverage=[])
+        return self._success("createRequirement", node['id'])
+
+    @remote()
+    def getRequirementsForRequirementSpecification(self, args):
+        spec = self._node(self._required(args, 'reqspecid'), 'reqspec', self.INVALID_REQSPECID,
+                          "The Requirement Specification ID (%s) provided does not exist!")
+        return [_public(r) for r in self._children(spec['id'], 'req')]
+
+    @remote()
+    def createRisk(self, args):
+        req = self._node(self._required(args, 'requirementid'), 'req', self.INVALID_REQUIREMENTID,
+                         "The Requirement ID (%s) provided does not exist!")
+        docid, title = self._required(args, 'docid', 'title')
+        _id = self._next("risks")
+        self._risks[_id] = {'id': _id, 'risk_doc_id': docid, 'name': title, 'description': args.get('scope') or "",
+                            'author_id': _int(args.get('userid'), self._user(args)['dbID']), 'creation_ts': _now(),
+                            'modifier_id': "", 'modification_ts': "", 'requirement_id': req['id'],
+                            'cross_coverage': args.get('coverage') or "", '_coverage': []}
+        return self._success("createRisk", _id)
+
+    @remote()
+    def getRisksForRequirement(self, args):
+        req_id = _int(self._required(args, 'requirementid'))
+        return [_public(r) for r in self._risks.itervalues() if r['requirement_id'] == req_id]
+
+    @remote()
+    def assignRisks(self, args):
+        case = self._case({'testcaseexternalid': self._required(args, 'testcaseexternalid')})
+        for risk_id in self._required(args, 'risks'):
+            if isinstance(risk_id, dict):
+                risk_id = risk_id.get('id')
+            risk = self._risks.get(_int(risk_id))
+            if risk is None:
+                raise APIError(self.GENERAL_ERROR, "Risk (id: %s) does not exist" % risk_id)
+            if case['id'] not in risk['_coverage']:
+                risk['_coverage'].append(case['id'])
+        return self._success("assignRisks", case['id'])
+
+    @remote()
+    def getRequirementCoverage(self, args):
+        req = self._node(self._required(args, 'requirementid'), 'req', self.INVALID_REQUIREMENTID,
+                         "The Requirement ID (%s) provided does not exist!")
+        cases = [self._nodes[tc_id] for tc_id in req['_coverage']]
+        if args.get('testplanid') not in (None, ""):
+            plan = self._plan(args)
+            platform_id = _int(args.get('platformid'), 0)
+            linked = set(tc_id for tc_id, p_id in plan['_links'] if platform_id <= 0 or p_id == platform_id)
+            cases = [case for case in cases if case['id'] in linked]
+        return [{'id': str(case['id']), 'name': case['name'], 'tc_external_id': str(case['_external_id'])}
+                for case in cases]
+
+
+class _FakeRequestHandler(SimpleXMLRPCRequestHandler):
+    """Accepts requests at the RPC paths of Testlink"""
+
+    rpc_paths = tuple(TestlinkXMLRPCAPI.RPC_PATHS) + ('/', '/RPC2')
+
+
+class FakeTestlinkServer(ThreadingMixIn, SimpleXMLRPCServer, Thread):
+    """XML-RPC server serving a FakeTestlink at the RPC paths of Testlink, e.g. for TestlinkXMLRPCAPI.
+    Requests are handled concurrently, the data is accessed by one request at a time.
+
+    Remote methods:
+
+        * tl.*: See FakeTestlink
+        * system.listMethods(), system.methodHelp(name), system.methodSignature(name)
+        * system.multicall(calls): Runs several remote methods within a single request
+
+    @ivar testlink: The served data
+    @type testlink: FakeTestlink
+    @ivar requests: Amount of handled HTTP requests
+    @type requests: int
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, testlink=None, host='127.0.0.1', port=0, latency=0, verbose=False):
+        """Initializes and starts the Server
+        @param testlink: <OPTIONAL> The served data, defaults to an empty FakeTestlink
+        @type testlink: FakeTestlink
+        @param host: The address of the Server
+        @type host: str
+        @param port: The port of the Server, 0 to use any free port
+        @type port: int
+        @param latency: Additional delay of each HTTP request in seconds to simulate a remote Testlink
+        @type latency: float
+        @param verbose: Log HTTP requests
+        @type verbose: bool
+        """
+        SimpleXMLRPCServer.__init__(self, (host, port), requestHandler=_FakeRequestHandler,
+                                    logRequests=verbose, allow_none=True)
+        Thread.__init__(self, name="FakeTestlinkServer")
+        self.daemon = True
+        self.testlink = testlink or FakeTestlink()
+        self.requests = 0
+        self._requests_lock = Lock()
+        self._latency = latency
+        self._stopped = False
+        self.register_introspection_functions()
+        self.register_multicall_functions()
+        LOGGER.info("Starting fake Testlink %s at %s" % (self.testlink.version, self.url))
+        self.start()
+
+    @property
+    def port(self):
+        """The port the Server is listening on"""
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        """The URL of the served Testlink"""
+        return "http://%s:%d" % self.server_address
+
+    def run(self):
+        self.serve_forever()
+
+    def shutdown(self):
+        """Stops the Server"""
+        if self._stopped:
+            return
+        self._stopped = True
+        LOGGER.info("Shutting down fake Testlink at %s" % self.url)
+        SimpleXMLRPCServer.shutdown(self)
+        self.server_close()
+        self.join()
+
+    def _marshaled_dispatch(self, data, dispatch_method=None, path=None):
+        """Handles a single HTTP request, delayed by the configured latency"""
+        with self._requests_lock:
+            self.requests += 1
+        if self._latency:
+            time.sleep(self._latency)
+        return SimpleXMLRPCServer._marshaled_dispatch(self, data, dispatch_method, path)
+
+    def _dispatch(self, method, params):
+        if method.startswith("tl."):
+            return self.testlink.call(method, params)
+        return SimpleXMLRPCServer._dispatch(self, method, params)
+
+    def system_listMethods(self):
+        return sorted(SimpleXMLRPCServer.system_listMethods(self) + self.testlink.listMethods())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Flakiness Analysis
+==================
+:module: testlink.flaky
+
+Incremental detection of flaky TestCases from their execution history.
+
+A rolling state is kept for each TestCase on each Platform. New executions
+only update this state, so the history of hundreds of Builds does not have
+to be analysed again whenever a new Build has been executed. The state can
+be stored to disk and loaded again by a later run.
+
+The state tracks:
+
+    * how often the result flipped between passed and failed, overall and
+      with exponentially decaying weight to focus on recent executions
+    * in how many Builds a TestCase passed after it had failed within the
+      same Build (e.g. a successful rerun)
+
+Blocked and not run executions are counted, but do not tell anything about
+flakiness.
+
+:Examples:
+
+    >>> analyzer = FlakinessAnalyzer.load("flaky.json")
+    >>> analyzer.update(plan.getExecutionHistory())
+    >>> for (tc_id, platform_id), state in analyzer.flaky(threshold=0.2):
+    >>>     print tc_id, platform_id, state.score
+    >>> analyzer.dump("flaky.json")
+"""
+
+# IMPORTS
+import os
+import json
+from itertools import izip
+
+from testlink.enums import EXECUTION_STATUS
+
+__all__ = ["CaseFlakiness", "FlakinessAnalyzer"]
+
+
+class CaseFlakiness(object):
+    """Rolling flakiness state of a single TestCase on a single Platform
+    @ivar runs: Amount of passed or failed executions
+    @type runs: int
+    @ivar flips: Amount of changes between passed and failed
+    @type flips: int
+    @ivar recent: Exponentially decaying flip rate
+    @type recent: float
+    @ivar failed_builds: Amount of Builds with at least one failed execution
+    @type failed_builds: int
+    @ivar retried_builds: Amount of Builds, in which a failed execution was followed by a passed one
+    @type retried_builds: int
+    """
+
+    __slots__ = ("runs", "flips", "recent", "failed_builds", "retried_builds",
+                 "last_status", "last_build", "build_state", "last_execution_id")
+
+    # Build states
+    _CLEAN, _FAILED, _RETRIED = range(3)
+
+    def __init__(self, runs=0, flips=0, recent=0.0, failed_builds=0, retried_builds=0,
+                 last_status=None, last_build=None, build_state=0, last_execution_id=0):
+        self.runs = runs
+        self.flips = flips
+        self.recent = recent
+        self.failed_builds = failed_builds
+        self.retried_builds = retried_builds
+        self.last_status = last_status
+        self.last_build = last_build
+        self.build_state = build_state
+        self.last_execution_id = last_execution_id
+
+    def __repr__(self):
+        return "<CaseFlakiness: score=%.3f runs=%d flips=%d>" % (self.score, self.runs, self.flips)
+
+    @property
+    def flip_rate(self):
+        """Share of consecutive executions with different results"""
+        if self.runs < 2:
+            return 0.0
+        return float(self.flips) / (self.runs - 1)
+
+    @property
+    def retry_rate(self):
+        """Share of failed Builds, which passed later on"""
+        if self.failed_builds == 0:
+            return 0.0
+        return float(self.retried_builds) / self.failed_builds
+
+    @property
+    def score(self):
+        """Flakiness score between 0 (stable) and 1 (flaky)"""
+        return (self.recent + self.retry_rate) / 2
+
+    def add(self, execution_id, build_id, status, decay):
+        """Updates the state by a single execution
+        @param execution_id: The internal ID of the Execution
+        @type execution_id: int
+        @param build_id: The internal ID of the Build
+        @type build_id: int
+        @param status: Execution status
+        @type status: str
+        @param decay: Weight of this execution within the decaying flip rate
+        @type decay: float
+        @returns: False if the execution has already been processed
+        @rtype: bool
+        """
+        if execution_id <= self.last_execution_id:
+            return False
+        self.last_execution_id = execution_id
+        if status != EXECUTION_STATUS.PASSED and status != EXECUTION_STATUS.FAILED:
+            return True
+
+        if build_id != self.last_build:
+            self.last_build = build_id
+            self.build_state = self._CLEAN
+        if status == EXECUTION_STATUS.FAILED:
+            if self.build_state == self._CLEAN:
+                self.build_state = self._FAILED
+                self.failed_builds += 1
+        elif self.build_state == self._FAILED:
+            self.build_state = self._RETRIED
+            self.retried_builds += 1
+
+        if self.last_status is not None:
+            flip = status != self.last_status
+            self.flips += flip
+            self.recent += decay * (flip - self.recent)
+        self.last_status = status
+        self.runs += 1
+        return True
+
+    def as_list(self):
+        """Returns the state as list of slot values"""
+        return [getattr(self, name) for name in self.__slots__]
+
+
+class FlakinessAnalyzer(object):
+    """Flakiness state of several TestCases by (tc_id, platform_id)
+
+    .. data:: DECAY
+
+       Weight of a new execution within the decaying flip rate
+
+    .. data:: MIN_RUNS
+
+       Default minimal amount of results before a TestCase is considered flaky
+    """
+
+    DECAY = 0.1  # Weight of the latest execution
+    MIN_RUNS = 5  # Results required to judge a TestCase
+
+    def __init__(self, decay=None):
+        """Initialises an empty analyzer
+        @param decay: <OPTIONAL> Weight of a new execution, defaults to FlakinessAnalyzer.DECAY
+        @type decay: float
+        """
+        self._decay = decay or self.DECAY
+        self._cases = {}
+
+    def __len__(self):
+        return len(self._cases)
+
+    def __iter__(self):
+        return iter(self._cases)
+
+    def __contains__(self, key):
+        return key in self._cases
+
+    def __getitem__(self, key):
+        """Returns the state of a single TestCase
+        @param key: Internal ID of the TestCase and the Platform
+        @type key: tuple
+        @rtype: CaseFlakiness
+        """
+        return self._cases[key]
+
+    def update(self, history):
+        """Processes new executions of an execution history.
+        Executions are processed in order of their IDs, like by extend,
+        executions up to the last processed ID are skipped.
+        @param history: Execution history, see TestPlan.getExecutionHistory
+        @type history: ExecutionHistory
+        @returns: Amount of new executions
+        @rtype: int
+        """
+        cases = self._cases
+        decay = self._decay
+        added = 0
+        key = state = None
+        # Timestamps may disagree with the IDs, which track the processed executions
+        history = history.sort("tc_id", "platform_id", "execution_id")
+        for execution_id, tc_id, build_id, platform_id, status in izip(history['execution_id'], history['tc_id'],
+                                                                       history['build_id'], history['platform_id'],
+                                                                       history['status']):
+            # Rows are grouped by TestCase, so look up the state only on change
+            if key != (tc_id, platform_id):
+                key = (tc_id, platform_id)
+                state = cases.get(key)
+                if state is None:
+                    state = cases[key] = CaseFlakiness()
+            added += state.add(execution_id, build_id, status, decay)
+        return added
+
+    def extend(self, tc_id, executions):
+        """Processes new raw executions of a single TestCase
+        @param tc_id: The internal ID of the TestCase
+        @type tc_id: int
+        @param executions: Raw server values of the executions, see TestlinkXMLRPCAPI.getExecutions
+        @type executions: list
+        @returns: Amount of new executions
+        @rtype: int
+        """
+        if isinstance(executions, dict):
+            executions = executions.values()
+        tc_id = int(tc_id)
+        added = 0
+        for execution in sorted(executions, key=lambda e: int(e['id'])):
+            key = (tc_id, int(execution.get('platform_id') or 0))
+            state = self._cases.get(key)
+            if state is None:
+                state = self._cases[key] = CaseFlakiness()
+            added += state.add(int(execution['id']), int(execution.get('build_id') or 0),
+                               str(execution.get('status') or EXECUTION_STATUS.NOT_RUN)[0], self._decay)
+        return added
+
+    def flaky(self, threshold=0.0, min_runs=None):
+        """Returns all TestCases with a score above the threshold
+        @param threshold: Minimal score
+        @type threshold: float
+        @param min_runs: <OPTIONAL> Minimal amount of results, defaults to FlakinessAnalyzer.MIN_RUNS
+        @type min_runs: int
+        @returns: Keys and states ordered by descending score
+        @rtype: list
+        """
+        if min_runs is None:
+            min_runs = self.MIN_RUNS
+        result = [(key, state) for key, state in self._cases.iteritems()
+                  if state.runs >= min_runs and state.score > threshold]
+        result.sort(key=lambda item: item[1].score, reverse=True)
+        return result
+
+    def dump(self, path):
+        """Stores the state of all TestCases
+        @param path: Path of the state file
+        @type path: str
+        """
+        state = {'decay': self._decay,
+                 'cases': [[tc_id, platform_id] + case.as_list()
+                           for (tc_id, platform_id), case in self._cases.iteritems()]}
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            json.dump(state, f)
+        os.rename(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a stored state, returns an empty analyzer if the file does not exist
+        @param path: Path of the state file
+        @type path: str
+        @rtype: FlakinessAnalyzer
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'rb') as f:
+            state = json.load(f)
+        analyzer = cls(state.get('decay'))
+        for values in state['cases']:
+            case = CaseFlakiness(*values[2:])
+            if case.last_status is not None:
+                case.last_status = str(case.last_status)
+            analyzer._cases[(values[0], values[1])] = case
+        return analyzer
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@author: Kai Borowiak
+@summary: Runtime metrics of the automation server
+"""
+
+# IMPORTS
+import time
+from bisect import bisect_left
+from threading import Lock
+from contextlib import contextmanager
+
+__all__ = ["Histogram", "RateMeter", "ServerMetrics"]
+
+
+class Histogram(object):
+    """Histogram of observed durations
+
+    .. data:: BUCKETS
+
+       Default upper bounds of the buckets in seconds
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)  # Bucket bounds
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=None):
+        """Initializes an empty histogram
+        @param bounds: <OPTIONAL> Upper bounds of the buckets, defaults to Histogram.BUCKETS
+        @type bounds: list
+        """
+        self.bounds = tuple(sorted(bounds or self.BUCKETS))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Adds a single value"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns the amount of values less than or equal to each bound
+        @returns: Pairs of bound and count, the last bound is infinite
+        @rtype: list
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self):
+        """Returns the histogram as XML-RPC struct"""
+        return {'count': self.count,
+                'sum': self.sum,
+                'buckets': dict((_format(bound), count) for bound, count in self.cumulative())}
+
+
+class RateMeter(object):
+    """Events per second within a sliding window
+
+    .. data:: WINDOW
+
+       Default length of the window in seconds
+    """
+
+    WINDOW = 60  # Seconds
+
+    def __init__(self, window=None):
+        """Initializes the meter
+        @param window: <OPTIONAL> Length of the window in seconds, defaults to RateMeter.WINDOW
+        @type window: int
+        """
+        self._window = window or self.WINDOW
+        self._seconds = [None] * self._window
+        self._counts = [0] * self._window
+        self._started = time.time()
+
+    def mark(self, now=None):
+        """Counts a single event"""
+        second = int(now or time.time())
+        i = second % self._window
+        if self._seconds[i] != second:
+            self._seconds[i] = second
+            self._counts[i] = 0
+        self._counts[i] += 1
+
+    def rate(self, now=None):
+        """Returns the average events per second within the window, or since start if shorter
+        @rtype: float
+        """
+        now = now or time.time()
+        second = int(now)
+        total = sum(count for start, count in zip(self._seconds, self._counts)
+                    if start is not None and second - self._window < start <= second)
+        return total / max(1.0, min(float(self._window), now - self._started))
+
+
+class ServerMetrics(object):
+    """Request and callback metrics of TestlinkXMLRPCServer, safe to be used by several threads"""
+
+    def __init__(self, buckets=None, window=None):
+        """Initializes the metrics
+        @param buckets: <OPTIONAL> Upper bounds of the latency histograms in seconds
+        @type buckets: list
+        @param window: <OPTIONAL> Length of the window used to determine requests per second
+        @type window: int
+        """
+        self._lock = Lock()
+        self._buckets = buckets
+        self._started = time.time()
+        self._rate = RateMeter(window)
+        self._latency = {}
+        self._errors = {}
+        self._active = {}
+        self._callback = Histogram(buckets)
+        self._callback_errors = 0
+        self._callback_active = 0
+
+    @contextmanager
+    def request(self, method):
+        """Measures a call of a remote method"""
+        with self._lock:
+            self._rate.mark()
+            if method not in self._latency:
+                self._latency[method] = Histogram(self._buckets)
+                self._errors[method] = 0
+                self._active[method] = 0
+            self._active[method] += 1
+        started = time.time()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            duration = time.time() - started
+            with self._lock:
+                self._active[method] -= 1
+                self._latency[method].observe(duration)
+                if failed:
+                    self._errors[method] += 1
+
+    @contextmanager
+    def callback(self):
+        """Measures a single run of the callback"""
+        with self._lock:
+            self._callback_active += 1
+        started = time.time()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            duration = time.time() - started
+            with self._lock:
+                self._callback_active -= 1
+                self._callback.observe(duration)
+                if failed:
+                    self._callback_errors += 1
+
+    def as_dict(self):
+        """Returns the metrics as XML-RPC struct"""
+        with self._lock:
+            return {'uptime': time.time() - self._started,
+                    'requests_per_second': self._rate.rate(),
+                    'requests': dict((method, hist.count) for method, hist in self._latency.iteritems()),
+                    'request_errors': dict(self._errors),
+                    'request_latency': dict((method, hist.as_dict()) for method, hist in self._latency.iteritems()),
+                    'requests_active': sum(self._active.itervalues()),
+                    'callbacks': self._callback.count,
+                    'callback_errors': self._callback_errors,
+                    'callback_latency': self._callback.as_dict(),
+                    'callbacks_active': self._callback_active}
+
+    def render(self, gauges=None, prefix="testlink_server"):
+        """Returns the metrics in the plain text exposition format of Prometheus
+        @param gauges: <OPTIONAL> Additional current values by name, e.g. the queue depth
+        @type gauges: dict
+        @param prefix: Prefix of all metric names
+        @type prefix: str
+        @rtype: str
+        """
+        lines = []
+
+        def add(name, kind, samples):
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+            for suffix, labels, value in samples:
+                label = ",".join('%s="%s"' % item for item in labels)
+                lines.append("%s_%s%s%s %s" % (prefix, name, suffix, "{%s}" % label if label else "",
+                                               _format(value)))
+
+        def histogram(hist, labels=()):
+            samples = [("_bucket", labels + (("le", _format(bound)),), count) for bound, count in hist.cumulative()]
+            samples.append(("_sum", labels, hist.sum))
+            samples.append(("_count", labels, hist.count))
+            return samples
+
+        with self._lock:
+            methods = sorted(self._latency)
+            add("uptime_seconds", "gauge", [("", (), time.time() - self._started)])
+            add("requests_per_second", "gauge", [("", (), self._rate.rate())])
+            add("requests_total", "counter",
+                [("", (("method", m),), self._latency[m].count) for m in methods])
+            add("request_errors_total", "counter",
+                [("", (("method", m),), self._errors[m]) for m in methods])
+            add("requests_active", "gauge", [("", (), sum(self._active.itervalues()))])
+            add("request_duration_seconds", "histogram",
+                [sample for m in methods for sample in histogram(self._latency[m], (("method", m),))])
+            add("callback_errors_total", "counter", [("", (), self._callback_errors)])
+            add("callbacks_active", "gauge", [("", (), self._callback_active)])
+            add("callback_duration_seconds", "histogram", histogram(self._callback))
+        for name, value in sorted((gauges or {}).iteritems()):
+            add(name, "gauge", [("", (), value)])
+        return "\n".join(lines) + "\n"
+
+
+def _format(value):
+    """Formats a sample value or bucket bound"""
+    if value == float('inf'):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
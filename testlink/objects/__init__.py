@@ -12,6 +12,8 @@ from testlink.objects.tl_user import User
 from testlink.objects.tl_testproject import TestProject
 from testlink.objects.tl_testsuite import TestSuite
 from testlink.objects.tl_testcase import TestCase
+from testlink.objects.tl_testcase import load_keywords
+from testlink.objects.tl_testcase import prefetch
 from testlink.objects.tl_step import Step
 from testlink.objects.tl_keyword import Keyword
 from testlink.objects.tl_execution import Execution
@@ -4,36 +4,117 @@
 """Attachment Object"""
 
 # IMPORTS
+import base64
 import datetime
 
 from testlink.objects.tl_object import TestlinkObject
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
 from testlink.objects.tl_object import normalize_list
 
+from testlink.util import decoded
+from testlink.api import Base64File
+
 
 class Attachment(TestlinkObject):
-    """Testlink Attachment representation"""
+    """Testlink Attachment representation.
+    The content is kept as received from the server and decoded on demand.
+
+    .. data:: CHUNK_SIZE
+
+       Amount of base64 characters decoded at once, multiple of 4
+
+    @ivar length: Length of the base64 encoded content
+    @type length: int
+    @ivar size: Size of the decoded content, also available after the content has been released
+    @type size: int
+    """
 
-    slots = ["title", "file_type", "content", "date_added"]
+    __slots__ = ("title", "file_name", "file_type", "_content", "length", "size", "_date_added")
+
+    CHUNK_SIZE = 4 * 256 * 1024  # Base64 characters decoded at once
 
     def __init__(self, title, file_type, content="", date_added=None, api=None, **kwargs):
         TestlinkObject.__init__(self, kwargs.get('id', -1), kwargs.get('name'), api)
         self.title = title
         self.file_name = self.name
         self.file_type = str(file_type)
-        self.content = str(content)
+        self._content = None
         self.length = 0
-        if self.content is not None:
-            self.length = len(self.content)
-        try:
-            self.date_added = strptime(str(date_added), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.date_added = datetime.datetime.min
+        self.size = 0
+        if content is not None:
+            # Avoid copies of large contents
+            self._content = content if isinstance(content, str) else str(content)
+            self.length = len(self._content)
+            tail = self._content.rstrip()[-2:]
+            encoded = self.length - self._content.count("\n") - self._content.count("\r")
+            self.size = encoded // 4 * 3 - (len(tail) - len(tail.rstrip("=")))
+        self._date_added = date_added
+
+    date_added = decoded("_date_added", datetime_decoder(datetime.datetime.min))
 
     def __str__(self):
         return "Attachment %d: %s - %s (%s) [%d Bytes] %s" %\
                (self.id, self.name, self.title, self.file_type, self.length, str(self.date_added))
 
+    @property
+    def content(self):
+        """Base64 encoded content
+        @raises ValueError: Content has been released
+        """
+        if self._content is None:
+            raise ValueError("Content of %s has been released" % str(self))
+        return self._content
+
+    def iterContent(self, chunk_size=None):
+        """Iterates over the decoded content chunk by chunk
+        @param chunk_size: <OPTIONAL> Base64 characters decoded at once, defaults to Attachment.CHUNK_SIZE
+        @type chunk_size: int
+        @returns: Decoded chunks
+        @rtype: generator
+        @raises ValueError: Content has been released
+        """
+        content = self.content
+        chunk_size = (chunk_size or self.CHUNK_SIZE) // 4 * 4 or 4
+        if "\n" in content or self.length % 4 != 0:
+            # Wrapped lines do not allow splitting at arbitrary positions
+            yield base64.b64decode(content)
+            return
+        for start in xrange(0, self.length, chunk_size):
+            yield base64.b64decode(buffer(content, start, chunk_size))
+
+    def getContent(self):
+        """Returns the decoded content
+        @rtype: memoryview
+        @raises ValueError: Content has been released
+        """
+        return memoryview(base64.b64decode(self.content))
+
+    def save(self, target, release=False):
+        """Writes the decoded content chunk by chunk to a file
+        @param target: Path or file object opened in binary mode
+        @type target: str or file
+        @param release: Release the content afterwards
+        @type release: bool
+        @returns: Amount of written bytes
+        @rtype: int
+        @raises ValueError: Content has been released
+        """
+        written = 0
+        if isinstance(target, basestring):
+            with open(target, 'wb') as f:
+                written = self.save(f)
+        else:
+            for chunk in self.iterContent():
+                target.write(chunk)
+                written += len(chunk)
+        if release:
+            self.release()
+        return written
+
+    def release(self):
+        """Releases the content, metadata stays available"""
+        self._content = None
+
     def delete(self):
         """Deletes the current attchment
         @returns: Success state
@@ -45,66 +126,96 @@ class Attachment(TestlinkObject):
         return resp['status_ok']
 
 
+def iter_attachments(response, api, content=True, **params):
+    """Iterates over the attachments of a getAttachments response matching the parameters.
+    The response is not modified. It already contains all contents, so releasing them
+    only avoids keeping them beyond the response, it does not avoid downloading them.
+    @param response: Server response
+    @type response: dict
+    @param api: Testlink API
+    @type api: TestlinkXMLRPCAPI
+    @param content: Keep the contents, otherwise they are released and only the metadata is kept
+    @type content: bool
+    @param params: Attributes of the wanted attachments
+    @type params: dict
+    @returns: Matching attachments
+    @rtype: generator
+    """
+    # Check for empty result
+    if not isinstance(response, dict) or len(response) == 0:
+        return
+
+    for raw in response.values():
+        attach = Attachment(api=api, **raw)
+        if not content:
+            attach.release()
+
+        # Filter
+        for name, value in params.items():
+            # Skip None
+            if value is None:
+                continue
+            try:
+                if not unicode(getattr(attach, name)) == unicode(value):
+                    attach = None
+                    break
+            except AttributeError:
+                raise AttributeError("Invalid Search Paramater for Attachment: %s" % name)
+        if attach is not None:
+            yield attach
+
+
 class IAttachmentGetter(object):
     """Interface class for getting attachments of various Testlink Objects"""
 
-    def __init__(self, foreign_key_table="nodes_hierarchy"):
-        self._foreign_key_table = foreign_key_table
+    __slots__ = ()
+
+    # Table of the attached objects, overwritten by subclasses if needed
+    _foreign_key_table = "nodes_hierarchy"
 
-    def iterAttachment(self, **params):
-        """Iterates over TestlinkObject's attachments specified by parameters
+    def iterAttachment(self, content=True, **params):
+        """Iterates over TestlinkObject's attachments specified by parameters.
+        The contents are always downloaded, even if they are not kept.
+        @param content: Keep the contents, otherwise only the metadata is returned
+        @type content: bool
         @returns: Matching attachments
         @rtype: generator
         """
         # Get all attachments for this object
         response = self._api.getAttachments(self.id, self._foreign_key_table)
-
-        # Check for empty result
-        if len(response) == 0:
-            return
-        attachments = [Attachment(api=self._api, **resp) for resp in response.values()]
-
-        # Filter
-        if len(params) > 0:
-            for attach in attachments:
-                for key, value in params.items():
-                    # Skip None
-                    if value is None:
-                        continue
-                    try:
-                        if not unicode(getattr(attach, key)) == unicode(value):
-                            attach = None
-                            break
-                    except AttributeError:
-                        raise AttributeError("Invalid Search Paramater for Attachment: %s" % key)
-                if attach is not None:
-                    yield attach
-        else:
-            # Return all found attachments
-            for attach in attachments:
-                yield attach
-
-    def getAttachment(self, **params):
-        """Return all TestlinkObject's attachments specified by parameters
+        for attach in iter_attachments(response, self._api, content, **params):
+            yield attach
+
+    def getAttachment(self, content=True, **params):
+        """Return all TestlinkObject's attachments specified by parameters.
+        The contents are always downloaded, even if they are not kept.
+        @param content: Keep the contents, otherwise only the metadata is returned
+        @type content: bool
         @returns: Matching Attachments
         @rtype: mixed
         """
-        return normalize_list([p for p in self.iterAttachment(**params)])
+        return normalize_list([p for p in self.iterAttachment(content, **params)])
 
-    def uploadAttachment(self, filename, filetype, content, title=None, description=None, **kwargs):
-        """Upload an Attachment for the current object
+    def uploadAttachment(self, filename, filetype, content=None, title=None, description=None, path=None, cache=None,
+                         **kwargs):
+        """Upload an Attachment for the current object.
+        Local files are base64 encoded while being sent, so they are never loaded into memory at once.
         @param filename: Filename of the attached file
         @type filename: str
         @param filetype: MIME Type of the attached file
         @type filetype: str
-        @param content: Contents of the file as Base64 encoded string
-        @type content: str
+        @param content: Contents of the file as Base64 encoded string or file object opened in binary mode
+        @type content: str or file
         @param title: <optional> Title of the attachment
         @type title: str
         @param description: <optional> Description of the attachment
         @type description: str
+        @param path: <optional> Path of a local file to upload instead of content
+        @type path: str
+        @param cache: <optional> Skip the upload if the same content has already been attached
+        @type cache: AttachmentCache
         @keyword id: <optional> ID Override (used for TestCases)
-        @returns: Server response
+        @returns: Server response, None if the upload has been skipped
         @rtype: dict
         """
         # Check which ID to use
@@ -112,10 +223,28 @@ class IAttachmentGetter(object):
         if 'id' in kwargs:
             _id = kwargs['id']
 
-        self._api.uploadAttachment(fkid=_id,
-                                   fktable=self._foreign_key_table,
-                                   filename=str(filename),
-                                   filetype=str(filetype),
-                                   content=content,
-                                   title=title,
-                                   description=description)
+        # Stream local files
+        if path is not None:
+            content = Base64File(path)
+        elif hasattr(content, 'read'):
+            content = Base64File(content)
+        elif content is None:
+            raise TypeError("Either content or path is required")
+
+        if cache is not None:
+            return cache.upload(self._api,
+                                fkid=_id,
+                                fktable=self._foreign_key_table,
+                                filename=str(filename),
+                                filetype=str(filetype),
+                                content=content,
+                                title=title,
+                                description=description)
+
+        return self._api.uploadAttachment(fkid=_id,
+                                          fktable=self._foreign_key_table,
+                                          filename=str(filename),
+                                          filetype=str(filetype),
+                                          content=content,
+                                          title=title,
+                                          description=description)
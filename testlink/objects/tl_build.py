@@ -6,7 +6,8 @@
 # IMPORTS
 import datetime
 from testlink.objects.tl_object import TestlinkObject
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
+from testlink.util import decoded
 
 
 class Build(TestlinkObject):
@@ -15,8 +16,8 @@ class Build(TestlinkObject):
     @type notes: str
     """
 
-    __slots__ = ("active", "open", "notes", "creation_ts", "release_date",
-                 "closed_on_date", "_parent_testplan")
+    __slots__ = ("active", "open", "notes", "_creation_ts", "_release_date",
+                 "_closed_on_date", "_parent_testplan")
 
     def __init__(self, name=None, notes=None, is_open=False, active=False, creation_ts=None, closed_on_date=None,
                  release_date=None, parent_testplan=None, api=None, **kwargs):
@@ -24,20 +25,16 @@ class Build(TestlinkObject):
         self.active = bool(int(active))
         self.open = bool(int(is_open))
         self.notes = unicode(notes)
-        try:
-            self.creation_ts = strptime(str(creation_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.creation_ts = datetime.datetime.min
-        try:
-            self.release_date = strptime(str(release_date), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.release_date = datetime.datetime.min
-        try:
-            self.closed_on_date = strptime(str(closed_on_date), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.closed_on_date = datetime.datetime.min
+        # Timestamps are decoded on first access
+        self._creation_ts = creation_ts
+        self._release_date = release_date
+        self._closed_on_date = closed_on_date
         self._parent_testplan = parent_testplan
 
+    creation_ts = decoded("_creation_ts", datetime_decoder(datetime.datetime.min))
+    release_date = decoded("_release_date", datetime_decoder(datetime.datetime.min))
+    closed_on_date = decoded("_closed_on_date", datetime_decoder(datetime.datetime.min))
+
     def __str__(self):
         """Returns string representation"""
         return "Build: %s" % self.name
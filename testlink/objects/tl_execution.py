@@ -7,12 +7,13 @@
 import datetime
 
 from testlink.objects.tl_object import TestlinkObject
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
 
 from testlink.objects.tl_user import User
 from testlink.objects.tl_attachment import IAttachmentGetter
 
 from testlink.exceptions import NotSupported
+from testlink.util import decoded
 
 from testlink.enums import EXECUTION_TYPE
 
@@ -37,18 +38,20 @@ class Execution(TestlinkObject, IAttachmentGetter):
     @type execution_type: EXECUTION_TYPE
     @ivar execution_ts: Timestamp of execution
     @type execution_ts: str
-    @ivar tester_id: The internal ID of the tester
+    @ivar tester_id: The internal ID of the tester, -1 if unknown
     @type tester_id: int
     """
 
-    __slots__ = ("id", "testplan_id", "platform_id", "build_id", "tcversion_id", "tcversion_number", "status",
-                 "notes", "execution_type", "execution_ts", "tester_id", "__tester", "duration")
+    __slots__ = ("testplan_id", "platform_id", "build_id", "tcversion_id", "tcversion_number", "status",
+                 "notes", "execution_type", "_execution_ts", "tester_id", "__tester", "duration")
+
+    # Attachments of Executions are stored separately
+    _foreign_key_table = "executions"
 
     def __init__(self, testplan_id=-1, platform_id=-1, build_id=-1, tcversion_id=-1, tcversion_number=0,
                  status='', notes="", execution_type=EXECUTION_TYPE.MANUAL, execution_ts=str(datetime.datetime.min),
                  tester_id=-1, execution_duration=0.0, api=None, **kwargs):
         TestlinkObject.__init__(self, kwargs.get('id', -1), kwargs.get('id', "None"), api)
-        IAttachmentGetter.__init__(self, foreign_key_table="executions")
         self.testplan_id = int(testplan_id)
         self.platform_id = int(platform_id)
         self.build_id = int(build_id)
@@ -57,10 +60,7 @@ class Execution(TestlinkObject, IAttachmentGetter):
         self.status = status
         self.notes = notes
         self.execution_type = int(execution_type)
-        try:
-            self.execution_ts = strptime(str(execution_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.execution_ts = datetime.datetime.min
+        self._execution_ts = execution_ts
         self.tester_id = int(tester_id)
         self.__tester = None
         try:
@@ -68,6 +68,8 @@ class Execution(TestlinkObject, IAttachmentGetter):
         except ValueError:
             self.duration = float(0.0)
 
+    execution_ts = decoded("_execution_ts", datetime_decoder(datetime.datetime.min))
+
     def __str__(self):
         """String representaion"""
         return "Execution (%d) [%s] %s" % (self.id, self.status, self.notes)
@@ -17,7 +17,7 @@ class Keyword(TestlinkObject):
     @type: str
     """
 
-    __slots__ = ["id", "notes", "testcase_id", "_keyword"]
+    __slots__ = ["notes", "testcase_id", "_keyword"]
 
     def __init__(self, keyword_id=-1, notes=None, testcase_id=None, keyword=None, api=None):
         TestlinkObject.__init__(self, keyword_id, keyword, api)
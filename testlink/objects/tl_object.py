@@ -5,7 +5,7 @@
 import time
 import datetime
 
-__all__ = ["strptime", "TestlinkObject", "normalize_list"]
+__all__ = ["strptime", "datetime_decoder", "TestlinkObject", "normalize_list"]
 
 
 # Backwards compatability methods
@@ -18,6 +18,24 @@ except AttributeError:
     pass
 
 
+def datetime_decoder(default=None):
+    """Returns a decoder for Testlink timestamps to be used with testlink.util.decoded
+    @param default: Value used for missing or invalid timestamps
+    @type default: datetime.datetime
+    @rtype: callable
+    """
+    def decode(value):
+        if value is None:
+            return default
+        if isinstance(value, datetime.datetime):
+            return value
+        try:
+            return strptime(str(value), TestlinkObject.DATETIME_FORMAT)
+        except ValueError:
+            return default
+    return decode
+
+
 # Helper method
 def normalize_list(res):
     """Normalizes a result list.
@@ -44,7 +62,7 @@ class TestlinkObject(object):
     @type name: str
     """
 
-    __slots__ = ("id", "name", "_api", "path")
+    __slots__ = ("id", "name", "_api")
 
     # Global datetime format
     DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -8,7 +8,7 @@ import datetime
 
 from testlink.objects.tl_object import TestlinkObject
 from testlink.objects.tl_object import normalize_list
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
 
 from testlink.objects.tl_risk import Risk
 from testlink.objects.tl_attachment import IAttachmentGetter
@@ -16,13 +16,15 @@ from testlink.objects.tl_attachment import IAttachmentGetter
 from testlink.enums import REQUIREMENT_TYPE as REQUIREMENT_TYPE
 from testlink.enums import REQUIREMENT_STATUS as REQUIREMENT_STATUS
 
+from testlink.util import decoded
+
 
 class Requirement(TestlinkObject, IAttachmentGetter):
     """Testlink Requirement representation"""
 
     __slots__ = ("srs_id", "req_doc_id", "req_spec_title", "type", "version", "version_id", "revision",
                  "revision_id", "scope", "status", "node_order", "is_open", "active", "expected_coverage",
-                 "testproject_id", "author", "author_id", "creation_ts", "modifier", "modifier_id", "modification_ts",
+                 "testproject_id", "author", "author_id", "_creation_ts", "modifier", "modifier_id", "_modification_ts",
                  "_parent_testproject", "_parent_requirement_specification")
 
     def __init__(self, srs_id=None, req_doc_id='', title='', req_spec_title=None, version=-1, version_id=-1,
@@ -35,7 +37,6 @@ class Requirement(TestlinkObject, IAttachmentGetter):
         @todo: doc
         """
         TestlinkObject.__init__(self, kwargs.get('id', -1), title, api)
-        IAttachmentGetter.__init__(self)
         self.srs_id = str(srs_id)
         self.req_doc_id = unicode(req_doc_id)
         self.req_spec_title = req_spec_title
@@ -58,17 +59,14 @@ class Requirement(TestlinkObject, IAttachmentGetter):
             self.modifier_id = int(modifier_id)
         except ValueError:
             self.modifier_id = -1
-        try:
-            self.creation_ts = strptime(str(creation_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.creation_ts = datetime.datetime.min
-        try:
-            self.modification_ts = strptime(str(modification_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.modification_ts = datetime.datetime.min
+        self._creation_ts = creation_ts
+        self._modification_ts = modification_ts
         self._parent_testproject = parent_testproject
         self._parent_requirement_specification = parent_requirement_specification
 
+    creation_ts = decoded("_creation_ts", datetime_decoder(datetime.datetime.min))
+    modification_ts = decoded("_modification_ts", datetime_decoder(datetime.datetime.min))
+
     def __str__(self):
         return "Requirement %s: %s" % (self.req_doc_id, self.name)
 
@@ -112,7 +110,7 @@ class Requirement(TestlinkObject, IAttachmentGetter):
         """
         # No simple API call, so get all Risks for the current Requirement
         response = self._api.getRisksForRequirement(self.id)
-        risks = [Risk(api=self._api, parent_testproject=self.getTestProject(), **risk) for risk in response]
+        risks = (Risk(api=self._api, parent_testproject=self.getTestProject(), **risk) for risk in response)
 
         # Filter
         if len(params) > 0 or name:
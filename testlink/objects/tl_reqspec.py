@@ -8,19 +8,21 @@ import datetime
 
 from testlink.objects.tl_object import TestlinkObject
 from testlink.objects.tl_object import normalize_list
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
 
 from testlink.objects.tl_req import Requirement
 from testlink.objects.tl_attachment import IAttachmentGetter
 
 from testlink.enums import REQSPEC_TYPE
 
+from testlink.util import decoded
+
 
 class RequirementSpecification(TestlinkObject, IAttachmentGetter):
     """Testlink Requirement Specification representation"""
 
-    __slots__ = ("doc_id", "typ", "scope", "testproject_id", "author_id", "creation_ts",
-                 "modifier_id", "modification_ts", "total_req", "node_order", "_parent_testproject",
+    __slots__ = ("doc_id", "typ", "scope", "testproject_id", "author_id", "_creation_ts",
+                 "modifier_id", "_modification_ts", "total_req", "node_order", "_parent_testproject",
                  "_parent_requirement_specification")
 
     def __init__(self, doc_id='', title='', typ=REQSPEC_TYPE.SECTION, scope='', testproject_id=-1, author_id=-1,
@@ -31,7 +33,6 @@ class RequirementSpecification(TestlinkObject, IAttachmentGetter):
         @todo: doc
         """
         TestlinkObject.__init__(self, kwargs.get('id', -1), title, api)
-        IAttachmentGetter.__init__(self)
         self.doc_id = unicode(doc_id)
         self.typ = int(typ)
         self.scope = scope
@@ -43,17 +44,14 @@ class RequirementSpecification(TestlinkObject, IAttachmentGetter):
             self.modifier_id = -1
         self.total_req = int(total_req)
         self.node_order = int(node_order)
-        try:
-            self.creation_ts = strptime(str(creation_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.creation_ts = datetime.datetime.min
-        try:
-            self.modification_ts = strptime(str(modification_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.modification_ts = datetime.datetime.min
+        self._creation_ts = creation_ts
+        self._modification_ts = modification_ts
         self._parent_testproject = parent_testproject
         self._parent_requirement_specification = parent_requirement_specification
 
+    creation_ts = decoded("_creation_ts", datetime_decoder(datetime.datetime.min))
+    modification_ts = decoded("_modification_ts", datetime_decoder(datetime.datetime.min))
+
     def __str__(self):
         return "Requirement Specification %s: %s" % (self.doc_id, self.name)
 
@@ -72,13 +70,17 @@ class RequirementSpecification(TestlinkObject, IAttachmentGetter):
         """
         # Simple API call not possible
         response = self._api.getRequirementSpecificationsForRequirementSpecification(self.id)
-        specs = [RequirementSpecification(api=self._api, parent_testproject=self.getTestProject(),
-                                          parent_requirement_specification=self, **reqspec) for reqspec in response]
+        specs = (RequirementSpecification(api=self._api, parent_testproject=self.getTestProject(),
+                                          parent_requirement_specification=self, **reqspec) for reqspec in response)
 
         # Filter
         if len(params) > 0 or name:
             params['name'] = name
+            # Remember already initialised specs for the recursive search
+            visited = []
             for rspec in specs:
+                if recursive:
+                    visited.append(rspec)
                 for key, value in params.items():
                     # Skip None
                     if value is None:
@@ -104,7 +106,7 @@ class RequirementSpecification(TestlinkObject, IAttachmentGetter):
             # also search in nested specs
             if recursive:
                 # For each reqspec of this level
-                for rspec in specs:
+                for rspec in visited:
                     # Yield nested specs that match
                     for r in rspec.iterRequirementSpecification(recursive=recursive, **params):
                         yield r
@@ -138,8 +140,8 @@ class RequirementSpecification(TestlinkObject, IAttachmentGetter):
         """
         # No Simple API Call possible, get all and convert to Requirement instances
         response = self._api.getRequirementsForRequirementSpecification(self.id, self.getTestProject().id)
-        requirements = [Requirement(api=self._api, parent_testproject=self.getTestProject(),
-                                    parent_requirement_specification=self, **req) for req in response]
+        requirements = (Requirement(api=self._api, parent_testproject=self.getTestProject(),
+                                    parent_requirement_specification=self, **req) for req in response)
 
         # Filter
         if len(params) > 0 or name:
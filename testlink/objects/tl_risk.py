@@ -7,13 +7,15 @@
 import datetime
 
 from testlink.objects.tl_object import TestlinkObject
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
+
+from testlink.util import decoded
 
 
 class Risk(TestlinkObject):
     """Testlink Risk representation"""
 
-    __slots__ = ["doc_id", "description", "author_id", "creation_ts", "modifier_id", "modification_ts",
+    __slots__ = ["doc_id", "description", "author_id", "_creation_ts", "modifier_id", "_modification_ts",
                  "_requirement_id", "cross_coverage"]
 
     def __init__(self, risk_doc_id=None, name='', description='', author_id=-1, creation_ts=str(datetime.datetime.min),
@@ -26,20 +28,17 @@ class Risk(TestlinkObject):
         self.doc_id = unicode(risk_doc_id)
         self.description = description
         self.author_id = int(author_id)
-        try:
-            self.creation_ts = strptime(str(creation_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.creation_ts = datetime.datetime.min
+        self._creation_ts = creation_ts
         try:
             self.modifier_id = int(modifier_id)
         except ValueError:
             self.modifier_id = -1
-        try:
-            self.modification_ts = strptime(str(modification_ts), TestlinkObject.DATETIME_FORMAT)
-        except ValueError:
-            self.modification_ts = datetime.datetime.min
+        self._modification_ts = modification_ts
         self._requirement_id = requirement_id
         self.cross_coverage = str(cross_coverage)
 
+    creation_ts = decoded("_creation_ts", datetime_decoder(datetime.datetime.min))
+    modification_ts = decoded("_modification_ts", datetime_decoder(datetime.datetime.min))
+
     def __str__(self):
         return "Risk %s: %s" % (self.doc_id, self.name)
@@ -22,6 +22,9 @@ class Step(object):
     @ivar results: Expected result of the step
     @type results: str
     """
+
+    __slots__ = ("id", "step_number", "actions", "execution_type", "active", "expected_results")
+
     def __init__(self, step_number=1, actions="", execution_type=EXECUTION_TYPE.MANUAL, active="0",
                  expected_results="", **kwargs):
         self.id = kwargs.get('id', -1)
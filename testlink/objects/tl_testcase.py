@@ -4,12 +4,17 @@
 """TestCase Object"""
 
 # IMPORTS
+import uuid
+import datetime
+
+from testlink.log import LOGGER
+
 from testlink.objects.tl_object import TestlinkObject
-from testlink.objects.tl_object import strptime
+from testlink.objects.tl_object import datetime_decoder
 from testlink.objects.tl_step import Step
 from testlink.objects.tl_keyword import Keyword
 from testlink.objects.tl_execution import Execution
-from testlink.objects.tl_attachment import Attachment
+from testlink.objects.tl_attachment import iter_attachments
 from testlink.objects.tl_attachment import IAttachmentGetter
 from testlink.objects.tl_user import User
 
@@ -21,19 +26,280 @@ from testlink.enums import IMPORTANCE_LEVEL as IMPORTANCE_LEVEL
 from testlink.enums import CUSTOM_FIELD_DETAILS as CUSTOM_FIELD_DETAILS
 from testlink.enums import TESTCASE_STATUS as TESTCASE_STATUS
 
+from testlink.util import decoded
+
+
+def decode_steps(steps):
+    """Initialises Step objects of raw server values"""
+    if not steps:
+        return []
+    if all(isinstance(step, Step) for step in steps):
+        return steps
+    return [step if isinstance(step, Step) else Step(**step) for step in steps]
+
+
+def decode_keywords(keywords):
+    """Initialises Keyword objects of raw server values"""
+    if keywords is None or isinstance(keywords, list):
+        return keywords
+    try:
+        return [Keyword(**keyword) for keyword in keywords.values()]
+    except (TypeError, AttributeError):
+        return []
+
+
+def testcase_ids(raw):
+    """Returns the version ID and the TestCase ID of raw server values"""
+    if ('id' in raw) and ('tcversion_id' in raw):
+        # getTestCasesForTestSuite()
+        return int(raw['tcversion_id']), int(raw['id'])
+    elif ('id' in raw) and ('testcase_id' in raw):
+        # getTestCase()
+        return int(raw['id']), int(raw['testcase_id'])
+    elif ('tc_id' in raw) and ('tcversion_id' in raw):
+        # getTestCasesForTestPlan
+        return int(raw['tcversion_id']), int(raw['tc_id'])
+    return None, None
+
+
+def load_keywords(cases):
+    """Loads the keywords of several TestCases at once.
+    TestCases are grouped by their parent TestSuite, so that every TestSuite
+    is only retrieved once instead of once per TestCase.
+    @param cases: TestCases to load the keywords for
+    @type cases: list
+    @returns: The specified TestCases
+    @rtype: list
+    """
+    cases = list(cases)
+
+    # Group all TestCases without keywords by TestSuite
+    suites = {}
+    for case in cases:
+        if case._keywords is not None:
+            continue
+        suite_id = case.testsuite_id
+        if suite_id is None:
+            suite_id = case.getTestSuite().id
+        suites.setdefault(suite_id, []).append(case)
+
+    for suite_id, group in suites.items():
+        response = group[0]._api.getTestCasesForTestSuite(suite_id, details='full', getkeywords=True)
+        if not isinstance(response, list):
+            response = []
+
+        # Map keywords by version ID and by TestCase ID
+        by_version = {}
+        by_case = {}
+        for raw in response:
+            if 'tcversion_id' in raw:
+                by_version[int(raw['tcversion_id'])] = raw.get('keywords')
+            if 'id' in raw:
+                by_case[int(raw['id'])] = raw.get('keywords')
+
+        for case in group:
+            if case.id in by_version:
+                keywords = by_version[case.id]
+            else:
+                keywords = by_case.get(case.tc_id)
+            # If a testcase has no keywords at all, the server
+            # does not return any, so we explicitly set an empty list
+            case._keywords = keywords if keywords is not None else []
+    return cases
+
+
+def prefetch(cases, fields=None):
+    """Loads lazy loaded fields of several TestCases at once.
+    Each TestCase version is only retrieved once, using as few requests as possible.
+    @param cases: TestCases to load the fields for
+    @type cases: list
+    @param fields: Fields to load, defaults to TestCase.LAZY_FIELDS
+    @type fields: list
+    @returns: The specified TestCases
+    @rtype: list
+    @raises ValueError: Field cannot be prefetched
+    """
+    cases = list(cases)
+    if fields is None:
+        fields = TestCase.LAZY_FIELDS
+    fields = set(fields)
+    unknown = fields.difference(TestCase.LAZY_FIELDS)
+    if unknown:
+        raise ValueError("Cannot prefetch: %s" % ", ".join(sorted(unknown)))
+
+    # Group TestCases by ID and version
+    pending = {}
+    for case in cases:
+        missing = case._missing(fields)
+        if missing.intersection(("steps", "preconditions", "exec_duration")) or \
+                ("testsuite" in missing and case.testsuite_id is None):
+            pending.setdefault((case.tc_id, case.version), []).append(case)
+
+    # Retrieve each TestCase version once
+    if len(pending) > 0:
+        keys = pending.keys()
+        multicall = pending[keys[0]][0]._api.multicall()
+        for tc_id, version in keys:
+            multicall.getTestCase(testcaseid=tc_id, version=version)
+        for key, response in zip(keys, multicall()):
+            if isinstance(response, Exception):
+                # Fields stay lazy loaded
+                LOGGER.debug("Cannot prefetch TestCase %s: %s" % (str(key), str(response)))
+                continue
+            if isinstance(response, list) and len(response) == 1:
+                response = response[0]
+            loaded = TestCase(**response)
+            for case in pending[key]:
+                case._load(loaded)
+
+    # Retrieve each TestSuite once
+    if "testsuite" in fields:
+        suites = {}
+        for case in cases:
+            if "testsuite" in case._missing(fields) and case.testsuite_id is not None:
+                if case.testsuite_id not in suites:
+                    suites[case.testsuite_id] = case.getTestProject().getTestSuite(id=case.testsuite_id)
+                case.testsuite = suites[case.testsuite_id]
+
+    if "keywords" in fields:
+        load_keywords(cases)
+    return cases
+
+
+def iter_prefetched(cases, fields=None, size=None):
+    """Iterates over TestCases while prefetching lazy loaded fields chunk by chunk
+    @param cases: TestCases to iterate over
+    @type cases: iterable
+    @param fields: Fields to load, see prefetch
+    @type fields: list
+    @param size: Amount of TestCases loaded at once, defaults to TestCase.BATCH_SIZE
+    @type size: int
+    @returns: The specified TestCases
+    @rtype: generator
+    """
+    if size is None:
+        size = TestCase.BATCH_SIZE
+    chunk = []
+    for case in cases:
+        chunk.append(case)
+        if len(chunk) >= size:
+            for c in prefetch(chunk, fields):
+                yield c
+            chunk = []
+    for c in prefetch(chunk, fields):
+        yield c
+
+
+def iter_batched(raws, api, size=None, enabled=None):
+    """Iterates over raw TestCases together with the batch of their siblings
+    @param raws: Raw server values of TestCases
+    @type raws: list
+    @param api: Testlink API
+    @type api: TestlinkXMLRPCAPI
+    @param size: Maximal batch size, defaults to TestCase.BATCH_SIZE
+    @type size: int
+    @param enabled: Use batches at all, defaults to TestCase.AUTO_PREFETCH
+    @type enabled: bool
+    @returns: Raw server values and the corresponding batch or None if disabled
+    @rtype: generator
+    """
+    if size is None:
+        size = TestCase.BATCH_SIZE
+    if enabled is None:
+        enabled = TestCase.AUTO_PREFETCH
+    if not enabled or api is None or size < 2:
+        for raw in raws:
+            yield raw, None
+        return
+    for i in xrange(0, len(raws), size):
+        chunk = raws[i:i + size]
+        batch = TestCaseBatch(chunk, api)
+        for raw in chunk:
+            yield raw, batch
+
+
+class TestCaseBatch(object):
+    """Sibling TestCases retrieved by the same request.
+    The first access to a lazy loaded field of any TestCase within the batch
+    loads the TestCase versions of all siblings at once.
+    """
+
+    __slots__ = ("_api", "_keys", "_loaded")
+
+    def __init__(self, raws, api):
+        """Initialises a batch of the specified raw TestCases
+        @param raws: Raw server values of TestCases
+        @type raws: list
+        @param api: Testlink API
+        @type api: TestlinkXMLRPCAPI
+        """
+        self._api = api
+        self._keys = []
+        self._loaded = None
+        for raw in raws:
+            tc_id = testcase_ids(raw)[1]
+            key = (tc_id, int(raw.get('version', 1)))
+            if tc_id is not None and key not in self._keys:
+                self._keys.append(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, case):
+        """Loads lazy loaded fields of the specified TestCase
+        @param case: TestCase of the current batch
+        @type case: TestCase
+        @returns: Fields of the TestCase have been loaded
+        @rtype: bool
+        """
+        if self._loaded is None:
+            self._loaded = {}
+            multicall = self._api.multicall()
+            for tc_id, version in self._keys:
+                multicall.getTestCase(testcaseid=tc_id, version=version)
+            LOGGER.debug("Loading batch of %d TestCases" % len(self._keys))
+            for key, response in zip(self._keys, multicall()):
+                if isinstance(response, Exception):
+                    # Fields stay lazy loaded
+                    LOGGER.debug("Cannot load TestCase %s: %s" % (str(key), str(response)))
+                    continue
+                if isinstance(response, list) and len(response) == 1:
+                    response = response[0]
+                self._loaded[key] = TestCase(**response)
+
+        loaded = self._loaded.get((case.tc_id, case.version))
+        if loaded is None:
+            return False
+        case._load(loaded)
+        return True
 
-class TestCase(TestlinkObject, IAttachmentGetter):
-    """Testlink TestCase representation"""
 
-    __slots__ = ["tc_id", "external_id", "platform_id", "execution_status", "execution_notes", "priority",
-                 "__author", "author_id", "creation_ts", "__modifier", "modifier_id", "modification_ts",
-                 "__testsuite", "__testsuite_id", "version", "status", "importance", "execution_type", "preconditions",
-                 "summary", "active", "testsuite_id", "tester_id", "exec_duration", "_parent_testproject",
-                 "customfields", "requirements", "__steps", "__preconditions", "linked_by", "linked_ts", "_keywords"]
+class TestCase(TestlinkObject, IAttachmentGetter):
+    """Testlink TestCase representation
+    @cvar LAZY_FIELDS: Lazy loaded fields which can be prefetched
+    @type LAZY_FIELDS: tuple
+    @cvar BATCH_SIZE: Amount of TestCases prefetched at once
+    @type BATCH_SIZE: int
+    @cvar AUTO_PREFETCH: Load lazy loaded fields of all sibling TestCases on first access.
+                         Reading a single field then costs up to BATCH_SIZE getTestCase calls,
+                         so only enable it when most TestCases are accessed anyway.
+    @type AUTO_PREFETCH: bool
+    """
+
+    LAZY_FIELDS = ("steps", "preconditions", "exec_duration", "testsuite", "keywords")
+    BATCH_SIZE = 100  # Amount of TestCases prefetched at once
+    AUTO_PREFETCH = False  # Load siblings of the same batch on first lazy access
+
+    __slots__ = ["tc_id", "external_id", "platform_id", "execution_status", "execution_notes", "priority", "urgency",
+                 "__author", "author_id", "_creation_ts", "__modifier", "modifier_id", "_modification_ts",
+                 "__assignee_id", "__assignee", "__linker", "__testsuite", "version", "status", "importance",
+                 "execution_type", "summary", "active", "testsuite_id", "tester_id", "__exec_duration",
+                 "_parent_testproject", "customfields", "requirements", "__steps", "__preconditions", "linked_by",
+                 "_linked_ts", "_keywords", "_batch"]
 
     def __init__(self, version=1, status=TESTCASE_STATUS.DRAFT, importance=IMPORTANCE_LEVEL.MEDIUM,
                  execution_type=EXECUTION_TYPE.MANUAL, summary="", active=True, api=None, parent_testproject=None,
-                 parent_testsuite=None, customfields=None, requirements=None, tester_id=-1, **kwargs):
+                 parent_testsuite=None, customfields=None, requirements=None, tester_id=-1, _batch=None, **kwargs):
         """Initialises a new TestCase with the specified parameters.
         @param name: The name of the TestCase
         @type name: str
@@ -123,20 +389,7 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         ===========================================================================================
         """
         # Get the "correct" id
-        if ('id' in kwargs) and ('tcversion_id' in kwargs):
-            # getTestCasesForTestSuite()
-            _id = int(kwargs['tcversion_id'])
-            self.tc_id = int(kwargs['id'])
-        elif ('id' in kwargs) and ('testcase_id' in kwargs):
-            # getTestCase()
-            _id = int(kwargs['id'])
-            self.tc_id = int(kwargs['testcase_id'])
-        elif ('tc_id' in kwargs) and ('tcversion_id' in kwargs):
-            # getTestCasesForTestPlan
-            _id = int(kwargs['tcversion_id'])
-            self.tc_id = int(kwargs['tc_id'])
-        else:
-            _id = None
+        _id, self.tc_id = testcase_ids(kwargs)
 
         # Get the "correct" name
         if 'name' in kwargs:
@@ -148,7 +401,6 @@ class TestCase(TestlinkObject, IAttachmentGetter):
 
         # Init
         TestlinkObject.__init__(self, _id, _name, api=api)
-        IAttachmentGetter.__init__(self)
 
         # Set the "correct" external id
         if 'tc_external_id' in kwargs:
@@ -199,34 +451,19 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         else:
             self.author_id = None
 
-        # Try to get creation ts
-        if 'creation_ts' in kwargs:
-            try:
-                self.creation_ts = strptime(kwargs['creation_ts'], TestlinkObject.DATETIME_FORMAT)
-            except ValueError:
-                # Cannot convert
-                self.creation_ts = None
-        else:
-            self.creation_ts = None
+        # Creation ts is decoded on first access
+        self._creation_ts = kwargs.get('creation_ts')
 
         # Try to get updater
         self.__modifier = None
+        self.modifier_id = None
         if ('updater_first_name' in kwargs) and ('updater_last_name' in kwargs):
             self.__modifier = "%s %s" % (unicode(kwargs['updater_first_name']), unicode(kwargs['updater_last_name']))
         elif 'updater_id' in kwargs and kwargs['updater_id'].strip() != '':
             self.modifier_id = int(kwargs['updater_id'])
-        else:
-            self.modifier_id = None
 
-        # Try to get modification ts
-        if 'modification_ts' in kwargs:
-            try:
-                self.modification_ts = strptime(kwargs['modification_ts'], TestlinkObject.DATETIME_FORMAT)
-            except ValueError:
-                # Cannot convert
-                self.modification_ts = None
-        else:
-            self.modification_ts = None
+        # Modification ts is decoded on first access
+        self._modification_ts = kwargs.get('modification_ts')
 
         # Try to get assigned user
         self.__assignee_id = None
@@ -234,20 +471,14 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         self.__assignee_id = kwargs.get('user_id')
 
         # Try get get linked_by
+        self.__linker = None
         if ('linked_by' in kwargs) and (kwargs['linked_by'].strip() != ''):
             self.linked_by = int(kwargs['linked_by'])
         else:
             self.linked_by = None
 
-        # Try to get linked_ts
-        if 'linked_ts' in kwargs:
-            try:
-                self.linked_ts = strptime(kwargs['linked_ts'], TestlinkObject.DATETIME_FORMAT)
-            except ValueError:
-                # Cannot convert
-                self.linked_ts = None
-        else:
-            self.linked_ts = None
+        # Linked ts is decoded on first access
+        self._linked_ts = kwargs.get('linked_ts')
 
         # Set parent Testsuite by lazy loading
         if parent_testsuite is not None:
@@ -255,15 +486,15 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         else:
             self.__testsuite = None
         if 'testsuite_id' in kwargs:
-            self.__testsuite_id = kwargs['testsuite_id']
+            self.testsuite_id = int(kwargs['testsuite_id'])
+        elif parent_testsuite is not None:
+            self.testsuite_id = parent_testsuite.id
         else:
-            self.__testsuite_id = None
+            self.testsuite_id = None
 
-        # Set steps by lazy loading
-        if 'steps' in kwargs:
-            self.__steps = [Step(**s) for s in kwargs['steps']]
-        else:
-            self.__steps = None
+        # Set steps by lazy loading,
+        # Step objects are initialised on first access
+        self.__steps = kwargs.get('steps')
 
         # Set preconditions by lazy loading
         if 'preconditions' in kwargs:
@@ -280,14 +511,9 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         else:
             self.__exec_duration = None
 
-        # Set Keywords by lazy loading
-        if 'keywords' in kwargs:
-            try:
-                self._keywords = [Keyword(**keyword) for keyword_id, keyword in kwargs['keywords'].items()]
-            except TypeError:
-                self._keywords = []
-        else:
-            self._keywords = None
+        # Set Keywords by lazy loading,
+        # Keyword objects are initialised on first access
+        self._keywords = kwargs.get('keywords')
 
         # Set common attributes
         self.version = int(version)
@@ -300,6 +526,7 @@ class TestCase(TestlinkObject, IAttachmentGetter):
 
         # Set internal attributes
         self._parent_testproject = parent_testproject
+        self._batch = _batch
         self.customfields = {}
         if customfields is not None:
             self.customfields = customfields
@@ -307,6 +534,10 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         if requirements is not None:
             self.requirements = requirements
 
+    creation_ts = decoded("_creation_ts", datetime_decoder())
+    modification_ts = decoded("_modification_ts", datetime_decoder())
+    linked_ts = decoded("_linked_ts", datetime_decoder())
+
     def __str__(self):
         """Returns String Representation"""
         return "Testcase %s-%s: %s" % (self.getTestProject().prefix, self.external_id, self.name)
@@ -321,21 +552,15 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         if (self._keywords is None):
             # Unfortunately, the only way to get keywords from a testcase
             # is to get the testcase via the parent testsuite
-            case = self.getTestSuite().getTestCase(id=self.id, version=self.version)
-
-            # Also, if a testcase has no keywords, we self._keywords stays empty
-            # if the testcase has no keywords at all, so we explicitly have to
-            # check the _keywords member after the first lazy load.
-            # If this is still None, the testcase has no keywords at all.
-            if case._keywords is None:
-                self._keywords = []
-            else:
-                 self._keywords = case._keywords
+            load_keywords([self])
+        self._keywords = decode_keywords(self._keywords)
         return self._keywords
 
     @property
     def exec_duration(self):
         """Estimated Execution Duration"""
+        if (self.__exec_duration is None):
+            self._load_batch()
         if (self.__exec_duration is None):
             self.__exec_duration = self.getTestProject().getTestCase(id=self.tc_id, version=self.version).exec_duration
         return self.__exec_duration
@@ -395,11 +620,13 @@ class TestCase(TestlinkObject, IAttachmentGetter):
 
     def _get_testsuite(self):
         """Lazy-loading testsuite getter"""
+        if self.testsuite_id is None:
+            self._load_batch()
         if self.__testsuite is not None:
             return self.__testsuite
         else:
-            if self.__testsuite_id is not None:
-                ts = self._parent_testproject.getTestSuite(id=self.__testsuite_id)
+            if self.testsuite_id is not None:
+                ts = self._parent_testproject.getTestSuite(id=self.testsuite_id)
                 self.__testsuite = ts
             else:
                 # We have to get ourself
@@ -410,16 +637,19 @@ class TestCase(TestlinkObject, IAttachmentGetter):
     def _set_testsuite(self, suite):
         """Lazy-loading testsuite setter"""
         self.__testsuite = suite
+        if suite is not None:
+            self.testsuite_id = suite.id
     testsuite = property(_get_testsuite, _set_testsuite)
 
     def _get_steps(self):
         """Lazy-loading step getter"""
-        if self.__steps is not None:
-            return self.__steps
-        else:
+        if self.__steps is None:
+            self._load_batch()
+        if self.__steps is None:
             case = self.getTestProject().getTestCase(id=self.tc_id, external_id=self.external_id, version=self.version)
             self.__steps = case.__steps
-            return self.__steps
+        self.__steps = decode_steps(self.__steps)
+        return self.__steps
 
     def _set_steps(self, steps):
         """Lazy-loading step setter"""
@@ -428,6 +658,8 @@ class TestCase(TestlinkObject, IAttachmentGetter):
 
     def _get_preconditions(self):
         """Lazy-loading precondition getter"""
+        if self.__preconditions is None:
+            self._load_batch()
         if self.__preconditions is not None:
             return self.__preconditions
         else:
@@ -448,6 +680,30 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         """Returns associated TestSuite"""
         return self.testsuite
 
+    def _missing(self, fields):
+        """Returns the specified lazy loaded fields, which have not been loaded yet"""
+        values = {"steps": self.__steps, "preconditions": self.__preconditions,
+                  "exec_duration": self.__exec_duration, "testsuite": self.__testsuite,
+                  "keywords": self._keywords}
+        return set(field for field in fields if values[field] is None)
+
+    def _load_batch(self):
+        """Loads lazy loaded fields together with all sibling TestCases of the same batch"""
+        batch, self._batch = self._batch, None
+        if batch is not None:
+            batch.load(self)
+
+    def _load(self, case):
+        """Takes over not yet loaded fields from another instance of the same TestCase version"""
+        if self.__steps is None:
+            self.__steps = case.__steps
+        if self.__preconditions is None:
+            self.__preconditions = case.__preconditions
+        if self.__exec_duration is None:
+            self.__exec_duration = case.__exec_duration
+        if self.testsuite_id is None:
+            self.testsuite_id = case.testsuite_id
+
     def getLastExecutionResult(self, testplanid, platformid=None, platformname=None, buildid=None,
                                buildname=None, bugs=False):
         """Return last execution result"""
@@ -488,11 +744,39 @@ class TestCase(TestlinkObject, IAttachmentGetter):
         last = self.getLastExecutionResult(testplanid)
         self._api.deleteExecution(last.id)
 
-    def reportResult(self, testplanid, buildid, status, notes=None, overwrite=False, execduration=None, customfields={}):
-        """Reports TC result"""
+    def reportResult(self, testplanid, buildid, status, notes=None, overwrite=False, execduration=None, customfields={},
+                     fetch=False):
+        """Reports TC result
+        @param testplanid: The internal ID of the TestPlan
+        @type testplanid: int
+        @param buildid: The internal ID of the Build
+        @type buildid: int
+        @param status: The execution status
+        @type status: str
+        @param notes: <OPTIONAL> Execution notes
+        @type notes: str
+        @param overwrite: <OPTIONAL> Overwrite the last execution
+        @type overwrite: bool
+        @param execduration: <OPTIONAL> Execution duration in minutes
+        @type execduration: float
+        @param customfields: <OPTIONAL> Custom field values
+        @type customfields: dict
+        @param fetch: <OPTIONAL> Retrieve the stored Execution from the server.
+        Otherwise the Execution is built from the reported values, using the
+        local time as execution timestamp. The tester of the developer key
+        cannot be determined via the API, so its ID is left unset (-1).
+        @type fetch: bool
+        @returns: The reported Execution
+        @rtype: Execution
+        """
         if len(customfields) == 0:
             customfields = None
 
+        # Generate the idempotency key here to know the notes as stored
+        idempotencykey = None
+        if self._api.IDEMPOTENCY_KEYS:
+            idempotencykey = uuid.uuid4().hex
+
         response = self._api.reportTCResult(testplanid=testplanid,
                                             status=status,
                                             testcaseid=self.tc_id,
@@ -502,12 +786,29 @@ class TestCase(TestlinkObject, IAttachmentGetter):
                                             overwrite=overwrite,
                                             buildid=buildid,
                                             execduration=execduration,
-                                            customfields=customfields)
+                                            customfields=customfields,
+                                            idempotencykey=idempotencykey)
 
         # Return actual execution object
         if isinstance(response, list) and len(response) == 1:
             response = response[0]
 
+        if not fetch:
+            if idempotencykey is not None:
+                notes = self._api.markNotes(notes, idempotencykey)
+            return Execution(id=int(response['id']),
+                             testplan_id=testplanid,
+                             platform_id=self.platform_id or 0,
+                             build_id=buildid,
+                             tcversion_id=self.id,
+                             tcversion_number=self.version,
+                             status=status,
+                             notes=notes or "",
+                             execution_type=EXECUTION_TYPE.AUTOMATIC,
+                             execution_ts=datetime.datetime.now().replace(microsecond=0),
+                             execution_duration=execduration or 0.0,
+                             api=self._api)
+
         executions = self.getExecutions(testplanid, self.platform_id, buildid=buildid)
         for execution in executions:
             if execution.id == int(response['id']):
@@ -614,41 +915,21 @@ class TestCase(TestlinkObject, IAttachmentGetter):
             testprojectid=self.getTestProject().id,
             customfields=customfields)
 
-    def iterAttachment(self, **params):
-        """Iterates over TestlinkObject's attachments specified by parameters
+    def iterAttachment(self, content=True, **params):
+        """Iterates over TestlinkObject's attachments specified by parameters.
+        The contents are always downloaded, even if they are not kept.
+        @param content: Keep the contents, otherwise only the metadata is returned
+        @type content: bool
         @returns: Matching attachments
         @rtype: generator
         """
         # Get all attachments for this object
         response = self._api.getTestCaseAttachments(self.tc_id, self.external_id)
-
-        # Check for empty result
-        if len(response) == 0:
-            return
-        attachments = [Attachment(api=self._api, **resp) for resp in response.values()]
-
-        # Filter
-        if len(params) > 0:
-            for attach in attachments:
-                for key, value in params.items():
-                    # Skip None
-                    if value is None:
-                        continue
-                    try:
-                        if not unicode(getattr(attach, key)) == unicode(value):
-                            attach = None
-                            break
-                    except AttributeError:
-                        raise AttributeError("Invalid Search Paramater for Attachment: %s" % key)
-                if attach is not None:
-                    yield attach
-        else:
-            # Return all found attachments
-            for attach in attachments:
-                yield attach
+        for attach in iter_attachments(response, self._api, content, **params):
+            yield attach
 
     def uploadAttachment(self, *args, **kwargs):
         """Upload an Attachment for the TestCase, see IAttachmentGetter.uploadAttachment"""
         # Update ID to TestCase ID rather than TestCase Version ID
         kwargs.update({'id': self.tc_id})
-        IAttachmentGetter.uploadAttachment(self, *args, **kwargs)
+        return IAttachmentGetter.uploadAttachment(self, *args, **kwargs)
@@ -83,7 +83,7 @@ class Testlink(object):
         else:
             # Get all projects and convert them to TestProject instances
             response = self._api.getProjects()
-            projects = [TestProject(api=self._api, parent_testlink=self, **project) for project in response]
+            projects = (TestProject(api=self._api, parent_testlink=self, **project) for project in response)
 
             # Filter
             if len(params) > 0:
@@ -294,7 +294,7 @@ class Testlink(object):
         if on_duplicate is not None:
             duplicate_check = True
 
-        steps = [s.__dict__ for s in testcase.steps]
+        steps = [s.as_dict() for s in testcase.steps]
 
         return self._api.createTestCase(testcasename=testcase.name,
                                         testsuiteid=testsuite.id,
@@ -14,9 +14,16 @@ from testlink.objects.tl_object import normalize_list
 from testlink.objects.tl_build import Build
 from testlink.objects.tl_platform import Platform
 from testlink.objects.tl_testcase import TestCase
+from testlink.objects.tl_testcase import iter_prefetched
+from testlink.objects.tl_testcase import iter_batched
 
 from testlink.exceptions import APIError
 
+from testlink.columns import ExecutionHistory
+from testlink.columns import TestPlanStatus
+
+from testlink.enums import SHARD_STRATEGY
+
 
 class TestPlan(TestlinkObject):
     """Testlink TestPlan representation
@@ -59,7 +66,7 @@ class TestPlan(TestlinkObject):
         """
         # No simple API call possible, get all
         response = self._api.getBuildsForTestPlan(self.id)
-        builds = [Build(parent_testplan=self, api=self._api, **build) for build in response]
+        builds = (Build(parent_testplan=self, api=self._api, **build) for build in response)
 
         # Filter
         if len(params) > 0 or name:
@@ -112,8 +119,8 @@ class TestPlan(TestlinkObject):
             else:
                 raise
 
-        platforms = [Platform(parent_testproject=self, parent_testplan=self, api=self._api, **platform)
-                     for platform in response]
+        platforms = (Platform(parent_testproject=self, parent_testplan=self, api=self._api, **platform)
+                     for platform in response)
 
         # Filter
         if len(params) > 0 or name:
@@ -148,7 +155,7 @@ class TestPlan(TestlinkObject):
         return normalize_list([p for p in self.iterPlatform(name, **params)])
 
     def iterTestCase(self, name=None, buildid=None, keywordid=None, keywords=None, executed=None, assigned_to=None,
-                     execution_type=None, **params):
+                     execution_type=None, prefetch=None, batched=None, **params):
         """Iterates over Testcases specified by parameters
         @param name: The name of the TestCase
         @type name: str
@@ -164,11 +171,23 @@ class TestPlan(TestlinkObject):
         @type assigned_to: int
         @param execution_type: Filter by execution type
         @type execution_type: ExecutionType
+        @param prefetch: Lazy loaded fields to load for all TestCases at once
+        @type prefetch: list
+        @param batched: Load lazy loaded fields of up to TestCase.BATCH_SIZE siblings on first access,
+                        defaults to TestCase.AUTO_PREFETCH
+        @type batched: bool
         @param params: Other params for TestCase
         @type params: dict
         @returns: Matching TestCases
         @rtype: generator
         """
+        # Load requested fields chunk by chunk
+        if prefetch:
+            for tcase in iter_prefetched(self.iterTestCase(name, buildid, keywordid, keywords, executed, assigned_to,
+                                                           execution_type, batched=batched, **params), prefetch):
+                yield tcase
+            return
+
         # Get id if specified and remove from params
         _id = None
         if 'id' in params.keys():
@@ -236,8 +255,10 @@ class TestPlan(TestlinkObject):
         # Shuffle Testcases to get another first testcase on each call
         random.shuffle(testcases)
 
-        # Initialise TestCase Objects
-        cases = [TestCase(api=self._api, parent_testproject=self.getTestProject(), **case) for case in testcases]
+        # Initialise TestCase Objects one at a time while iterating,
+        # siblings of the same batch load their lazy fields together
+        cases = (TestCase(api=self._api, parent_testproject=self.getTestProject(), _batch=batch, **case)
+                 for case, batch in iter_batched(testcases, self._api, enabled=batched))
 
         # Filter
         if len(params) > 0 or name:
@@ -301,6 +322,128 @@ class TestPlan(TestlinkObject):
         return normalize_list([c for c in self.iterTestCase(name, buildid, keywordid, keywords,
                                                             executed, assigned_to, execution_type, **params)])
 
+    def getExecutionHistory(self, buildid=None, **params):
+        """Returns the executions of all matching TestCases.
+        The executions of all TestCases are retrieved at once and stored column by column.
+        @param buildid: <OPTIONAL> The internal ID of the Build
+        @type buildid: int
+        @param params: Params for TestCase, see iterTestCase
+        @type params: dict
+        @returns: Executions ordered by TestCase and timestamp
+        @rtype: ExecutionHistory
+        """
+        keys = []
+        seen = set()
+        for case in self.iterTestCase(**params):
+            key = (case.tc_id, case.platform_id)
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+
+        multicall = self._api.multicall()
+        for tc_id, platform_id in keys:
+            multicall.getExecutions(self.id, tc_id, platformid=platform_id, buildid=buildid)
+
+        history = ExecutionHistory()
+        for (tc_id, _), response in zip(keys, multicall()):
+            if isinstance(response, APIError) and response.error_code == 3030:
+                # TestCase not linked to TestPlan
+                continue
+            elif isinstance(response, Exception):
+                raise response
+            if isinstance(response, dict):
+                response = response.values()
+            history.extend(tc_id, response or [])
+        return history.sort("tc_id", "timestamp", "execution_id")
+
+    def getStatus(self, buildid=None):
+        """Returns the current execution status of all linked TestCases.
+        The status is built from the raw server response without creating TestCase objects.
+        @param buildid: <OPTIONAL> The internal ID of the Build, defaults to the last execution of any Build
+        @type buildid: int
+        @returns: Execution status of the linked TestCases
+        @rtype: TestPlanStatus
+        """
+        status = TestPlanStatus()
+        try:
+            status.extend(self._api.getTestCasesForTestPlan(testprojectid=self.getTestProject().id,
+                                                            testplanid=self.id,
+                                                            buildid=buildid))
+        except APIError, ae:
+            # Build does not exist in TestPlan
+            if ae.error_code != 3032:
+                raise
+        return status
+
+    def checkStatus(self, buildid, status=None):
+        """Compares the execution status of a Build with the execution counters of the server
+        @param buildid: The internal ID of the Build
+        @type buildid: int
+        @param status: <OPTIONAL> Status to check, retrieved if not specified
+        @type status: TestPlanStatus
+        @returns: Differing amounts as (own, server) by execution status
+        @rtype: dict
+        """
+        if status is None:
+            status = self.getStatus(buildid)
+        return status.mismatches(self._api.getExecCountersByBuild(self.id), buildid)
+
+    def shard(self, n, index, strategy=SHARD_STRATEGY.ROUND_ROBIN, **params):
+        """Returns the TestCases of a single shard of the current TestPlan.
+        The matching TestCases are partitioned deterministically into n disjoint
+        shards, so that n executors can split the TestPlan among each other without
+        any further coordination.
+        @param n: Total amount of shards
+        @type n: int
+        @param index: Index of the wanted shard (0 <= index < n)
+        @type index: int
+        @param strategy: Partitioning strategy
+        @type strategy: SHARD_STRATEGY
+        @param params: Params for TestCase, see iterTestCase
+        @type params: dict
+        @returns: TestCases of the shard ordered by their internal ID
+        @rtype: list
+        @raises ValueError: Invalid shard specification
+        """
+        n = int(n)
+        index = int(index)
+        if n < 1 or not 0 <= index < n:
+            raise ValueError("Invalid shard %d of %d" % (index, n))
+
+        # Plan rows carry no durations, load them in bulk instead of one request per TestCase
+        if strategy == SHARD_STRATEGY.BY_DURATION:
+            params['prefetch'] = sorted(set(params.get('prefetch') or []).union(["exec_duration"]))
+
+        # Sort to be independent from the order of the server response
+        cases = sorted(self.iterTestCase(**params), key=lambda c: (c.tc_id, c.platform_id or 0))
+
+        if strategy == SHARD_STRATEGY.ROUND_ROBIN:
+            return cases[index::n]
+        elif strategy == SHARD_STRATEGY.BY_SUITE:
+            # Group by TestSuite and distribute biggest suites first
+            suites = {}
+            for case in cases:
+                suites.setdefault(case.testsuite_id or 0, []).append(case)
+            groups = sorted(suites.items(), key=lambda item: (-len(item[1]), item[0]))
+            weights = [(len(group), group) for _, group in groups]
+        elif strategy == SHARD_STRATEGY.BY_DURATION:
+            # Longest processing time first
+            weights = sorted(((float(case.exec_duration or 0.0), [case]) for case in cases),
+                             key=lambda item: (-item[0], item[1][0].tc_id, item[1][0].platform_id or 0))
+        else:
+            raise ValueError("Invalid shard strategy: %s" % str(strategy))
+
+        # Assign each group to the shard with the least load,
+        # use the amount of TestCases and the shard index as tie breakers
+        loads = [(0.0, 0, i) for i in xrange(n)]
+        result = []
+        for weight, group in weights:
+            load, count, i = min(loads)
+            loads[i] = (load + weight, count + len(group), i)
+            if i == index:
+                result.extend(group)
+        return sorted(result, key=lambda c: (c.tc_id, c.platform_id or 0))
+
     def assignTestCase(self, case, platform=None, execution_order=None, urgency=None):
         """Assigns the specified TestCase to the current TestPlan.
         @param case: TestCase to add to current TestPlan
@@ -9,6 +9,7 @@ from testlink.objects.tl_object import normalize_list
 
 from testlink.objects.tl_testsuite import TestSuite
 from testlink.objects.tl_testcase import TestCase
+from testlink.objects.tl_testcase import iter_prefetched
 from testlink.objects.tl_reqspec import RequirementSpecification
 from testlink.objects.tl_testplan import TestPlan
 from testlink.objects.tl_attachment import IAttachmentGetter
@@ -51,7 +52,6 @@ class TestProject(TestlinkObject, IAttachmentGetter):
             opt['automationEnabled'] = 0
             opt['inventoryEnabled'] = 0
         TestlinkObject.__init__(self, kwargs.get('id', -1), name, api)
-        IAttachmentGetter.__init__(self)
         self.notes = unicode(notes)
         self.prefix = str(prefix)
         self.active = bool(int(active))
@@ -83,7 +83,7 @@ class TestProject(TestlinkObject, IAttachmentGetter):
         else:
             # Get all plans and convert them to TestPlan instances
             response = self._api.getProjectTestPlans(self.id)
-            plans = [TestPlan(api=self._api, parent_testproject=self, **plan) for plan in response]
+            plans = (TestPlan(api=self._api, parent_testproject=self, **plan) for plan in response)
 
             # Filter
             if len(params) > 0:
@@ -164,13 +164,18 @@ class TestProject(TestlinkObject, IAttachmentGetter):
             # return the details, we have to get it with another API call
             # This has to be done BEFORE the acutal filtering because otherwise
             # we could not filter by the details
-            response = [self._api.getTestSuiteById(self.id, suite['id']) for suite in response]
-            suites = [TestSuite(api=self._api, parent_testproject=self, **suite) for suite in response]
+            # The details are fetched one suite at a time while iterating
+            response = (self._api.getTestSuiteById(self.id, suite['id']) for suite in response)
+            suites = (TestSuite(api=self._api, parent_testproject=self, **suite) for suite in response)
 
             # Filter by specified parameters
             if len(params) > 0 or name:
                 params['name'] = name
+                # Remember already initialised suites for the recursive search
+                visited = []
                 for tsuite in suites:
+                    if recursive:
+                        visited.append(tsuite)
                     for key, value in params.items():
                         # Skip None
                         if value is None:
@@ -196,7 +201,7 @@ class TestProject(TestlinkObject, IAttachmentGetter):
                 # also search in nestes suites
                 if recursive:
                     # For each suite of this level
-                    for tsuite in suites:
+                    for tsuite in visited:
                         # Yield nested suites that match
                         for s in tsuite.iterTestSuite(recursive=recursive, **params):
                             yield s
@@ -223,7 +228,7 @@ class TestProject(TestlinkObject, IAttachmentGetter):
         """
         return normalize_list([s for s in self.iterTestSuite(name, recursive, **params)])
 
-    def iterTestCase(self, name=None, external_id=None, version=None, **params):
+    def iterTestCase(self, name=None, external_id=None, version=None, prefetch=None, **params):
         """Iterates over TestCases specified by parameters
         @param name: The name of the wanted TestCase
         @type name: str
@@ -231,11 +236,19 @@ class TestProject(TestlinkObject, IAttachmentGetter):
         @type external_id: int
         @param version: Version of the TestCase
         @type version: int
+        @param prefetch: Lazy loaded fields to load for all TestCases at once
+        @type prefetch: list
         @param params: Other params for TestCase
         @type params: dict
         @returns: Matching TestCases
         @rtype: generator
         """
+        # Load requested fields chunk by chunk
+        if prefetch:
+            for tcase in iter_prefetched(self.iterTestCase(name, external_id, version, **params), prefetch):
+                yield tcase
+            return
+
         _id = params.get('id')
         # Check if simple API calls can be done
         if name and not _id:
@@ -297,12 +310,16 @@ class TestProject(TestlinkObject, IAttachmentGetter):
         """
         # No simple API call possible, get all
         response = self._api.getRequirementSpecificationsForTestProject(self.id)
-        specs = [RequirementSpecification(api=self._api, parent_testproject=self, **reqspec) for reqspec in response]
+        specs = (RequirementSpecification(api=self._api, parent_testproject=self, **reqspec) for reqspec in response)
 
         # Filter
         if len(params) > 0 or name:
             params['name'] = name
+            # Remember already initialised specs for the recursive search
+            visited = []
             for rspec in specs:
+                if recursive:
+                    visited.append(rspec)
                 for key, value in params.items():
                     # Skip None
                     if value is None:
@@ -328,7 +345,7 @@ class TestProject(TestlinkObject, IAttachmentGetter):
             # also search in nested specs
             if recursive:
                 # For each reqspec of this level
-                for rspec in specs:
+                for rspec in visited:
                     # Yield nested specs that match
                     for r in rspec.iterRequirementSpecification(recursive=recursive, **params):
                         yield r
@@ -8,6 +8,8 @@ from testlink.objects.tl_object import TestlinkObject
 from testlink.objects.tl_object import normalize_list
 
 from testlink.objects.tl_testcase import TestCase
+from testlink.objects.tl_testcase import iter_prefetched
+from testlink.objects.tl_testcase import iter_batched
 from testlink.objects.tl_attachment import IAttachmentGetter
 
 from testlink.exceptions import APIError
@@ -19,12 +21,11 @@ class TestSuite(TestlinkObject, IAttachmentGetter):
     @type notes: str
     """
 
-    __slots__ = ("details", "_parent_testproject", "_parent_testsuite")
+    __slots__ = ("details", "_level", "_parent_testproject", "_parent_testsuite")
 
     def __init__(self, name="", details="", parent_testproject=None, parent_testsuite=None,
                  api=None, _level=0, **kwargs):
         TestlinkObject.__init__(self, kwargs.get('id', -1), name, api)
-        IAttachmentGetter.__init__(self)
         self.details = unicode(details)
         self._level = _level
         self._parent_testproject = parent_testproject
@@ -63,18 +64,22 @@ class TestSuite(TestlinkObject, IAttachmentGetter):
         elif isinstance(response, dict):
             # Check for nested dict
             if isinstance(response[response.keys()[0]], dict):
-                response = [self._api.getTestSuiteById(self.getTestProject().id, suite_id)
-                            for suite_id in response.keys()]
+                response = (self._api.getTestSuiteById(self.getTestProject().id, suite_id)
+                            for suite_id in response.keys())
             else:
                 response = [response]
-        suites = [TestSuite(api=self._api, parent_testproject=self.getTestProject(),
+        suites = (TestSuite(api=self._api, parent_testproject=self.getTestProject(),
                             parent_testsuite=self, _level=self._level+1, **suite)
-                  for suite in response]
+                  for suite in response)
 
         # Filter
         if len(params) > 0 or name:
             params['name'] = name
+            # Remember already initialised suites for the recursive search
+            visited = []
             for tsuite in suites:
+                if recursive:
+                    visited.append(tsuite)
                 for key, value in params.items():
                     # Skip None
                     if value is None:
@@ -100,7 +105,7 @@ class TestSuite(TestlinkObject, IAttachmentGetter):
             # also serch in nested suites
             if recursive:
                 # For each suite of this level
-                for tsuite in suites:
+                for tsuite in visited:
                     # Yield nested suites that match
                     for s in tsuite.iterTestSuite(recursive=recursive, **params):
                         yield s
@@ -127,19 +132,31 @@ class TestSuite(TestlinkObject, IAttachmentGetter):
         """
         return normalize_list([s for s in self.iterTestSuite(name, recursive, **params)])
 
-    def iterTestCase(self, name=None, **params):
+    def iterTestCase(self, name=None, prefetch=None, batched=None, **params):
         """Iterates over TestCases specified by parameters
         @param name: The name of the wanted TestCase
         @type name: str
+        @param prefetch: Lazy loaded fields to load for all TestCases at once
+        @type prefetch: list
+        @param batched: Load lazy loaded fields of up to TestCase.BATCH_SIZE siblings on first access,
+                        defaults to TestCase.AUTO_PREFETCH
+        @type batched: bool
         @param params: Other params for TestCase
         @type params: dict
         @returns: Matching TestCases
         @rtype: generator
         """
+        # Load requested fields chunk by chunk
+        if prefetch:
+            for tcase in iter_prefetched(self.iterTestCase(name, batched=batched, **params), prefetch):
+                yield tcase
+            return
+
         # No simple API call possible, get all
         response = self._api.getTestCasesForTestSuite(self.id, details='full', getkeywords=True)
-        cases = [TestCase(api=self._api, parent_testproject=self.getTestProject(), parent_testsuite=self, **case)
-                 for case in response]
+        cases = (TestCase(api=self._api, parent_testproject=self.getTestProject(), parent_testsuite=self,
+                          _batch=batch, **case)
+                 for case, batch in iter_batched(response, self._api, enabled=batched))
 
         # Filter by specified parameters
         if len(params) > 0 or name:
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Result Reporter
+===============
+:module: testlink.reporter
+
+Asynchronous reporting of TestCase results.
+
+Results are queued and sent to Testlink by background workers, so test
+runners do not have to wait for the server. Queued results are combined
+into 'system.multicall' requests where possible.
+
+:Examples:
+
+    >>> with ResultReporter(api) as reporter:
+    >>>     for case in plan.iterTestCase():
+    >>>         futures.append(reporter.report(case, plan.id, build.id, run(case)))
+    >>> # All results have been sent here
+    >>> executions = [f.result()['id'] for f in futures]
+"""
+
+# IMPORTS
+import Queue
+import threading
+
+from testlink.log import LOGGER
+from testlink.exceptions import APIError
+from testlink.util import Future
+
+__all__ = ["report_arguments", "ResultReporter"]
+
+
+def report_arguments(case, testplanid, buildid, status, notes=None, overwrite=False, execduration=None,
+                     customfields=None):
+    """Returns the arguments of a reportTCResult call for the specified TestCase
+    @param case: Executed TestCase
+    @type case: TestCase
+    @returns: Arguments of TestlinkXMLRPCAPI.reportTCResult
+    @rtype: dict
+    """
+    return {'testplanid': testplanid,
+            'status': status,
+            'testcaseid': case.tc_id,
+            'testcaseexternalid': case.external_id,
+            'notes': notes,
+            'platformid': case.platform_id,
+            'overwrite': overwrite,
+            'buildid': buildid,
+            'execduration': execduration,
+            'customfields': customfields or None}
+
+
+class ResultReporter(object):
+    """Sends TestCase results from background workers
+
+    .. data:: WORKERS
+
+       Default amount of worker threads
+
+    .. data:: BATCH_SIZE
+
+       Maximal amount of results sent within a single request
+    """
+
+    WORKERS = 1  # Default amount of worker threads
+    BATCH_SIZE = 50  # Max amount of results per request
+
+    def __init__(self, api, workers=None, batch_size=None):
+        """Initialises the reporter and starts the workers
+        @param api: Testlink API
+        @type api: TestlinkXMLRPCAPI
+        @param workers: Amount of worker threads, defaults to ResultReporter.WORKERS
+        @type workers: int
+        @param batch_size: Maximal amount of results per request, defaults to ResultReporter.BATCH_SIZE
+        @type batch_size: int
+        """
+        self._api = api
+        self._batch_size = batch_size or self.BATCH_SIZE
+        self._queue = Queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = []
+        for i in xrange(workers or self.WORKERS):
+            worker = threading.Thread(target=self._work, name="ResultReporter-%d" % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def report(self, case, testplanid, buildid, status, notes=None, overwrite=False, execduration=None,
+               customfields=None):
+        """Queues the result of a TestCase
+        @param case: Executed TestCase
+        @type case: TestCase
+        @param testplanid: The internal ID of the TestPlan
+        @type testplanid: int
+        @param buildid: The internal ID of the Build
+        @type buildid: int
+        @param status: The execution status
+        @type status: str
+        @param notes: <OPTIONAL> Execution notes
+        @type notes: str
+        @param overwrite: <OPTIONAL> Overwrite the last execution
+        @type overwrite: bool
+        @param execduration: <OPTIONAL> Execution duration in minutes
+        @type execduration: float
+        @param customfields: <OPTIONAL> Custom field values
+        @type customfields: dict
+        @returns: Future of the server response
+        @rtype: Future
+        @raises RuntimeError: Reporter has already been closed
+        """
+        return self.send(**report_arguments(case, testplanid, buildid, status, notes, overwrite, execduration,
+                                            customfields))
+
+    def send(self, **arguments):
+        """Queues raw arguments of a reportTCResult call.
+        Results are only protected from being stored twice, if an idempotency key is passed
+        or TestlinkXMLRPCAPI.IDEMPOTENCY_KEYS is enabled. Otherwise the notes stay unchanged.
+        @param arguments: Arguments of TestlinkXMLRPCAPI.reportTCResult
+        @type arguments: dict
+        @returns: Future of the server response
+        @rtype: Future
+        @raises RuntimeError: Reporter has already been closed
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ResultReporter has already been closed")
+            self._queue.put((arguments, future))
+        return future
+
+    def flush(self):
+        """Blocks until all queued results have been sent"""
+        self._queue.join()
+
+    def close(self):
+        """Sends all queued results and stops the workers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _work(self):
+        """Sends queued results until the reporter is closed"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            # Combine already queued results
+            batch = [item]
+            stop = False
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except Queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._send(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _send(self, batch):
+        """Sends several results within a single request"""
+        LOGGER.debug("Reporting %d results" % len(batch))
+        multicall = self._api.multicall()
+        futures = []
+        for arguments, future in batch:
+            try:
+                multicall.reportTCResult(**arguments)
+                futures.append(future)
+            except Exception, ex:
+                future.set_exception(ex)
+        if len(futures) == 0:
+            return
+
+        try:
+            responses = multicall()
+        except Exception, ex:
+            for future in futures:
+                future.set_exception(ex)
+            return
+
+        for future, response in zip(futures, responses):
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                if isinstance(response, list) and len(response) == 1:
+                    response = response[0]
+                future.set_result(response)
+        for future in futures[len(responses):]:
+            future.set_exception(APIError(message="No response for reported result"))
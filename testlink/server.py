@@ -7,34 +7,865 @@
 """
 
 # IMPORTS
+import math
+import time
+import uuid
+import Queue
+import datetime
+import xmlrpclib
+import traceback
+import multiprocessing
+from threading import Lock
+from threading import Condition
+from threading import BoundedSemaphore
 from threading import Thread
+from threading import current_thread
+from collections import deque
+from collections import OrderedDict
 from SimpleXMLRPCServer import SimpleXMLRPCServer
+from SimpleXMLRPCServer import SimpleXMLRPCRequestHandler
 from testlink.log import LOGGER
+from testlink.metrics import ServerMetrics
+from testlink.enums import EXECUTION_STATUS
+from testlink.enums import JOB_STATUS
+from testlink.exceptions import WorkerError
+from testlink.exceptions import ExecutionTimeout
+
+
+def _serve(conn, max_jobs):
+    """Main loop of a worker process, runs callbacks until max_jobs is reached"""
+    for _ in xrange(max_jobs):
+        try:
+            item = conn.recv()
+        except (EOFError, IOError):
+            return
+        if item is None:
+            return
+        fn, args = item
+        try:
+            result = (True, fn(*args))
+        except Exception, ex:
+            # Exceptions are not necessarily picklable
+            result = (False, "%s: %s\n%s" % (ex.__class__.__name__, str(ex), traceback.format_exc()))
+        try:
+            conn.send(result)
+        except Exception, ex:
+            conn.send((False, "Cannot send result: %s" % str(ex)))
+
+
+class ProcessPool(object):
+    """Pool of worker processes running callbacks isolated from the server.
+    Callbacks and their arguments and results have to be picklable.
+
+    .. data:: TIMEOUT
+
+       Default time in seconds a callback may run, None for no limit
+
+    .. data:: MAX_JOBS
+
+       Default amount of callbacks run by a worker process before it is replaced
+    """
+
+    TIMEOUT = None  # Seconds per callback
+    MAX_JOBS = 100  # Callbacks per worker process
+
+    def __init__(self, size=None, timeout=None, max_jobs=None):
+        """Starts the worker processes
+        @param size: Amount of worker processes, defaults to the amount of CPUs
+        @type size: int
+        @param timeout: Time in seconds a callback may run, defaults to ProcessPool.TIMEOUT
+        @type timeout: float
+        @param max_jobs: Callbacks run by a worker process before it is replaced, defaults to ProcessPool.MAX_JOBS
+        @type max_jobs: int
+        """
+        self._size = size or multiprocessing.cpu_count()
+        self._timeout = timeout if timeout is not None else self.TIMEOUT
+        self._max_jobs = max_jobs or self.MAX_JOBS
+        self._closed = False
+        self._idle = Queue.Queue()
+        for _ in xrange(self._size):
+            self._idle.put(self._spawn())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self):
+        """Amount of worker processes"""
+        return self._size
+
+    def call(self, fn, args=(), timeout=None):
+        """Runs a callback within the next idle worker process
+        @param fn: Callback
+        @type fn: callable
+        @param args: Arguments of the callback
+        @type args: tuple
+        @param timeout: <OPTIONAL> Time in seconds the callback may run, defaults to the timeout of the pool
+        @type timeout: float
+        @returns: Result of the callback
+        @raises ExecutionTimeout: Callback did not finish in time, its worker process has been killed
+        @raises WorkerError: Callback raised an exception or its worker process died
+        """
+        if self._closed:
+            raise RuntimeError("ProcessPool has already been closed")
+        if timeout is None:
+            timeout = self._timeout
+        worker = self._idle.get()
+        try:
+            process, conn, jobs = worker
+            conn.send((fn, tuple(args)))
+            try:
+                if not conn.poll(timeout):
+                    worker = self._replace(worker)
+                    raise ExecutionTimeout("Callback did not finish within %s seconds" % str(timeout))
+                ok, result = conn.recv()
+            except (EOFError, IOError):
+                worker = self._replace(worker)
+                raise WorkerError("Worker process died")
+
+            # Worker processes exit after max_jobs callbacks
+            worker[2] = jobs + 1
+            if worker[2] >= self._max_jobs:
+                worker = self._replace(worker, graceful=True)
+        finally:
+            self._idle.put(worker)
+        if not ok:
+            raise WorkerError(result)
+        return result
+
+    def close(self, timeout=None):
+        """Waits for running callbacks and stops all worker processes
+        @param timeout: <OPTIONAL> Maximal time in seconds to wait for each worker process
+        @type timeout: float
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in xrange(self._size):
+            process, conn, _ = self._idle.get()
+            try:
+                conn.send(None)
+            except (IOError, ValueError):
+                pass
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+
+    def _spawn(self):
+        """Starts a new worker process"""
+        conn, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_serve, args=(child, self._max_jobs), name="ProcessPool")
+        process.daemon = True
+        process.start()
+        child.close()
+        return [process, conn, 0]
+
+    def _replace(self, worker, graceful=False):
+        """Stops a worker process and starts a new one"""
+        process, conn, jobs = worker
+        if not graceful:
+            process.terminate()
+        process.join()
+        conn.close()
+        LOGGER.debug("Replacing worker process %d after %d callbacks" % (process.pid, jobs))
+        return self._spawn()
+
+
+class JobQueue(object):
+    """Bounded queue with several priority lanes.
+    Items are taken from the first non-empty lane, first in first out within a lane.
+    """
+
+    def __init__(self, lanes=("default",), maxsize=0, limits=None):
+        """Initializes an empty queue
+        @param lanes: Names of the lanes, highest priority first
+        @type lanes: list
+        @param maxsize: Maximal amount of queued items of all lanes, 0 for no limit
+        @type maxsize: int
+        @param limits: <OPTIONAL> Maximal amount of queued items by lane
+        @type limits: dict
+        """
+        self._lanes = OrderedDict((lane, deque()) for lane in lanes)
+        self._maxsize = maxsize
+        self._limits = dict(limits or {})
+        self._size = 0
+        self._closed = False
+        self._cond = Condition()
+        self._accepted = dict((lane, 0) for lane in lanes)
+        self._rejected = dict((lane, 0) for lane in lanes)
+        self._taken = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def lanes(self):
+        """Names of the lanes, highest priority first"""
+        return list(self._lanes)
+
+    def lane(self, name):
+        """Returns the lane of the specified name, unknown names are mapped to the last lane
+        @param name: Name of the lane
+        @type name: str
+        @rtype: str
+        """
+        if name in self._lanes:
+            return name
+        return next(reversed(self._lanes))
+
+    def put(self, item, lane=None):
+        """Appends an item
+        @param item: Item to append
+        @param lane: <OPTIONAL> Name of the lane, defaults to the last lane
+        @type lane: str
+        @raises Queue.Full: Queue or lane is full
+        @raises RuntimeError: Queue has already been closed
+        """
+        lane = self.lane(lane)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobQueue has already been closed")
+            if (self._maxsize and self._size >= self._maxsize) or \
+                    (lane in self._limits and len(self._lanes[lane]) >= self._limits[lane]):
+                self._rejected[lane] += 1
+                raise Queue.Full(lane)
+            self._lanes[lane].append((time.time(), item))
+            self._size += 1
+            self._accepted[lane] += 1
+            self._cond.notify()
+
+    def get(self):
+        """Removes and returns the next item, blocks until an item is available
+        @returns: Next item or None if the queue has been closed and is empty
+        """
+        with self._cond:
+            while self._size == 0 and not self._closed:
+                self._cond.wait()
+            if self._size == 0:
+                return None
+            for items in self._lanes.itervalues():
+                if items:
+                    queued, item = items.popleft()
+                    break
+            self._size -= 1
+            waited = time.time() - queued
+            self._taken += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            return item
+
+    def remove(self, item):
+        """Removes a queued item
+        @returns: False if the item is not queued
+        @rtype: bool
+        """
+        with self._cond:
+            for items in self._lanes.itervalues():
+                for entry in items:
+                    if entry[1] is item:
+                        items.remove(entry)
+                        self._size -= 1
+                        return True
+        return False
+
+    def close(self):
+        """Wakes up all waiting consumers, queued items are still returned"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """Returns queue depth, accepted and rejected items by lane and the wait times in seconds
+        @rtype: dict
+        """
+        with self._cond:
+            return {'depth': self._size,
+                    'maxsize': self._maxsize,
+                    'lanes': dict((lane, {'depth': len(items),
+                                          'limit': self._limits.get(lane, 0),
+                                          'accepted': self._accepted[lane],
+                                          'rejected': self._rejected[lane]})
+                                  for lane, items in self._lanes.iteritems()),
+                    'wait_avg': self._wait_total / self._taken if self._taken else 0.0,
+                    'wait_max': self._wait_max}
+
+
+class Job(object):
+    """Single executeTestCase request scheduled by TestlinkJobServer
+    @ivar id: Unique ID of the job
+    @type id: str
+    @ivar params: Parameters of the executeTestCase request
+    @type params: dict
+    @ivar status: State of the job, see testlink.enums.JOB_STATUS
+    @type status: str
+    @ivar result: Execution status reported to Testlink
+    @type result: str
+    @ivar notes: Execution notes reported to Testlink
+    @type notes: str
+    @ivar error: Reason of a failed job
+    @type error: str
+    """
+
+    __slots__ = ("id", "params", "status", "result", "notes", "error")
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = JOB_STATUS.QUEUED
+        self.result = None
+        self.notes = None
+        self.error = None
+
+    def __str__(self):
+        return "Job %s: %s" % (self.id, self.status)
+
+    def as_dict(self):
+        """Returns the job state as XML-RPC struct"""
+        return {'id': self.id, 'status': self.status, 'result': self.result or "", 'notes': self.notes or "",
+                'error': self.error or ""}
+
+
+class TestlinkRequestHandler(SimpleXMLRPCRequestHandler):
+    """XML-RPC request handler additionally serving the metrics and health state via HTTP GET,
+    if enabled by the server.
+
+    .. data:: METRICS_PATH
+
+       Path of the metrics in plain text
+
+    .. data:: HEALTH_PATH
+
+       Path of the health state, responds with 503 while the server is shutting down
+    """
+
+    METRICS_PATH = "/metrics"  # Prometheus compatible metrics
+    HEALTH_PATH = "/health"  # Health check
+
+    def do_GET(self):
+        """Handles a GET request"""
+        if not self.server.http_metrics or self.path not in (self.METRICS_PATH, self.HEALTH_PATH):
+            self.report_404()
+            return
+        code = 200
+        if self.path == self.METRICS_PATH:
+            body = self.server.metrics.render(self.server._gauges())
+        elif self.server._stopped:
+            code, body = 503, "STOPPING\n"
+        else:
+            body = "OK\n"
+        self.send_response(code)
+        self.send_header("Content-type", "text/plain; version=0.0.4")
+        self.send_header("Content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
 
 class TestlinkXMLRPCServer(SimpleXMLRPCServer, Thread):
-    """Testlink conform XML-RPC automation server"""
+    """Testlink conform XML-RPC automation server.
+    Requests are accepted until the server is shut down and handled concurrently by a pool of worker threads.
+
+    Remote methods:
+
+        * executeTestCase(params): Runs the callback
+        * executeTestCases(calls): Runs the callback for several TestCases concurrently
+        * system.multicall(calls): Runs several remote methods concurrently within a single request
+        * getMetrics(): Returns request rates, latency histograms, error counts, queue depth and busy workers
+
+    If enabled, the metrics are additionally served as plain text at /metrics, see TestlinkRequestHandler.
+
+    @ivar metrics: Request and callback metrics
+    @type metrics: ServerMetrics
 
-    def __init__(self, callback, host='127.0.0.1', port=8080, verbose=False):
+    .. data:: WORKERS
+
+       Default amount of worker threads
+
+    .. data:: MAX_QUEUED_REQUESTS
+
+       Accepted requests waiting for a worker, no further connections are accepted while the queue is full
+    """
+
+    WORKERS = 4  # Default amount of worker threads
+    MAX_QUEUED_REQUESTS = 64  # Accepted requests waiting for a worker
+    allow_reuse_address = True
+
+    def __init__(self, callback, host='127.0.0.1', port=8080, verbose=False, workers=None, pool=None,
+                 http_metrics=False):
         """Initializes the Server
         @param callback: Method to be executed if server is triggerd
         @type callback: method
         @param host: The address of the Server
         @type host: str
-        @param port: The port of the Server
+        @param port: The port of the Server, 0 to use any free port
         @type port: int
         @param verbose: Log HTTP requests
         @type verbose: bool
+        @param workers: Amount of concurrently handled requests, defaults to TestlinkXMLRPCServer.WORKERS
+        @type workers: int
+        @param pool: <OPTIONAL> Worker processes running the callback, which has to be picklable then.
+        The pool is not closed by the Server.
+        @type pool: ProcessPool
+        @param http_metrics: Serve the metrics and health state via HTTP GET
+        @type http_metrics: bool
         """
-        SimpleXMLRPCServer.__init__(self, (host, port), logRequests=verbose)
-        Thread.__init__(self)
+        SimpleXMLRPCServer.__init__(self, (host, port), requestHandler=TestlinkRequestHandler,
+                                    logRequests=verbose, allow_none=True)
+        Thread.__init__(self, name="TestlinkXMLRPCServer")
+        self.daemon = True
+        self.http_metrics = http_metrics
+        self.metrics = ServerMetrics()
+        self._callback = callback
+        self._pool = pool
+        self._stopped = False
+        self._concurrency = workers or self.WORKERS
+        self._running = BoundedSemaphore(self._concurrency)
+        self._requests = Queue.Queue(self.MAX_QUEUED_REQUESTS)
+        self._busy = 0
+        self._busy_lock = Lock()
+        self._workers = []
+        for i in xrange(self._concurrency):
+            worker = Thread(target=self._work, name="TestlinkXMLRPCServer-%d" % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
         self.register_introspection_functions()
-        start_msg = "Starting Testlink compatible XML-RPC Server at http://%s:%d/" % (str(host), int(port))
+        start_msg = "Starting Testlink compatible XML-RPC Server at http://%s:%d/" % self.server_address
         LOGGER.info(start_msg)
         register_msg = "Registering '%s' as callback" % str(callback.__name__)
         LOGGER.info(register_msg)
-        self.register_function(callback, "executeTestCase")
+        self._register_functions(callback)
         self.start()
 
+    @property
+    def port(self):
+        """The port the Server is listening on"""
+        return self.server_address[1]
+
     def run(self):
-        self.handle_request()
+        self.serve_forever()
+
+    def process_request(self, request, client_address):
+        """Passes an accepted request to the worker threads, blocks while the queue is full"""
+        self._requests.put((request, client_address))
+
+    def shutdown(self, timeout=None):
+        """Stops accepting requests, waits for all accepted requests and closes the Server
+        @param timeout: <OPTIONAL> Maximal time in seconds to wait for each worker
+        @type timeout: float
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        LOGGER.info("Shutting down Testlink compatible XML-RPC Server at http://%s:%d/" % self.server_address)
+        SimpleXMLRPCServer.shutdown(self)
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+        self.server_close()
+        # serve_forever has returned, but the thread may still be running
+        if current_thread() is not self:
+            self.join(timeout)
+
+    def executeTestCases(self, calls):
+        """Runs the callback for several TestCases concurrently
+        @param calls: Argument of each callback, e.g. the executeTestCase parameters
+        @type calls: list
+        @returns: Result of each callback in order of the calls,
+        failed callbacks are returned as fault structs like in 'system.multicall'
+        @rtype: list
+        """
+        return self._map(self._execute, calls)
+
+    def multicall(self, calls):
+        """Runs several remote methods concurrently, replaces the sequential 'system.multicall'
+        @param calls: Structs with the 'methodName' and the 'params' of each call
+        @type calls: list
+        @returns: Result of each call wrapped in a list in order of the calls,
+        failed calls are returned as fault structs
+        @rtype: list
+        """
+        def call(item):
+            name = item['methodName']
+            if name == "system.multicall":
+                raise xmlrpclib.Fault(1, "Recursive system.multicall forbidden")
+            return [self._dispatch(name, item['params'])]
+
+        return self._map(call, calls)
+
+    def getMetrics(self):
+        """Returns the metrics of the Server
+        @returns: Metrics as described by ServerMetrics.as_dict and the current values of _gauges
+        @rtype: dict
+        """
+        metrics = self.metrics.as_dict()
+        metrics.update(self._gauges())
+        return metrics
+
+    def _gauges(self):
+        """Returns current values by name, e.g. the queue depth"""
+        return {'queue_depth': self._requests.qsize(),
+                'workers': self._concurrency,
+                'workers_busy': self._busy}
+
+    def _register_functions(self, callback):
+        """Registers the remote methods of the Server"""
+        self.register_function(self._execute, "executeTestCase")
+        self.register_function(self.executeTestCases, "executeTestCases")
+        self.register_function(self.multicall, "system.multicall")
+        self.register_function(self.getMetrics, "getMetrics")
+
+    def _dispatch(self, method, params):
+        """Dispatches a remote method call and measures it"""
+        with self.metrics.request(method):
+            return SimpleXMLRPCServer._dispatch(self, method, params)
+
+    def _map(self, fn, items):
+        """Calls fn for each item within up to as many threads as there are workers
+        @returns: Result of each call in order of the items, failures are returned as fault structs
+        @rtype: list
+        """
+        results = [None] * len(items)
+        pending = Queue.Queue()
+        for item in enumerate(items):
+            pending.put(item)
+
+        def run():
+            while True:
+                try:
+                    i, item = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[i] = fn(item)
+                except xmlrpclib.Fault, fault:
+                    results[i] = {'faultCode': fault.faultCode, 'faultString': fault.faultString}
+                except Exception, ex:
+                    results[i] = {'faultCode': 1, 'faultString': "%s: %s" % (ex.__class__.__name__, str(ex))}
+
+        threads = [Thread(target=run, name="TestlinkXMLRPCServer-batch")
+                   for _ in xrange(min(len(items), self._concurrency))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _execute(self, *args):
+        """Runs the callback, within a worker process if a pool is used.
+        The amount of concurrently running callbacks is limited to the amount of workers.
+        """
+        with self._running:
+            with self.metrics.callback():
+                if self._pool is None:
+                    return self._callback(*args)
+                return self._pool.call(self._callback, args)
+
+    def _work(self):
+        """Handles accepted requests until the server is shut down"""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._busy_lock:
+                self._busy += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                with self._busy_lock:
+                    self._busy -= 1
+                self.shutdown_request(request)
+
+
+class TestlinkJobServer(TestlinkXMLRPCServer):
+    """Testlink conform XML-RPC automation server executing TestCases in the background.
+
+    executeTestCase only schedules a job and tells Testlink to expect the result later on.
+    The callback is run by a bounded pool of job threads, its result is reported via reportTCResult.
+    The callback is called with the parameters of the executeTestCase request and returns
+    either the execution status or a dict with 'result' and 'notes'.
+
+    Jobs are queued by priority lanes, the lane of a job is taken from the 'lane' parameter
+    of the request (see _lane). If the queue or the lane is full, requests are rejected by
+    a fault telling the estimated amount of seconds to wait before retrying.
+
+    Additional remote methods:
+
+        * getJobStatus(job_id): Returns the job state, see Job.as_dict
+        * cancelJob(job_id): Cancels a queued job, returns False if it is already running or done
+        * getQueueStats(): Returns queue depth, wait times and rejections, see getQueueStats
+        * getMetrics(): Additionally returns the amount of queued and running jobs
+
+    .. data:: JOB_WORKERS
+
+       Default amount of concurrently running jobs
+
+    .. data:: MAX_QUEUED_JOBS
+
+       Default maximal amount of waiting jobs, further requests are rejected
+
+    .. data:: JOB_LANES
+
+       Default priority lanes, highest priority first
+
+    .. data:: KEEP_JOBS
+
+       Amount of completed jobs, whose state is kept
+
+    .. data:: RETRY_AFTER
+
+       Seconds to wait before retrying rejected requests, as long as no job duration is known
+    """
+
+    JOB_WORKERS = 2  # Concurrently running jobs
+    MAX_QUEUED_JOBS = 100  # Waiting jobs before rejecting requests
+    JOB_LANES = ("default",)  # Priority lanes
+    KEEP_JOBS = 1000  # Remembered completed jobs
+    RETRY_AFTER = 5  # Default retry delay of rejected requests
+
+    FAULT_QUEUE_FULL = 1  # Fault code of rejected requests
+    FAULT_UNKNOWN_JOB = 2  # Fault code of unknown job IDs
+
+    def __init__(self, callback, api, host='127.0.0.1', port=8080, verbose=False, workers=None, pool=None,
+                 job_workers=None, max_queued_jobs=None, lanes=None, lane_limits=None, http_metrics=False):
+        """Initializes the Server
+        @param callback: Method to be executed for each job
+        @type callback: method
+        @param api: Testlink API used to report the results
+        @type api: TestlinkXMLRPCAPI
+        @param job_workers: Amount of concurrently running jobs, defaults to the size of the pool
+        or TestlinkJobServer.JOB_WORKERS
+        @type job_workers: int
+        @param max_queued_jobs: Maximal amount of waiting jobs, defaults to TestlinkJobServer.MAX_QUEUED_JOBS
+        @type max_queued_jobs: int
+        @param lanes: <OPTIONAL> Priority lanes, highest priority first, e.g. ('smoke', 'regression'),
+        defaults to TestlinkJobServer.JOB_LANES
+        @type lanes: list
+        @param lane_limits: <OPTIONAL> Maximal amount of waiting jobs by lane
+        @type lane_limits: dict
+        @raises ValueError: Less than one job worker
+        @see: TestlinkXMLRPCServer
+        """
+        if job_workers is None:
+            job_workers = pool.size if pool is not None else self.JOB_WORKERS
+        if job_workers < 1:
+            raise ValueError("Invalid amount of job workers: %d" % job_workers)
+        self._api = api
+        self._jobs = OrderedDict()
+        self._jobs_lock = Lock()
+        self._job_queue = JobQueue(lanes or self.JOB_LANES, max_queued_jobs or self.MAX_QUEUED_JOBS, lane_limits)
+        self._job_duration = None
+        self._job_workers = []
+        for i in xrange(job_workers):
+            worker = Thread(target=self._run_jobs, name="TestlinkJobServer-%d" % i)
+            worker.daemon = True
+            worker.start()
+            self._job_workers.append(worker)
+        TestlinkXMLRPCServer.__init__(self, callback, host, port, verbose, workers, pool, http_metrics)
+
+    def _register_functions(self, callback):
+        self.register_function(self.scheduleJob, "executeTestCase")
+        self.register_function(self.scheduleJobs, "executeTestCases")
+        self.register_function(self.multicall, "system.multicall")
+        self.register_function(self.getJobStatus, "getJobStatus")
+        self.register_function(self.cancelJob, "cancelJob")
+        self.register_function(self.getQueueStats, "getQueueStats")
+        self.register_function(self.getMetrics, "getMetrics")
+
+    def scheduleJob(self, params):
+        """Schedules the execution of a TestCase
+        @param params: Parameters of the executeTestCase request
+        @type params: dict
+        @returns: Response telling Testlink to expect the result later on
+        @rtype: dict
+        @raises xmlrpclib.Fault: Too many jobs are waiting, the fault has a retry_after attribute
+        """
+        job = Job(params)
+        lane = self._job_queue.lane(self._lane(params))
+        with self._jobs_lock:
+            try:
+                self._job_queue.put(job, lane)
+            except Queue.Full:
+                retry_after = self._retry_after()
+                fault = xmlrpclib.Fault(self.FAULT_QUEUE_FULL, "Too many queued jobs in lane '%s', "
+                                                               "retry after %d seconds" % (lane, retry_after))
+                fault.retry_after = retry_after
+                raise fault
+            self._jobs[job.id] = job
+        LOGGER.debug("Scheduled job %s" % job.id)
+        return {'result': "",
+                'notes': "Scheduled as job %s" % job.id,
+                'scheduled': 'future',
+                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'job': job.id}
+
+    def scheduleJobs(self, calls):
+        """Schedules the execution of several TestCases
+        @param calls: Parameters of each executeTestCase request
+        @type calls: list
+        @returns: Response of each request, rejected requests are returned as fault structs
+        with an additional 'retryAfter' member
+        @rtype: list
+        """
+        results = []
+        for params in calls:
+            try:
+                results.append(self.scheduleJob(params))
+            except xmlrpclib.Fault, fault:
+                results.append({'faultCode': fault.faultCode, 'faultString': fault.faultString,
+                                'retryAfter': fault.retry_after})
+        return results
+
+    def getQueueStats(self):
+        """Returns the state of the job queue
+        @returns: Queue depth, wait times and rejections (see JobQueue.stats),
+        the amount of running jobs and their average duration in seconds
+        @rtype: dict
+        """
+        stats = self._job_queue.stats()
+        with self._jobs_lock:
+            stats['running'] = sum(1 for job in self._jobs.itervalues() if job.status == JOB_STATUS.RUNNING)
+            stats['duration_avg'] = self._job_duration or 0.0
+        return stats
+
+    def getJobStatus(self, job_id):
+        """Returns the state of a job
+        @param job_id: ID of the job
+        @type job_id: str
+        @rtype: dict
+        @raises xmlrpclib.Fault: Unknown job
+        """
+        with self._jobs_lock:
+            return self._job(job_id).as_dict()
+
+    def cancelJob(self, job_id):
+        """Cancels a queued job
+        @param job_id: ID of the job
+        @type job_id: str
+        @returns: False if the job is already running or done
+        @rtype: bool
+        @raises xmlrpclib.Fault: Unknown job
+        """
+        with self._jobs_lock:
+            job = self._job(job_id)
+            if job.status != JOB_STATUS.QUEUED:
+                return False
+            job.status = JOB_STATUS.CANCELLED
+            self._job_queue.remove(job)
+            self._prune()
+        LOGGER.debug("Cancelled job %s" % job.id)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Stops accepting requests, waits for all accepted requests and jobs and closes the Server
+        @param timeout: <OPTIONAL> Maximal time in seconds to wait for each worker
+        @type timeout: float
+        """
+        if self._stopped:
+            return
+        TestlinkXMLRPCServer.shutdown(self, timeout)
+        self._job_queue.close()
+        for worker in self._job_workers:
+            worker.join(timeout)
+
+    def _gauges(self):
+        gauges = TestlinkXMLRPCServer._gauges(self)
+        stats = self.getQueueStats()
+        gauges['jobs_queued'] = stats['depth']
+        gauges['jobs_running'] = stats['running']
+        gauges['job_wait_seconds_max'] = stats['wait_max']
+        return gauges
+
+    def _lane(self, params):
+        """Returns the priority lane of a job, overwrite to derive lanes from other parameters
+        @param params: Parameters of the executeTestCase request
+        @type params: dict
+        @rtype: str
+        """
+        return params.get('lane')
+
+    def _retry_after(self):
+        """Estimates the seconds until a queued job is started"""
+        if self._job_duration is None:
+            return self.RETRY_AFTER
+        return max(1, int(math.ceil(self._job_duration * (len(self._job_queue) + 1) / len(self._job_workers))))
+
+    def _job(self, job_id):
+        """Returns a job by ID, lock has to be held"""
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise xmlrpclib.Fault(self.FAULT_UNKNOWN_JOB, "Unknown job: %s" % job_id)
+
+    def _prune(self):
+        """Forgets the oldest completed jobs, lock has to be held"""
+        while len(self._jobs) > self.KEEP_JOBS:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest].status in (JOB_STATUS.QUEUED, JOB_STATUS.RUNNING):
+                break
+            del self._jobs[oldest]
+
+    def _run_jobs(self):
+        """Runs queued jobs until the server is shut down"""
+        while True:
+            job = self._job_queue.get()
+            if job is None:
+                return
+            with self._jobs_lock:
+                if job.status != JOB_STATUS.QUEUED:
+                    continue
+                job.status = JOB_STATUS.RUNNING
+            started = time.time()
+            self._run(job)
+            duration = time.time() - started
+            with self._jobs_lock:
+                # Moving average of the job durations
+                if self._job_duration is None:
+                    self._job_duration = duration
+                else:
+                    self._job_duration += 0.1 * (duration - self._job_duration)
+                self._prune()
+
+    def _run(self, job):
+        """Runs the callback of a single job and reports its result"""
+        try:
+            result = self._execute(job.params)
+            if isinstance(result, dict):
+                job.result, job.notes = result.get('result'), result.get('notes')
+            else:
+                job.result = result
+            if not job.result:
+                raise ValueError("Callback did not return an execution status")
+        except Exception, ex:
+            LOGGER.debug("Job %s failed: %s" % (job.id, str(ex)))
+            job.result = EXECUTION_STATUS.BLOCKED
+            job.notes = "Automated execution failed: %s" % str(ex)
+
+        params = job.params
+        try:
+            # Job ID serves as idempotency key, so connection errors never store a result twice
+            self._api.reportTCResult(testplanid=params.get('testPlanID'),
+                                     status=job.result,
+                                     testcaseid=params.get('testCaseID'),
+                                     buildid=params.get('buildID'),
+                                     platformid=params.get('platformID') or None,
+                                     notes=job.notes,
+                                     idempotencykey=job.id)
+        except Exception, ex:
+            LOGGER.error("Cannot report result of job %s: %s" % (job.id, str(ex)))
+            with self._jobs_lock:
+                job.status = JOB_STATUS.FAILED
+                job.error = str(ex)
+            return
+        with self._jobs_lock:
+            job.status = JOB_STATUS.FINISHED
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Result Spool
+============
+:module: testlink.spool
+
+Durable local storage of TestCase results.
+
+Results are appended to a local JSON lines file instead of being sent to
+Testlink directly, so test execution does not depend on the availability of
+the server. The spool is replayed to Testlink later on. Each record carries
+a unique key; successfully sent records are acknowledged by an additional
+line, so a replay never sends a record twice, even if it was interrupted.
+The key is also used as idempotency key of the reported result, so records,
+which have been sent but not acknowledged, are verified before sending them again.
+
+A crash may only lose the records appended since the last synchronisation
+(see :data:`ResultSpool.SYNC_INTERVAL`). A partially written last line is
+ignored when reading the spool.
+
+:Examples:
+
+    >>> with ResultSpool("results.jsonl") as spool:
+    >>>     for case in plan.iterTestCase():
+    >>>         spool.report(case, plan.id, build.id, run(case))
+    >>> # Later on
+    >>> with ResultSpool("results.jsonl") as spool:
+    >>>     sent, failed = spool.replay(api, workers=4)
+"""
+
+# IMPORTS
+import os
+import json
+import uuid
+import threading
+
+from testlink.log import LOGGER
+from testlink.reporter import report_arguments
+from testlink.reporter import ResultReporter
+from testlink.util import Future
+
+__all__ = ["ResultSpool"]
+
+
+class ResultSpool(object):
+    """Append-only spool of reportTCResult calls
+
+    .. data:: SYNC_INTERVAL
+
+       Amount of appended records after which the spool is synchronised to disk
+    """
+
+    SYNC_INTERVAL = 20  # Appended records between two fsync calls
+
+    def __init__(self, path, sync_interval=None):
+        """Opens the spool file, creates it if necessary
+        @param path: Path of the spool file
+        @type path: str
+        @param sync_interval: Appended records between two synchronisations,
+        defaults to ResultSpool.SYNC_INTERVAL
+        @type sync_interval: int
+        """
+        self._path = path
+        self._sync_interval = sync_interval or self.SYNC_INTERVAL
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._file = open(path, 'ab')
+
+        # Terminate an incomplete record of a crashed process
+        if self._file.tell() > 0:
+            with open(path, 'rb') as spool:
+                spool.seek(-1, os.SEEK_END)
+                if spool.read(1) != "\n":
+                    self._file.write("\n")
+                    self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    def report(self, case, testplanid, buildid, status, notes=None, overwrite=False, execduration=None,
+               customfields=None):
+        """Records the result of a TestCase, see ResultReporter.report
+        @returns: Key of the record
+        @rtype: str
+        """
+        return self.append(**report_arguments(case, testplanid, buildid, status, notes, overwrite, execduration,
+                                              customfields))
+
+    def append(self, **arguments):
+        """Records raw arguments of a reportTCResult call
+        @param arguments: Arguments of TestlinkXMLRPCAPI.reportTCResult
+        @type arguments: dict
+        @returns: Key of the record
+        @rtype: str
+        """
+        key = uuid.uuid4().hex
+        self._write({'key': key, 'report': arguments})
+        return key
+
+    def attempt(self, key):
+        """Marks a record as being sent.
+        The mark is synchronised to disk immediately, so a record sent before a crash is always verified.
+        @param key: Key of the record
+        @type key: str
+        """
+        self._write({'attempt': key}, sync=True)
+
+    def ack(self, key):
+        """Marks a record as sent
+        @param key: Key of the record
+        @type key: str
+        """
+        self._write({'ack': key})
+
+    def sync(self):
+        """Writes all records to disk"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Writes all records to disk and closes the spool"""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def pending(self):
+        """Returns all records, which have not been sent yet
+        @returns: Keys and arguments of the records in order of recording
+        @rtype: list
+        """
+        self.sync()
+        return self._read()
+
+    def attempted(self):
+        """Returns the keys of all pending records, which might have been sent already
+        @rtype: set
+        """
+        self.sync()
+        return self._read(attempted=True)
+
+    def _read(self, attempted=False):
+        """Reads all records, which have not been sent yet"""
+        records = []
+        attempts = set()
+        acked = set()
+        with open(self._path, 'rb') as spool:
+            for line in spool:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Incomplete record of a crashed process
+                    LOGGER.debug("Skipping invalid spool record: %r" % line)
+                    continue
+                if 'ack' in record:
+                    acked.add(record['ack'])
+                elif 'attempt' in record:
+                    attempts.add(record['attempt'])
+                else:
+                    records.append((record['key'], record['report']))
+        if attempted:
+            return attempts.difference(acked)
+        return [(key, arguments) for key, arguments in records if key not in acked]
+
+    def compact(self):
+        """Removes all sent records from the spool file.
+        Attempts of pending records are kept, so they are still verified before sending them again.
+        """
+        with self._lock:
+            self._sync()
+            self._file.close()
+            try:
+                records = self._read()
+                attempted = self._read(attempted=True)
+                tmp = self._path + ".tmp"
+                with open(tmp, 'wb') as spool:
+                    for key, arguments in records:
+                        spool.write(json.dumps({'key': key, 'report': arguments}) + "\n")
+                        if key in attempted:
+                            spool.write(json.dumps({'attempt': key}) + "\n")
+                    spool.flush()
+                    os.fsync(spool.fileno())
+                os.rename(tmp, self._path)
+            finally:
+                self._file = open(self._path, 'ab')
+
+    def replay(self, api, workers=None, progress=None):
+        """Sends all pending records to Testlink
+        @param api: Testlink API
+        @type api: TestlinkXMLRPCAPI
+        @param workers: Amount of concurrent workers, see ResultReporter
+        @type workers: int
+        @param progress: <OPTIONAL> Called with the amount of finished and total records after each record
+        @type progress: callable
+        @returns: Amount of sent and failed records
+        @rtype: tuple
+        """
+        records = self.pending()
+        attempted = self.attempted()
+        total = len(records)
+        state = {'sent': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def finished(key):
+            def _finished(future):
+                if future.exception() is None:
+                    self.ack(key)
+                    result = 'sent'
+                else:
+                    LOGGER.debug("Replay of %s failed: %s" % (key, str(future.exception())))
+                    result = 'failed'
+                # Report progress in order
+                with lock:
+                    state[result] += 1
+                    if progress is not None:
+                        progress(state['sent'] + state['failed'], total)
+            return _finished
+
+        with ResultReporter(api, workers=workers) as reporter:
+            for key, arguments in records:
+                arguments['idempotencykey'] = key
+                if key in attempted:
+                    # Might have been stored by an interrupted replay
+                    future = Future()
+                    try:
+                        stored = api.getReportedResult(**arguments)
+                    except Exception, ex:
+                        # Stays pending, sending it without verification might store it twice
+                        LOGGER.debug("Cannot verify %s: %s" % (key, str(ex)))
+                        future.add_done_callback(finished(key))
+                        future.set_exception(ex)
+                        continue
+                    if stored is not None:
+                        future.add_done_callback(finished(key))
+                        future.set_result(stored)
+                        continue
+                self.attempt(key)
+                reporter.send(**arguments).add_done_callback(finished(key))
+        self.sync()
+        return state['sent'], state['failed']
+
+    def _write(self, record, sync=False):
+        """Appends a single record, synchronises it immediately if requested"""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if sync or self._unsynced >= self._sync_interval:
+                self._sync()
+
+    def _sync(self):
+        """Synchronises the spool file to disk"""
+        if self._unsynced > 0:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
@@ -6,8 +6,11 @@ Utility methods
 """
 
 # IMPORTS
+import threading
 
-__all__ = ["lazy"]
+from testlink.log import LOGGER
+
+__all__ = ["lazy", "decoded", "Future"]
 
 def lazy(loader):
     """Decorator for lazy loading properties"""
@@ -21,3 +24,93 @@ def lazy(loader):
             setattr(self, attr_name, loader(self))
         return getattr(self, attr_name)
     return _lazy
+
+
+def decoded(attr_name, decoder):
+    """Property for lazy decoding of raw server values.
+    The raw value is stored within attr_name and replaced by
+    its decoded value on first access.
+    @param attr_name: Name of the attribute holding the raw value
+    @type attr_name: str
+    @param decoder: Decoding function, has to return already decoded values unchanged
+    @type decoder: callable
+    """
+
+    def _get(self):
+        value = getattr(self, attr_name)
+        result = decoder(value)
+        if result is not value:
+            setattr(self, attr_name, result)
+        return result
+
+    def _set(self, value):
+        setattr(self, attr_name, value)
+    return property(_get, _set)
+
+
+class Future(object):
+    """Result of an asynchronous operation.
+    Minimal counterpart of concurrent.futures.Future.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        """Returns True if the operation has finished"""
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """Returns the result of the operation
+        @param timeout: Seconds to wait for the result, None waits forever
+        @type timeout: float
+        @raises RuntimeError: Result not available within timeout
+        @raises Exception: Exception of the failed operation
+        """
+        if not self._event.wait(timeout):
+            raise RuntimeError("Result not available within %s seconds" % str(timeout))
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """Returns the exception of the failed operation or None
+        @param timeout: Seconds to wait for the result, None waits forever
+        @type timeout: float
+        @raises RuntimeError: Result not available within timeout
+        """
+        if not self._event.wait(timeout):
+            raise RuntimeError("Result not available within %s seconds" % str(timeout))
+        return self._exception
+
+    def add_done_callback(self, fn):
+        """Calls fn with the future as soon as the operation has finished"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def set_result(self, result):
+        """Finishes the operation with the specified result"""
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exception):
+        """Finishes the operation with the specified exception"""
+        self._exception = exception
+        self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception:
+                LOGGER.exception("Exception in callback of %r" % self)